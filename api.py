@@ -4,31 +4,118 @@ Simple API Server for ODBC DataBridge
 Provides HTTP endpoints to trigger data export scripts.
 Designed for Google Cloud deployment (Cloud Run, App Engine, GCE).
 
+Heavy modules (pyodbc, requests, the export services) are not imported
+here; connectors.warmup imports them in the background and pre-opens
+database connections, so a cold instance can answer quickly (see /ready).
+
 Usage:
     # Development
     python api.py
     
-    # Production (with gunicorn)
+    # Production (with gunicorn; gunicorn.conf.py starts warm-up in each worker)
     gunicorn -w 4 -b 0.0.0.0:8080 api:app
 """
 
 import sys
 import os
-from flask import Flask, request, jsonify
+import time
+import hashlib
+import json
+
+_IMPORT_STARTED = time.perf_counter()
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from connectors.odbc_connector import ODBCConnector
+from connectors.warmup import get_warmup
+
+# Created before the other imports so first_response is timed from process start
+warmup = get_warmup()
+
+from flask import Flask, request, jsonify, g, Response
 from connectors.logger_utils import setup_logger
-from connectors.config_loader import get_db_config, get_endpoint
-from services.birdeye_export import export_to_birdeye
-import json
-import requests
+from connectors.config_loader import get_db_config, get_job_workers
+from connectors.job_manager import JobManager
+from connectors.query_cache import get_query_cache
+from connectors import metrics
 
 app = Flask(__name__)
 logger = setup_logger('api')
 
+# Exports run in the background on a bounded pool shared by all request threads
+jobs = JobManager(max_workers=get_job_workers())
+
+
+def _collect_gauges():
+    """Scrape-time gauges for the connection pools, query cache, job queue, export pipelines, webhook delivery and startup timings."""
+    from connectors.connection_pool import get_all_pool_stats
+    from connectors.delivery_controller import CIRCUIT_STATES, get_controllers
+    from connectors.pipeline import get_active_pipelines
+    from connectors.delivery_spool import get_spool
+    
+    for index, stats in enumerate(get_all_pool_stats()):
+        labels = {'pool': str(index)}
+        for key in ('size', 'idle', 'in_use', 'checkouts', 'timeouts'):
+            yield f'databridge_db_pool_{key}', f'Connection pool {key}', labels, stats[key]
+        yield 'databridge_db_pool_wait_seconds_total', 'Connection pool checkout wait time', labels, stats['wait_time_total']
+    cache_stats = get_query_cache().stats()
+    for key in ('entries', 'bytes', 'hits', 'misses', 'coalesced', 'evictions'):
+        yield f'databridge_query_cache_{key}', f'Query cache {key}', {}, cache_stats[key]
+    for status, count in jobs.stats().items():
+        yield 'databridge_jobs', 'Tracked background jobs by status', {'status': status}, count
+    for pipeline in get_active_pipelines():
+        for stage in pipeline.stats()['stages']:
+            labels = {'pipeline': pipeline.name, 'stage': stage['stage']}
+            yield 'databridge_pipeline_queue_depth', 'Chunks waiting in a pipeline stage queue', labels, stage['queue_depth']
+    for controller in get_controllers():
+        state = controller.state()
+        labels = {'endpoint': state['endpoint']}
+        yield 'databridge_webhook_concurrency_limit', 'Adaptive webhook concurrency limit', labels, state['limit']
+        yield 'databridge_webhook_in_flight', 'Webhook requests in flight', labels, state['in_flight']
+        yield ('databridge_webhook_circuit_state', 'Webhook circuit breaker state (0 closed, 1 half-open, 2 open)',
+               labels, CIRCUIT_STATES[state['circuit']])
+    spool = get_spool()
+    if spool is not None:
+        spool_stats = spool.stats()
+        yield 'databridge_spool_pending_batches', 'Spooled webhook batches waiting for replay', {}, spool_stats['pending_batches']
+        yield 'databridge_spool_pending_bytes', 'Payload bytes of spooled batches waiting for replay', {}, spool_stats['pending_bytes']
+        yield 'databridge_spool_file_bytes', 'Size of the delivery spool file', {}, spool_stats['file_bytes']
+        yield ('databridge_spool_oldest_pending_seconds', 'Age of the oldest spooled batch waiting for replay', {},
+               spool_stats['oldest_pending_age'] or 0)
+    for phase, seconds in dict(warmup.timings).items():
+        yield 'databridge_startup_seconds', 'Startup durations (api_import, warmup, first_response)', {'phase': phase}, seconds
+    yield 'databridge_ready', 'Whether startup warm-up has finished', {}, int(warmup.ready)
+
+
+metrics.REGISTRY.register_collector(_collect_gauges)
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    # No-op once started (normally by the gunicorn post_fork hook)
+    warmup.start()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        # Label by route pattern, not raw path, to keep cardinality bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method, endpoint=endpoint, status=str(response.status_code)
+        )
+    warmup.mark_first_response()
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Pipeline metrics (connect/query/fetch/serialize/webhook/HTTP) in Prometheus text format."""
+    return Response(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
+
 
 @app.route('/', methods=['GET'])
 def health_check():
@@ -40,89 +127,496 @@ def health_check():
     }), 200
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness endpoint for startup probes.
+    
+    Returns:
+        200 once warm-up has finished (state 'ready', or 'degraded' if a step
+        failed; connections are then made on demand), 503 while warming up.
+        The body includes per-step results and the api_import, warmup and
+        first_response timings in seconds.
+    """
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.route('/api/pool/stats', methods=['GET'])
+def pool_stats():
+    """Connection pool statistics (sizes, checkout counts, wait times)."""
+    from connectors.connection_pool import get_all_pool_stats
+    
+    return jsonify({'pools': get_all_pool_stats()}), 200
+
+
+def run_birdeye_export(filters=None):
+    """
+    Run a filtered Birdeye export (executed by a background job worker).
+    
+    Args:
+        filters: Optional export filters (brand_name, start_date, end_date, ...),
+            already validated by the request handler
+        
+    Returns:
+        Dictionary with the export results (stored as the job result)
+    """
+    from connectors.odbc_connector import ODBCConnector
+    from connectors.webhook_sink import get_shared_session
+    from connectors.pipeline import Pipeline
+    from connectors.config_loader import get_pipeline_config
+    from services.birdeye_export import (build_birdeye_query, birdeye_export_schema, deliver_to_birdeye,
+                                         parse_filters)
+    
+    logger.info("Starting Birdeye export job")
+    
+    filters = filters or {}
+    output_path = 'exports/birdeye_export.json'
+    if filters:
+        logger.info(f"Filtering by {filters}")
+        # One file per filter set, so concurrent jobs with different filters don't overwrite each other
+        digest = hashlib.sha256(json.dumps(filters, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:12]
+        output_path = f'exports/birdeye_export_{digest}.json'
+    
+    # Load configuration
+    logger.info("Loading configuration")
+    DB_CONFIG = get_db_config()
+    
+    # Initialize connector
+    logger.info("Initializing database connector")
+    connector = ODBCConnector(
+        driver=DB_CONFIG['driver'],
+        server=DB_CONFIG['server'],
+        database=DB_CONFIG['database'],
+        username=DB_CONFIG['username'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG.get('port'),
+        use_pool=True
+    )
+    
+    # Check out a pooled connection using context manager
+    with connector:
+        logger.info("Connected to database successfully")
+        
+        # Filters are bound as query parameters, so the warehouse only scans the requested rows
+        query, params = build_birdeye_query(filters=parse_filters(filters))
+        
+        # Stream the rows into the export
+        logger.info("Executing data query")
+        count = 0
+        
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+        
+        logger.info("Exporting data for Birdeye")
+        with Pipeline('birdeye', **get_pipeline_config()) as pipeline:
+            rows = pipeline.stage('fetch', counted(connector.iter_query(query, params)))
+            output_file, _ = deliver_to_birdeye(rows, logger, output_path=output_path,
+                                                session=get_shared_session(), pipeline=pipeline,
+                                                schema=birdeye_export_schema(connector))
+        logger.info(f"Retrieved {count} records from database")
+        logger.info(f"Data exported successfully to {output_file}")
+    
+    result = {
+        'message': 'Birdeye export completed successfully',
+        'record_count': count,
+        'output_file': output_file
+    }
+    
+    if filters:
+        result['filters'] = filters
+        if filters.get('brand_name'):
+            result['brand_filter'] = filters['brand_name']
+    
+    logger.info("Birdeye export completed successfully")
+    return result
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Query result cache statistics (entries, size, hit/miss ratio)."""
+    return jsonify(get_query_cache().stats()), 200
+
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """
+    Invalidate cached query results.
+    
+    Optional JSON body:
+    {
+        "table": "databricks"  # Optional: only results that reference this table
+    }
+    
+    Returns:
+        JSON with the number of removed entries
+    """
+    data = request.get_json(silent=True) or {}
+    removed = get_query_cache().invalidate(table=data.get('table'))
+    logger.info(f"Invalidated {removed} cached query results")
+    return jsonify({'status': 'success', 'invalidated': removed}), 200
+
+
 @app.route('/api/birdeye/export', methods=['POST'])
 def trigger_birdeye_export():
     """
-    Trigger the Birdeye export script.
+    Queue a Birdeye export job.
     
-    Optional JSON body:
+    Optional JSON body (filters, pushed down into the query as bound parameters):
     {
-        "brand_name": "specific_brand"  # Optional: filter by brand
+        "brand_name": "specific_brand",     # or a list of brands
+        "start_date": "2024-01-01",         # install_date range, inclusive
+        "end_date": "2024-01-31",           # (default: the last 30 days)
+        "customer_state": "TX",
+        "product_of_interest": "Windows"
     }
     
+    An identical export that is already queued or running is reused
+    instead of starting a second one.
+    
     Returns:
-        JSON response with export results
+        202 with the job id and a status URL (poll GET /api/jobs/<job_id>),
+        400 for an unknown filter or invalid value
     """
+    from services.birdeye_export import parse_filters
+    
     logger.info("Received request to trigger Birdeye export")
     
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return jsonify({
+            'status': 'error',
+            'message': 'Request body must be a JSON object of filters'
+        }), 400
+    filters = {name: value for name, value in data.items() if value not in (None, '', [])}
     try:
-        # Get optional brand filter from request
-        data = request.get_json(silent=True) or {}
-        brand_filter = data.get('brand_name')
+        parse_filters(filters)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        params = {'filters': filters} if filters else {}
         
-        if brand_filter:
-            logger.info(f"Filtering by brand: {brand_filter}")
+        job, created = jobs.submit('birdeye_export', run_birdeye_export, params)
         
-        # Load configuration
-        logger.info("Loading configuration")
-        DB_CONFIG = get_db_config()
+        return jsonify({
+            'status': 'accepted',
+            'message': 'Birdeye export queued' if created else 'Identical Birdeye export already in progress',
+            'job_id': job['id'],
+            'job_status': job['status'],
+            'status_url': f"/api/jobs/{job['id']}"
+        }), 202
         
-        # Initialize connector
-        logger.info("Initializing database connector")
+    except Exception as e:
+        logger.error(f"Error queuing Birdeye export: {e}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+
+# Records per page of /api/birdeye/records (default and maximum ?limit=)
+PAGE_DEFAULT_LIMIT = 1000
+PAGE_MAX_LIMIT = 10000
+
+
+@app.route('/api/birdeye/records', methods=['GET'])
+def birdeye_records():
+    """
+    Page through Birdeye records, newest install first.
+    
+    Query parameters:
+        brand_name, start_date, end_date, customer_state, product_of_interest:
+            Filters as for POST /api/birdeye/export (repeat a parameter for "any of")
+        limit: Records per page (default 1000, at most 10000)
+        cursor: next_cursor of the previous page
+    
+    Pages use keyset pagination on (install_date, src_lead_id), so each one
+    is a seek on that key rather than an OFFSET scan. A cursor is only
+    valid with the filters it was issued for. First pages (no cursor) are
+    served from the query cache for a few seconds.
+    
+    Returns:
+        200 with {"data": [...], "count": n, "next_cursor": token or null},
+        encoded with the configured SERIALIZER; 400 for invalid filters, limit
+        or cursor
+    """
+    from connectors.odbc_connector import ODBCConnector
+    from connectors.keyset import InvalidCursorError
+    from connectors.serializers import get_serializer
+    from connectors.config_loader import get_serializer_name
+    from services.birdeye_export import fetch_page, parse_filters
+    
+    args = request.args.to_dict(flat=False)
+    cursor = args.pop('cursor', [None])[-1]
+    try:
+        limit = int(args.pop('limit', [PAGE_DEFAULT_LIMIT])[-1])
+        if not 1 <= limit <= PAGE_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {PAGE_MAX_LIMIT}")
+        filters = parse_filters({name: values if len(values) > 1 else values[0] for name, values in args.items()})
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    try:
+        DB_CONFIG = get_db_config()
         connector = ODBCConnector(
             driver=DB_CONFIG['driver'],
             server=DB_CONFIG['server'],
             database=DB_CONFIG['database'],
             username=DB_CONFIG['username'],
             password=DB_CONFIG['password'],
-            port=DB_CONFIG.get('port')
+            port=DB_CONFIG.get('port'),
+            use_pool=True,
+            cache=get_query_cache()
         )
-        
-        # Connect to database using context manager
         with connector:
-            logger.info("Connected to database successfully")
-            
-            # Simple test query - just get one record
-            query = "SELECT * FROM databricks LIMIT 1"
-            params = None
-            
-            # Execute query
-            logger.info("Executing data query")
-            if params:
-                results = connector.execute_query(query, params)
-            else:
-                results = connector.execute_query(query)
-            
-            logger.info(f"Retrieved {len(results)} records from database")
-            
-            # Export data for Birdeye
-            logger.info("Exporting data for Birdeye")
-            output_file = export_to_birdeye(results, logger)
-            logger.info(f"Data exported successfully to {output_file}")
-        
-        # Prepare response
-        response = {
-            'status': 'success',
-            'message': 'Birdeye export completed successfully',
-            'record_count': len(results),
-            'output_file': output_file
-        }
-        
-        if brand_filter:
-            response['brand_filter'] = brand_filter
-        
-        logger.info("Birdeye export completed successfully")
-        return jsonify(response), 200
+            records, next_cursor = fetch_page(connector, filters, cursor, limit)
+    except InvalidCursorError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error fetching Birdeye records: {e}", exc_info=True)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+    
+    serializer = get_serializer(get_serializer_name())
+    body = serializer.encode_batch([serializer.encode(record) for record in records],
+                                   count=len(records), next_cursor=next_cursor)
+    return Response(body, content_type=serializer.content_type)
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Get the status of a background job.
+    
+    Returns:
+        JSON with status (queued, running, succeeded, failed), timings,
+        the job result (e.g. record_count, output_file) or error
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': f"Job {job_id} not found"
+        }), 404
+    
+    return jsonify(job), 200
+
+
+def run_spool_replay(service=None):
+    """
+    Replay the delivery spool (executed by a background job worker).
+    
+    Args:
+        service: Optional service filter (e.g. 'birdeye')
         
+    Returns:
+        Replay summary (stored as the job result)
+    """
+    from connectors.delivery_spool import replay_pending
+    from connectors.webhook_sink import get_shared_session
+    
+    summary = replay_pending(session=get_shared_session(), service=service)
+    if summary is None:
+        return {'message': 'Delivery spool is disabled (SPOOL=false)'}
+    return summary
+
+
+@app.route('/api/webhooks/state', methods=['GET'])
+def webhook_state():
+    """Adaptive delivery state per destination host (concurrency limit, circuit, pauses, outcomes)."""
+    from connectors.delivery_controller import get_controllers
+    
+    return jsonify({'destinations': [controller.state() for controller in get_controllers()]}), 200
+
+
+@app.route('/api/spool/stats', methods=['GET'])
+def spool_stats():
+    """Delivery spool backlog (pending batches, records and bytes, oldest pending age)."""
+    from connectors.delivery_spool import get_spool
+    
+    spool = get_spool()
+    if spool is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(dict(spool.stats(), enabled=True)), 200
+
+
+@app.route('/api/spool/replay', methods=['POST'])
+def trigger_spool_replay():
+    """
+    Queue a replay of the webhook batches in the delivery spool.
+    
+    Optional JSON body:
+    {
+        "service": "birdeye"  # Optional: only replay this service's batches
+    }
+    
+    Returns:
+        202 with the job id and a status URL (poll GET /api/jobs/<job_id>)
+    """
+    data = request.get_json(silent=True) or {}
+    params = {}
+    if data.get('service'):
+        params['service'] = data['service']
+    
+    job, created = jobs.submit('spool_replay', run_spool_replay, params)
+    
+    return jsonify({
+        'status': 'accepted',
+        'message': 'Spool replay queued' if created else 'Spool replay already in progress',
+        'job_id': job['id'],
+        'job_status': job['status'],
+        'status_url': f"/api/jobs/{job['id']}"
+    }), 202
+
+
+# Jobs that can be streamed by /api/export/<job>/stream: service module with iter_export_records(connector),
+# and parse_filters()/iter_export_records(connector, filters) if the job takes filters
+STREAM_JOBS = {
+    'birdeye_export': 'services.birdeye_export',
+    'example_service': 'services.example_service',
+}
+
+
+def _wants_gzip():
+    """gzip the stream if ?gzip=true|false says so, otherwise if the client accepts it."""
+    value = request.args.get('gzip')
+    if value is not None:
+        return value.lower() in ('1', 'true', 'yes')
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+
+@app.route('/api/export/<job>/stream', methods=['GET'])
+def stream_export(job):
+    """
+    Stream a job's records straight from the database cursor.
+    
+    Query parameters:
+        format: ndjson (default) or csv
+        gzip: true/false (defaults to the client's Accept-Encoding)
+        Any other parameter is a filter (birdeye_export: brand_name,
+        start_date, end_date, customer_state, product_of_interest)
+    
+    Rows are encoded and sent in chunks as they are fetched, so the result
+    set is never held in memory. If the client disconnects, the server
+    closes the response generator and the query is cancelled.
+    
+    Returns:
+        200 with a chunked application/x-ndjson or text/csv body,
+        400 for an unknown format or invalid filters, 404 for an unknown job,
+        500 if the query fails before the first chunk
+    """
+    import importlib
+    from connectors.export_utils import ExportStream, STREAM_FORMATS
+    from connectors.odbc_connector import ODBCConnector
+    from connectors.config_loader import get_serializer_name
+    
+    if job not in STREAM_JOBS:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unknown export job: {job} (choose from {', '.join(STREAM_JOBS)})"
+        }), 404
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in STREAM_FORMATS:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unsupported format: {export_format} (choose from {', '.join(STREAM_FORMATS)})"
+        }), 400
+    compression = 'gzip' if _wants_gzip() else None
+    
+    service = importlib.import_module(STREAM_JOBS[job])
+    filters = {name: values if len(values) > 1 else values[0]
+               for name, values in request.args.to_dict(flat=False).items() if name not in ('format', 'gzip')}
+    options = {}
+    try:
+        if filters:
+            if not hasattr(service, 'parse_filters'):
+                raise ValueError(f"{job} does not take filters")
+            options['filters'] = service.parse_filters(filters)
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    logger.info(f"Streaming {job} export as {export_format}{' (gzip)' if compression else ''}")
+    
+    DB_CONFIG = get_db_config()
+    connector = ODBCConnector(
+        driver=DB_CONFIG['driver'],
+        server=DB_CONFIG['server'],
+        database=DB_CONFIG['database'],
+        username=DB_CONFIG['username'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG.get('port'),
+        use_pool=True
+    )
+    
+    try:
+        connector.connect()
+        stream = ExportStream(service.iter_export_records(connector, **options), export_format,
+                              compression=compression, serializer=get_serializer_name())
+        chunks = iter(stream)
+        # Run the query now so a failure is still a proper error response
+        first = next(chunks, b'')
     except Exception as e:
-        logger.error(f"Error during Birdeye export: {e}", exc_info=True)
+        connector.close()
+        metrics.STREAM_EXPORTS.inc(job=job, outcome='error')
+        logger.error(f"Error starting {job} stream: {e}", exc_info=True)
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
+    
+    def generate():
+        outcome = 'disconnected'
+        try:
+            yield first
+            yield from chunks
+            outcome = 'completed'
+        except Exception as e:
+            outcome = 'error'
+            logger.error(f"Error streaming {job} export: {e}", exc_info=True)
+            # Re-raise so the server drops the connection without the final chunk;
+            # the client sees a truncated transfer instead of a complete export
+            raise
+        finally:
+            # Closing the chunk generator closes the cursor (cancelling it if unfinished)
+            chunks.close()
+            connector.close()
+            metrics.STREAM_EXPORTS.inc(job=job, outcome=outcome)
+            metrics.STREAM_EXPORT_ROWS.inc(stream.count, job=job)
+            logger.info(f"Stream of {job} {outcome}: {stream.count} rows, {stream.bytes_sent} bytes")
+    
+    response = Response(generate(), content_type=stream.content_type)
+    if compression:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+warmup.record('api_import', time.perf_counter() - _IMPORT_STARTED)
+logger.info(f"API module imported in {warmup.timings['api_import']:.3f}s")
 
 
 if __name__ == "__main__":
+    warmup.start()
     # Development server
     port = int(os.environ.get('PORT', 8080))
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -0,0 +1,109 @@
+"""
+Cold-start Benchmark
+
+Measures how long a fresh API process takes to import api.py and to answer
+its first request, with the heavy modules deferred to the background
+warm-up (lazy, the default) or imported up front (eager, the previous
+behaviour). Each sample is a new interpreter, so nothing is cached between
+samples except the OS page cache.
+
+Time to first response is measured from spawning the interpreter, so it
+includes Python startup. Database warm-up is off unless WARMUP_DB is set,
+since no database is needed to answer the first request.
+
+Usage:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --samples 10 --output /tmp/cold_start.json
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+
+MODES = ('lazy', 'eager')
+
+
+def run_child(mode):
+    """Import the API in this (fresh) process, serve one request and print timings as JSON."""
+    sys.path.insert(0, REPO_DIR)
+    started = time.perf_counter()
+    if mode == 'eager':
+        import importlib
+        from connectors.warmup import WARM_IMPORTS
+        for module in WARM_IMPORTS:
+            importlib.import_module(module)
+    import api
+    imported = time.perf_counter()
+
+    response = api.app.test_client().get('/')
+    first_response_at = time.time()
+    responded = time.perf_counter()
+    api.warmup.wait(60)
+
+    print(json.dumps({
+        'mode': mode,
+        'status': response.status_code,
+        'import_seconds': round(imported - started, 4),
+        'first_request_seconds': round(responded - imported, 4),
+        'first_response_at': first_response_at,
+        'warmup_seconds': api.warmup.timings.get('warmup'),
+        'warmup_state': api.warmup.status()['state'],
+    }))
+
+
+def sample(mode, env):
+    """Spawn one interpreter and return its timings."""
+    spawned_at = time.time()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode],
+        env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} sample failed:\n{proc.stderr.strip()}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['time_to_first_response'] = round(result.pop('first_response_at') - spawned_at, 4)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure API import time and time to first response")
+    parser.add_argument('--samples', type=int, default=5, help="Fresh processes per mode (default 5)")
+    parser.add_argument('--output', help="Optional JSON results file")
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='databridge-coldstart-') as log_dir:
+        env = dict(os.environ, LOG_DIR=log_dir)
+        env.setdefault('WARMUP_DB', 'false')
+        for mode in MODES:
+            samples = [sample(mode, env) for _ in range(args.samples)]
+            results[mode] = {
+                key: round(statistics.median(s[key] for s in samples), 4)
+                for key in ('import_seconds', 'time_to_first_response', 'warmup_seconds')
+            }
+            results[mode]['samples'] = samples
+            print(f"{mode:<6} import {results[mode]['import_seconds']:.3f}s  "
+                  f"first response {results[mode]['time_to_first_response']:.3f}s  "
+                  f"warm-up {results[mode]['warmup_seconds']:.3f}s  (median of {args.samples})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Fake warehouse for offline benchmarks
+
+Stand-in for a pyodbc connection/cursor that yields synthetic `databricks`
+rows, so the connector and export hot paths can be measured without a
+database or network. Rows are generated lazily from a small pool of
+pre-built rows, so 10M-row runs only cost memory and time in the code under
+test.
+"""
+
+import datetime
+import decimal
+import time
+from itertools import islice
+from typing import Any, Dict, Iterator
+
+# Column names and order of the databricks columns selected by the services
+COLUMNS = [
+    'src_lead_id', 'brand', 'customer_name', 'customer_email', 'customer_phone',
+    'customer_address_1', 'customer_city', 'customer_state', 'customer_zip_postal',
+    'product_of_interest', 'install_date', 'revenue', 'appt_statuses',
+    'enterprise_ad_sub_category', 'bookings_gross', 'lead_created_date',
+]
+
+_BRANDS = ['Acme Windows', 'BrightBath', 'RoofRight', 'SunPanel Co']
+_STATES = ['TX', 'CA', 'FL', 'NY', 'OH']
+_STATUSES = ['Installed', 'Scheduled', 'Cancelled', 'Completed']
+_PRODUCTS = ['Windows', 'Bath', 'Roofing', 'Solar']
+_SOURCES = ['Web', 'TV', 'Radio', 'Referral', None]
+
+# cursor.description entries as pyodbc reports them:
+# (name, type_code, display_size, internal_size, precision, scale, null_ok)
+DESCRIPTION = [
+    (name, type_code, None, None, precision, scale, True)
+    for name, (type_code, precision, scale) in zip(COLUMNS, [
+        (int, 10, 0), (str, 100, 0), (str, 255, 0), (str, 255, 0), (str, 50, 0),
+        (str, 255, 0), (str, 100, 0), (str, 2, 0), (str, 10, 0),
+        (str, 100, 0), (datetime.date, 10, 0), (decimal.Decimal, 12, 2), (str, 100, 0),
+        (str, 100, 0), (decimal.Decimal, 12, 2), (datetime.datetime, 19, 0),
+    ])
+]
+
+# Distinct rows generated up front and cycled through
+ROW_POOL_SIZE = 1000
+
+
+def make_row(i: int) -> tuple:
+    """Build one synthetic databricks row (deterministic for a given index)."""
+    base_date = datetime.date(2024, 1, 1)
+    return (
+        100000 + i,
+        _BRANDS[i % len(_BRANDS)],
+        f"Customer {i}",
+        f"customer{i}@example.com",
+        f"555-{i % 10000:04d}",
+        f"{i % 9999} Main Street",
+        f"City {i % 250}",
+        _STATES[i % len(_STATES)],
+        f"{10000 + i % 89999:05d}",
+        _PRODUCTS[i % len(_PRODUCTS)],
+        base_date + datetime.timedelta(days=i % 365),
+        decimal.Decimal(f"{1000 + i % 50000}.{i % 100:02d}"),
+        _STATUSES[i % len(_STATUSES)],
+        _SOURCES[i % len(_SOURCES)],
+        decimal.Decimal(f"{500 + i % 20000}.50") if i % 3 else None,
+        datetime.datetime(2024, 1, 1, 8, 0) + datetime.timedelta(minutes=i % 525600),
+    )
+
+
+_row_pool = None
+_record_pool = None
+
+
+def iter_rows(count: int) -> Iterator[tuple]:
+    """Yield `count` synthetic row tuples (cycling through ROW_POOL_SIZE distinct rows)."""
+    global _row_pool
+    if _row_pool is None:
+        _row_pool = [make_row(i) for i in range(ROW_POOL_SIZE)]
+    pool = _row_pool
+    for i in range(count):
+        yield pool[i % ROW_POOL_SIZE]
+
+
+def iter_records(count: int) -> Iterator[Dict[str, Any]]:
+    """Yield `count` synthetic row dictionaries, as returned by ODBCConnector.iter_query."""
+    global _record_pool
+    if _record_pool is None:
+        _record_pool = [dict(zip(COLUMNS, row)) for row in iter_rows(ROW_POOL_SIZE)]
+    pool = _record_pool
+    for i in range(count):
+        yield pool[i % ROW_POOL_SIZE]
+
+
+class FakeCursor:
+    """
+    Cursor returning `row_count` synthetic rows for any SELECT.
+
+    fetch_latency adds a sleep per fetchmany call, standing in for the
+    network round trip of a real driver (which also releases the GIL).
+    """
+
+    def __init__(self, row_count: int, fetch_latency: float = 0.0):
+        self.row_count = row_count
+        self.fetch_latency = fetch_latency
+        self.description = None
+        self.rowcount = -1
+        self.fast_executemany = False
+        self._rows = iter(())
+
+    def execute(self, query, *params):
+        self.description = DESCRIPTION
+        self._rows = iter_rows(self.row_count)
+        return self
+
+    def executemany(self, query, seq):
+        self.rowcount = len(seq)
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchmany(self, size=1):
+        if self.fetch_latency:
+            time.sleep(self.fetch_latency)
+        return list(islice(self._rows, size))
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def cancel(self):
+        self._rows = iter(())
+
+    def close(self):
+        self._rows = iter(())
+
+
+class FakeConnection:
+    """Connection whose cursors yield `row_count` synthetic rows."""
+
+    def __init__(self, row_count: int, fetch_latency: float = 0.0):
+        self.row_count = row_count
+        self.fetch_latency = fetch_latency
+
+    def cursor(self):
+        return FakeCursor(self.row_count, self.fetch_latency)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
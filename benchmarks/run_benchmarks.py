@@ -0,0 +1,412 @@
+"""
+Offline Benchmarks
+
+Measures throughput (rows/sec) and peak RSS of the connector, transform and
+export hot paths without a database or network: queries run against a fake
+pyodbc connection yielding synthetic databricks rows (fake_warehouse.py) and
+webhooks are delivered to a local mock HTTP server.
+
+Each benchmark/size pair runs in a fresh subprocess so peak RSS is measured
+per benchmark. Results are saved as JSON so runs can be compared between
+versions.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --rows 10000,1000000,10000000 --max-materialize 0
+    python benchmarks/run_benchmarks.py --only execute_query,process_data --rows 100000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/previous.json
+    PIPELINE=false python benchmarks/run_benchmarks.py --only export_pipeline \
+        --fetch-latency 0.005 --webhook-latency 0.02
+    python benchmarks/run_benchmarks.py --only export_pipeline --webhook-latency 0.02 \
+        --webhook-max-concurrency 2
+"""
+
+import sys
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+
+# Add repo and services directories to path to import modules
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'services'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+DEFAULT_ROWS = '10000,1000000,10000000'
+
+# Benchmarks that hold the whole result set in memory; skipped above --max-materialize
+MATERIALIZING = {'execute_query', 'execute_query_namedtuple', 'process_data', 'reread_export'}
+
+QUERY = "SELECT * FROM databricks"
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _connector(row_count, row_factory='dict'):
+    from connectors.odbc_connector import ODBCConnector
+    from fake_warehouse import FakeConnection
+
+    connector = ODBCConnector('Fake Driver', 'localhost', 'benchmark', 'user', 'password',
+                              row_factory=row_factory)
+    connector.connection = FakeConnection(row_count, float(os.environ.get('BENCHMARK_FETCH_LATENCY', '0')))
+    return connector
+
+
+def bench_execute_query(row_count, workdir):
+    connector = _connector(row_count)
+    return lambda: len(connector.execute_query(QUERY, cache_ttl=0))
+
+
+def bench_execute_query_namedtuple(row_count, workdir):
+    connector = _connector(row_count, row_factory='namedtuple')
+    return lambda: len(connector.execute_query(QUERY, cache_ttl=0))
+
+
+def bench_iter_query(row_count, workdir):
+    connector = _connector(row_count)
+    return lambda: sum(1 for _ in connector.iter_query(QUERY))
+
+
+def bench_process_data(row_count, workdir):
+    from example_service import process_data
+    from fake_warehouse import iter_records
+
+    rows = list(iter_records(row_count))
+    return lambda: len(process_data(rows))
+
+
+def bench_process_columns(row_count, workdir):
+    from example_service import EXPORT_MAPPING
+
+    connector = _connector(row_count)
+    return lambda: sum(1 for _ in EXPORT_MAPPING.iter_transform_columns(connector.iter_query_columns(QUERY)))
+
+
+def bench_export_serialization(row_count, workdir):
+    from connectors.config_loader import get_export_config
+    from connectors.export_utils import write_export
+    from fake_warehouse import iter_records
+
+    output_path = os.path.join(workdir, 'export.json')
+    return lambda: write_export(iter_records(row_count), output_path, **get_export_config()).count
+
+
+def bench_webhook_batching(row_count, workdir):
+    from connectors.config_loader import get_endpoint, get_webhook_config
+    from connectors.webhook_sink import WebhookSink
+    from fake_warehouse import iter_records
+
+    def run():
+        with WebhookSink(get_endpoint('benchmark'), 'benchmark', **get_webhook_config()) as sink:
+            summary = sink.send(iter_records(row_count))
+        if summary['failed_batches']:
+            raise RuntimeError(f"{summary['failed_batches']} batches failed")
+        return summary['records_sent']
+    return run
+
+
+def bench_export_to_birdeye(row_count, workdir):
+    from birdeye_export import deliver_to_birdeye
+    from fake_warehouse import iter_records
+
+    logger = logging.getLogger('benchmark')
+    output_path = os.path.join(workdir, 'birdeye_export.json')
+
+    def run():
+        _, summary = deliver_to_birdeye(iter_records(row_count), logger, output_path)
+        if summary is None or summary['failed_batches']:
+            raise RuntimeError("Birdeye delivery to the mock endpoint failed")
+        return summary['records_sent']
+    return run
+
+
+def bench_export_pipeline(row_count, workdir):
+    from birdeye_export import deliver_to_birdeye
+    from connectors.config_loader import get_pipeline_config
+    from connectors.pipeline import Pipeline
+
+    connector = _connector(row_count)
+    logger = logging.getLogger('benchmark')
+    output_path = os.path.join(workdir, 'birdeye_export.json')
+
+    # Same wiring as birdeye_export.run_export; PIPELINE=false runs it sequentially
+    def run():
+        with Pipeline('birdeye', **get_pipeline_config()) as pipeline:
+            data = pipeline.stage('fetch', connector.iter_query(QUERY))
+            _, summary = deliver_to_birdeye(data, logger, output_path, pipeline=pipeline)
+        if summary is None or summary['failed_batches']:
+            raise RuntimeError("Birdeye delivery to the mock endpoint failed")
+        return summary['records_sent']
+    return run
+
+
+def bench_export_columnar(row_count, workdir):
+    from connectors.columnar_export import write_query_export
+    from connectors.config_loader import get_export_config
+
+    connector = _connector(row_count)
+    config = get_export_config()
+    if config['export_format'] not in ('parquet', 'arrow'):
+        config = {'export_format': 'parquet', 'compression': 'zstd'}
+    output_path = os.path.join(workdir, 'export.parquet')
+
+    # Row groups straight from the cursor, typed from cursor.description
+    return lambda: write_query_export(connector, QUERY, output_path, export_format=config['export_format'],
+                                      compression=config['compression']).count
+
+
+def bench_reread_export(row_count, workdir):
+    from connectors.config_loader import get_export_config
+    from connectors.export_utils import write_export
+    from fake_warehouse import iter_records
+
+    # Writes the export in the EXPORT_FORMAT/EXPORT_COMPRESSION under test (not timed),
+    # then times reading two of its columns back
+    config = get_export_config()
+    path = write_export(iter_records(row_count), os.path.join(workdir, 'export.json'), **config).path
+    columns = ['src_lead_id', 'revenue']
+
+    def run():
+        if config['export_format'] in ('parquet', 'arrow'):
+            from connectors.columnar_export import read_export
+            return read_export(path, columns=columns).num_rows
+        if config['export_format'] != 'json' or config['compression']:
+            raise RuntimeError("reread_export compares parquet/arrow with uncompressed EXPORT_FORMAT=json")
+        with open(path, 'rb') as f:
+            return len([(record['src_lead_id'], record['revenue']) for record in json.load(f)])
+    return run
+
+
+BENCHMARKS = {
+    'execute_query': bench_execute_query,
+    'execute_query_namedtuple': bench_execute_query_namedtuple,
+    'iter_query': bench_iter_query,
+    'process_data': bench_process_data,
+    'process_columns': bench_process_columns,
+    'export_serialization': bench_export_serialization,
+    'webhook_batching': bench_webhook_batching,
+    'export_to_birdeye': bench_export_to_birdeye,
+    'export_pipeline': bench_export_pipeline,
+    'export_columnar': bench_export_columnar,
+    'reread_export': bench_reread_export,
+}
+
+
+def run_child(name, row_count):
+    """Run one benchmark in this process and print its result as JSON."""
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix='databridge-bench-') as workdir:
+        run = BENCHMARKS[name](row_count, workdir)
+        baseline_rss = _peak_rss_mb()
+        started = time.perf_counter()
+        processed = run()
+        elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        'benchmark': name,
+        'rows': row_count,
+        'processed': processed,
+        'elapsed': round(elapsed, 4),
+        'rows_per_sec': round(processed / elapsed, 1) if elapsed else None,
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+    }))
+
+
+class _MockWebhookHandler(BaseHTTPRequestHandler):
+    """
+    Accepts any POST with a 200 (after `latency` seconds), discarding the body.
+
+    With max_concurrency set, a POST arriving while that many are in progress
+    gets a 429 with `Retry-After: retry_after`, like a rate-limited endpoint.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    max_concurrency = 0
+    retry_after = 1
+    in_flight = 0
+    throttled = 0
+    lock = threading.Lock()
+
+    def _reply(self, status, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        cls = type(self)
+        with cls.lock:
+            if cls.max_concurrency and cls.in_flight >= cls.max_concurrency:
+                cls.throttled += 1
+                throttled = True
+            else:
+                cls.in_flight += 1
+                throttled = False
+        if throttled:
+            self._reply(429, [('Retry-After', str(cls.retry_after))])
+            return
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            self._reply(200)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(latency=0.0, max_concurrency=0, retry_after=1):
+    """Start the mock webhook server on a free local port; returns (server, url)."""
+    _MockWebhookHandler.latency = latency
+    _MockWebhookHandler.max_concurrency = max_concurrency
+    _MockWebhookHandler.retry_after = retry_after
+    _MockWebhookHandler.throttled = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _MockWebhookHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/webhook"
+
+
+def git_commit():
+    """Current git commit of the repo, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print rows/sec and peak RSS changes against a previous results file."""
+    with open(baseline_path, 'r') as f:
+        baseline = {(r['benchmark'], r['rows']): r for r in json.load(f)['results']}
+
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result['benchmark'], result['rows']))
+        if not previous or not previous.get('rows_per_sec') or not result.get('rows_per_sec'):
+            continue
+        speed = result['rows_per_sec'] / previous['rows_per_sec'] - 1
+        rss = result['peak_rss_mb'] - previous['peak_rss_mb']
+        print(f"  {result['benchmark']:<22} {result['rows']:>10,} rows  "
+              f"{speed:+7.1%} rows/sec  {rss:+8.1f} MB peak RSS")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline ODBC Data Bridge benchmarks")
+    parser.add_argument('--rows', default=DEFAULT_ROWS,
+                        help=f"Comma-separated row counts (default {DEFAULT_ROWS})")
+    parser.add_argument('--only', help="Comma-separated benchmark names (default: all)")
+    parser.add_argument('--max-materialize', type=int, default=1_000_000,
+                        help="Skip benchmarks that hold every row in memory above this many rows "
+                             "(0 = no limit, default 1000000)")
+    parser.add_argument('--output', help="Results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', help="Previous results file to compare against")
+    parser.add_argument('--fetch-latency', type=float, default=0.0,
+                        help="Simulated database round trip per fetch, in seconds (default 0)")
+    parser.add_argument('--webhook-latency', type=float, default=0.0,
+                        help="Simulated webhook response time per POST, in seconds (default 0)")
+    parser.add_argument('--webhook-max-concurrency', type=int, default=0,
+                        help="Answer 429 + Retry-After above this many concurrent POSTs (default 0 = never)")
+    parser.add_argument('--child', nargs=2, metavar=('BENCHMARK', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+    sizes = [int(size) for size in args.rows.split(',')]
+
+    server, url = start_mock_server(args.webhook_latency, args.webhook_max_concurrency)
+    env = dict(os.environ, BENCHMARK_ENDPOINT=url, BIRDEYE_ENDPOINT=url,
+               BENCHMARK_FETCH_LATENCY=str(args.fetch_latency))
+
+    results = []
+    try:
+        for row_count in sizes:
+            for name in names:
+                if name in MATERIALIZING and args.max_materialize and row_count > args.max_materialize:
+                    print(f"{name:<22} {row_count:>10,} rows  skipped (above --max-materialize)")
+                    results.append({'benchmark': name, 'rows': row_count, 'skipped': 'max_materialize'})
+                    continue
+
+                proc = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', name, str(row_count)],
+                    env=env, capture_output=True, text=True
+                )
+                if proc.returncode != 0:
+                    print(f"{name:<22} {row_count:>10,} rows  FAILED")
+                    print(proc.stderr.strip(), file=sys.stderr)
+                    results.append({'benchmark': name, 'rows': row_count,
+                                    'error': proc.stderr.strip().splitlines()[-1:]})
+                    continue
+
+                result = json.loads(proc.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{name:<22} {row_count:>10,} rows  {result['elapsed']:9.3f}s  "
+                      f"{result['rows_per_sec']:>12,.0f} rows/sec  {result['peak_rss_mb']:8.1f} MB peak RSS")
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, 'results', f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'settings': dict(
+                {key: os.environ[key] for key in sorted(os.environ)
+                 if key.startswith(('EXPORT_', 'WEBHOOK_', 'SERIALIZER', 'PIPELINE'))},
+                fetch_latency=args.fetch_latency, webhook_latency=args.webhook_latency,
+                webhook_max_concurrency=args.webhook_max_concurrency),
+            'results': results,
+        }, f, indent=2)
+    if _MockWebhookHandler.throttled:
+        print(f"Mock webhook throttled {_MockWebhookHandler.throttled} requests (429)")
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""
+Columnar Exports (Parquet / Arrow IPC)
+
+Writes exports as typed columns instead of JSON text, for downstream jobs
+that re-read them:
+
+    parquet  Compressed row groups (zstd by default); readers fetch only the
+             columns they need
+    arrow    Arrow IPC file format; uncompressed files can be memory-mapped
+             and read without copying or parsing
+
+Rows are buffered into record batches of row_group_size rows and written one
+row group at a time, so memory stays bounded however large the result. The
+schema comes from cursor.description (ODBCConnector.iter_query_arrow), from
+an explicit pyarrow schema, or is inferred from the first row group.
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import datetime
+import decimal
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from connectors import metrics
+from connectors.export_utils import COLUMNAR_FORMATS, resolve_export_path
+from connectors.rows import row_to_dict
+
+# Codecs per format (None = uncompressed); Arrow IPC only compresses with lz4/zstd
+COLUMNAR_COMPRESSIONS = {
+    'parquet': (None, 'snappy', 'gzip', 'zstd', 'lz4', 'brotli'),
+    'arrow': (None, 'zstd', 'lz4'),
+}
+
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+_PARQUET_MAGIC = b'PAR1'
+_ARROW_MAGIC = b'ARROW1'
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet/Arrow exports require the pyarrow package (pip install pyarrow)")
+    return pyarrow
+
+
+def _arrow_type(pa, python_type: Any, precision: Optional[int] = None, scale: Optional[int] = None):
+    """Arrow type for a pyodbc type_code (a Python type), or None if unknown."""
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is decimal.Decimal:
+        if precision and 0 < precision <= 38 and scale is not None and 0 <= scale <= precision:
+            return pa.decimal128(precision, scale)
+        return pa.decimal128(38, scale if scale is not None and 0 <= scale <= 38 else 10)
+    if python_type is datetime.datetime:
+        return pa.timestamp('us')
+    if python_type is datetime.date:
+        return pa.date32()
+    if python_type is datetime.time:
+        return pa.time64('us')
+    if python_type in (bytes, bytearray):
+        return pa.binary()
+    if python_type is str:
+        return pa.string()
+    return None
+
+
+def _infer_type(pa, values: Iterable[Any]):
+    """Arrow type from sample values: the first non-null value's type (string if all null)."""
+    sample = None
+    scale = 0
+    for value in values:
+        if value is None:
+            continue
+        if sample is None:
+            sample = type(value)
+        if sample is decimal.Decimal and isinstance(value, decimal.Decimal):
+            # Widest scale seen, so every sampled value fits
+            scale = max(scale, -value.as_tuple().exponent)
+        elif sample is not decimal.Decimal:
+            break
+    if sample is None:
+        return pa.string()
+    return _arrow_type(pa, sample, scale=scale) or pa.string()
+
+
+def arrow_schema(description: Sequence[Sequence[Any]], rows: Optional[Sequence[Sequence[Any]]] = None):
+    """
+    Build a pyarrow schema from a DB-API cursor.description.
+
+    pyodbc reports each column's Python type, precision, scale and
+    nullability; columns whose type is not reported are inferred from
+    `rows`, or stored as strings.
+
+    Args:
+        description: cursor.description
+        rows: Optional first batch of rows, for columns without a type
+
+    Returns:
+        pyarrow.Schema
+    """
+    pa = _pyarrow()
+    fields = []
+    for index, column in enumerate(description):
+        name, type_code, _, _, precision, scale, null_ok = (tuple(column) + (None,) * 7)[:7]
+        arrow_type = _arrow_type(pa, type_code, precision, scale)
+        if arrow_type is None:
+            arrow_type = _infer_type(pa, (row[index] for row in rows)) if rows else pa.string()
+        fields.append(pa.field(name, arrow_type, nullable=null_ok is not False))
+    return pa.schema(fields)
+
+
+def infer_schema(records: Sequence[Dict[str, Any]]):
+    """
+    Build a pyarrow schema from a group of record dictionaries.
+
+    Column order follows the first record; each column's type is that of
+    its first non-null value.
+
+    Args:
+        records: Sample records (e.g. the first row group)
+
+    Returns:
+        pyarrow.Schema
+    """
+    pa = _pyarrow()
+    names: Dict[str, None] = {}
+    for record in records:
+        names.update(dict.fromkeys(record))
+    return pa.schema([
+        pa.field(name, _infer_type(pa, (record.get(name) for record in records)))
+        for name in names
+    ])
+
+
+def rows_to_batch(rows: Sequence[Sequence[Any]], schema):
+    """
+    Build a record batch from cursor rows, one typed array per column.
+
+    Args:
+        rows: Rows in schema column order (e.g. a fetchmany batch)
+        schema: pyarrow.Schema from arrow_schema
+
+    Returns:
+        pyarrow.RecordBatch
+    """
+    pa = _pyarrow()
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for field, values in zip(schema, columns)],
+        schema=schema
+    )
+
+
+class ColumnarExportWriter:
+    """
+    Streaming Parquet / Arrow IPC export file writer.
+
+    Same interface as ExportWriter (write, write_many, tee, close, abort,
+    path, count), plus write_batch for record batches straight from
+    ODBCConnector.iter_query_arrow. Output goes to a temporary file that is
+    atomically renamed into place when the writer is closed successfully.
+
+    Records are buffered and written as one row group per row_group_size
+    rows. Without a schema, it is inferred from the first row group, so pass
+    schema= (e.g. arrow_schema(cursor.description)) when later rows may hold
+    wider decimals or values of another type.
+
+    Usage:
+        from connectors.columnar_export import ColumnarExportWriter
+
+        with ColumnarExportWriter('exports/leads.parquet', compression='zstd') as writer:
+            for batch in connector.iter_query_arrow(query):
+                writer.write_batch(batch)
+
+        print(writer.path, writer.count, writer.row_groups)
+    """
+
+    def __init__(self, output_path: str, export_format: str = 'parquet',
+                 compression: Optional[str] = None, compress_level: Optional[int] = None,
+                 columns: Optional[Sequence[str]] = None, serializer: Any = None,
+                 schema: Any = None, row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        """
+        Prepare a temporary file next to the final export path.
+
+        Args:
+            output_path: Requested output path (extension adjusted by resolve_export_path)
+            export_format: 'parquet' or 'arrow'
+            compression: Codec from COLUMNAR_COMPRESSIONS, or None for none
+                (Arrow files are only zero-copy when uncompressed)
+            compress_level: Optional codec level
+            columns: Column names for plain tuple rows (row_factory='tuple')
+            serializer: Ignored, values are stored as typed columns; accepted
+                so get_export_config() can be passed to either writer
+            schema: Optional pyarrow.Schema (inferred from the first row group if None)
+            row_group_size: Rows per row group / record batch
+        """
+        if export_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar export format: {export_format}")
+        if compression not in COLUMNAR_COMPRESSIONS[export_format]:
+            raise ValueError(f"Unsupported {export_format} compression: {compression}")
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be at least 1")
+        self._pa = _pyarrow()
+
+        self.export_format = export_format
+        self.compression = compression
+        self.compress_level = compress_level
+        self.columns = columns
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.path = resolve_export_path(output_path, export_format, compression)
+        self.count = 0
+        self.row_groups = 0
+        self.bytes_written = 0
+        self.serialize_seconds = 0.0
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+        self._sink = None
+        self._closed = False
+
+    def _open(self, schema):
+        pa = self._pa
+        self.schema = schema
+        if self.export_format == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(
+                self._tmp_path, schema, compression=self.compression or 'none',
+                compression_level=self.compress_level
+            )
+        else:
+            self._sink = pa.OSFile(self._tmp_path, 'wb')
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._writer = pa.ipc.new_file(self._sink, schema, options=options)
+
+    def _write_batch(self, batch):
+        if self._writer is None:
+            self._open(batch.schema)
+        if self.export_format == 'parquet':
+            self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_batch(batch)
+        self.count += batch.num_rows
+        self.row_groups += 1
+
+    def _flush(self):
+        """Write the buffered records as one row group."""
+        if not self._buffer:
+            return
+        started = time.perf_counter()
+        pa = self._pa
+        schema = self.schema if self.schema is not None else infer_schema(self._buffer)
+        records = self._buffer
+        self._buffer = []
+        arrays = []
+        for field in schema:
+            try:
+                arrays.append(pa.array([record.get(field.name) for record in records], type=field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Column {field.name} does not fit the export schema ({field.type}): {e}")
+        batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+        self.serialize_seconds += time.perf_counter() - started
+        self._write_batch(batch)
+
+    def write(self, record: Dict[str, Any]):
+        """Buffer a single record (a dict or any connectors.rows row)."""
+        if type(record) is not dict:
+            record = row_to_dict(record, self.columns)
+        self._buffer.append(record)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Write every record from an iterable.
+
+        Returns:
+            Number of records written by this call
+        """
+        written = 0
+        for record in records:
+            self.write(record)
+            written += 1
+        return written
+
+    def write_batch(self, batch):
+        """
+        Write a pyarrow RecordBatch (or Table) as is, e.g. from ODBCConnector.iter_query_arrow.
+
+        Buffered records are written first so the file keeps their order.
+        """
+        self._flush()
+        if isinstance(batch, self._pa.Table):
+            for part in batch.to_batches(max_chunksize=self.row_group_size):
+                self._write_batch(part)
+        else:
+            self._write_batch(batch)
+
+    def tee(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pass records through while writing them (see ExportWriter.tee).
+
+        Records are yielded as plain dictionaries; a WebhookSink encodes
+        them itself since there are no per-record bytes to share.
+
+        Yields:
+            The input records as dictionaries
+        """
+        for record in records:
+            if type(record) is not dict:
+                record = row_to_dict(record, self.columns)
+            self.write(record)
+            yield record
+
+    def _close_writer(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def close(self):
+        """Write the last row group, finish the file and atomically move it to its final path."""
+        if self._closed:
+            return
+        try:
+            self._flush()
+        except Exception:
+            self.abort()
+            raise
+        self._closed = True
+        if self._writer is None:
+            # No rows: still write a valid file with the known (or named) columns
+            pa = self._pa
+            schema = self.schema
+            if schema is None:
+                schema = pa.schema([pa.field(name, pa.string()) for name in self.columns or ()])
+            self._open(schema)
+        self._close_writer()
+        fd = os.open(self._tmp_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(self._tmp_path, self.path)
+        self.bytes_written = os.path.getsize(self.path)
+        metrics.SERIALIZE_SECONDS.inc(self.serialize_seconds, sink='file')
+
+    def abort(self):
+        """Discard the partial export without touching any existing file at the final path."""
+        if self._closed:
+            return
+        self._closed = True
+        self._buffer = []
+        try:
+            self._close_writer()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_query_export(connector, query: str, output_path: str, params: Optional[tuple] = None,
+                       export_format: str = 'parquet', compression: Optional[str] = 'zstd',
+                       row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> ColumnarExportWriter:
+    """
+    Export a query straight from the cursor to a Parquet or Arrow IPC file.
+
+    Each fetchmany batch becomes one row group, typed from cursor.description,
+    without building a dictionary per row.
+
+    Args:
+        connector: Connected ODBCConnector
+        query: SQL query string
+        output_path: Requested output path
+        params: Optional tuple of query parameters
+        export_format: 'parquet' or 'arrow'
+        compression: Codec (None for uncompressed, e.g. memory-mappable Arrow files)
+        row_group_size: Rows fetched per round trip and written per row group
+
+    Returns:
+        The closed ColumnarExportWriter (see .path, .count and .row_groups)
+    """
+    with ColumnarExportWriter(output_path, export_format, compression,
+                              row_group_size=row_group_size) as writer:
+        for batch in connector.iter_query_arrow(query, params, batch_size=row_group_size):
+            writer.write_batch(batch)
+    return writer
+
+
+def _detect_format(path: str) -> str:
+    with open(path, 'rb') as f:
+        magic = f.read(6)
+    if magic.startswith(_PARQUET_MAGIC):
+        return 'parquet'
+    if magic == _ARROW_MAGIC:
+        return 'arrow'
+    raise ValueError(f"{path} is not a Parquet or Arrow IPC file")
+
+
+def read_export(path: str, columns: Optional[Sequence[str]] = None, memory_map: bool = True):
+    """
+    Read a Parquet or Arrow IPC export (detected from the file header).
+
+    Arrow files are memory-mapped: the table's buffers point into the
+    page cache, so reading is zero-copy and only the pages of the selected
+    columns are touched. Parquet files decode only the selected columns.
+
+    Args:
+        path: Export file path
+        columns: Optional column names to read (default: all)
+        memory_map: Map the file instead of reading it into memory
+
+    Returns:
+        pyarrow.Table (call .to_pandas() or .to_pylist() as needed)
+    """
+    pa = _pyarrow()
+    if _detect_format(path) == 'parquet':
+        return pa.parquet.read_table(path, columns=list(columns) if columns else None, memory_map=memory_map)
+    source = pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(list(columns)) if columns else table
+
+
+def iter_export_batches(path: str, columns: Optional[Sequence[str]] = None,
+                        batch_size: int = DEFAULT_ROW_GROUP_SIZE) -> Iterator[Any]:
+    """
+    Stream a Parquet or Arrow IPC export as record batches with bounded memory.
+
+    Args:
+        path: Export file path
+        columns: Optional column names to read (default: all)
+        batch_size: Rows per batch (Parquet; Arrow files yield their stored batches)
+
+    Yields:
+        pyarrow.RecordBatch
+    """
+    pa = _pyarrow()
+    if _detect_format(path) == 'parquet':
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        yield from parquet_file.iter_batches(batch_size=batch_size, columns=list(columns) if columns else None)
+        return
+    reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    for index in range(reader.num_record_batches):
+        batch = reader.get_batch(index)
+        yield batch.select(list(columns)) if columns else batch
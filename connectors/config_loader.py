@@ -7,7 +7,7 @@ Falls back to config.py for backward compatibility.
 
 import os
 from dotenv import load_dotenv
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 # Load environment variables from .env file
 load_dotenv()
@@ -69,14 +69,296 @@ def get_endpoint(service_name: str) -> str:
     return endpoint
 
 
-def get_log_config() -> Dict[str, str]:
+def _get_flag(name: str, default: bool) -> bool:
+    """Read a true/false environment variable (0/false/no/off are false)."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def get_log_config() -> Dict[str, Any]:
     """
     Get logging configuration from environment variables.
     
+    Variables (all optional):
+        LOG_DIR: Directory for log files (default logs)
+        LOG_LEVEL: Logging level (default INFO)
+        LOG_FORMAT: text or json (default text)
+        LOG_TO_FILE: Write a log file as well as the console (default true)
+        LOG_ASYNC: Hand records to a background thread for I/O (default true)
+        LOG_MAX_BYTES / LOG_BACKUP_COUNT: Log file rotation size, 0 to disable,
+            and rotated files kept (default 10485760 / 5)
+        LOG_RATE_LIMIT: INFO/DEBUG records per second allowed from each log
+            call site, 0 for no limit (default 0)
+        LOG_QUEUE_SIZE: Records buffered for the background thread before new
+            ones are dropped (default 10000)
+    
     Returns:
-        Dictionary with log directory and level
+        Dictionary of keyword arguments for setup_logger
     """
     return {
         'log_dir': os.getenv('LOG_DIR', 'logs'),
-        'log_level': os.getenv('LOG_LEVEL', 'INFO')
+        'log_level': os.getenv('LOG_LEVEL', 'INFO'),
+        'log_format': os.getenv('LOG_FORMAT', 'text').strip().lower(),
+        'log_to_file': _get_flag('LOG_TO_FILE', True),
+        'async_logging': _get_flag('LOG_ASYNC', True),
+        'max_bytes': int(os.getenv('LOG_MAX_BYTES', '10485760')),
+        'backup_count': int(os.getenv('LOG_BACKUP_COUNT', '5')),
+        'rate_limit': float(os.getenv('LOG_RATE_LIMIT', '0')),
+        'queue_size': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+    }
+
+
+def get_pool_config() -> Dict[str, float]:
+    """
+    Get connection pool settings from environment variables.
+    
+    Variables (all optional):
+        DB_POOL_MIN_SIZE: Connections kept open when the pool is warmed (default 1)
+        DB_POOL_MAX_SIZE: Maximum open connections per process (default 8)
+        DB_POOL_MAX_AGE: Seconds before a connection is recycled (default 1800)
+        DB_POOL_TIMEOUT: Seconds to wait for a free connection (default 30)
+    
+    Returns:
+        Dictionary of keyword arguments for ConnectionPool
+    """
+    return {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '1')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '8')),
+        'max_age': float(os.getenv('DB_POOL_MAX_AGE', '1800')),
+        'checkout_timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+    }
+
+
+def get_webhook_config() -> Dict[str, float]:
+    """
+    Get batched webhook delivery settings from environment variables.
+    
+    Variables (all optional):
+        WEBHOOK_BATCH_SIZE: Maximum records per POST (default 500)
+        WEBHOOK_MAX_BATCH_BYTES: Maximum encoded records size per POST (default 1000000)
+        WEBHOOK_CONCURRENCY: Batches sent in parallel (default 4)
+        WEBHOOK_MAX_RETRIES: Retries per batch (default 3)
+        WEBHOOK_TIMEOUT: Per-request read timeout in seconds (default 30)
+        WEBHOOK_CONNECT_TIMEOUT: Connection timeout in seconds (default 5)
+        SERIALIZER: Record encoding, 'json' (default), 'orjson' or 'msgpack'
+    
+    Returns:
+        Dictionary of keyword arguments for WebhookSink
+    """
+    return {
+        'max_batch_records': int(os.getenv('WEBHOOK_BATCH_SIZE', '500')),
+        'max_batch_bytes': int(os.getenv('WEBHOOK_MAX_BATCH_BYTES', '1000000')),
+        'max_workers': int(os.getenv('WEBHOOK_CONCURRENCY', '4')),
+        'max_retries': int(os.getenv('WEBHOOK_MAX_RETRIES', '3')),
+        'timeout': float(os.getenv('WEBHOOK_TIMEOUT', '30')),
+        'connect_timeout': float(os.getenv('WEBHOOK_CONNECT_TIMEOUT', '5')),
+        'serializer': get_serializer_name(),
+    }
+
+
+def get_delivery_config() -> Dict[str, Any]:
+    """
+    Get adaptive webhook delivery settings (shared per destination host).
+    
+    Variables (all optional):
+        WEBHOOK_ADAPTIVE: Adapt concurrency and use the circuit breaker (default true)
+        WEBHOOK_CONCURRENCY: Upper bound of the adaptive concurrency limit (default 4)
+        WEBHOOK_MIN_CONCURRENCY: Lower bound of the limit (default 1)
+        WEBHOOK_LATENCY_TARGET: Seconds above which a response counts as overload (default 0 = off)
+        WEBHOOK_BREAKER_THRESHOLD: Consecutive failures that open the circuit (default 5, 0 = off)
+        WEBHOOK_BREAKER_RESET: Seconds before a trial request once the circuit opened (default 30)
+        WEBHOOK_MAX_RETRY_AFTER: Longest Retry-After pause honoured, in seconds (default 300)
+    
+    Returns:
+        Dictionary with 'enabled' and keyword arguments for DeliveryController
+    """
+    max_concurrency = int(os.getenv('WEBHOOK_CONCURRENCY', '4'))
+    return {
+        'enabled': _get_flag('WEBHOOK_ADAPTIVE', True),
+        'max_concurrency': max_concurrency,
+        'min_concurrency': min(int(os.getenv('WEBHOOK_MIN_CONCURRENCY', '1')), max_concurrency),
+        'latency_target': float(os.getenv('WEBHOOK_LATENCY_TARGET', '0')),
+        'failure_threshold': int(os.getenv('WEBHOOK_BREAKER_THRESHOLD', '5')),
+        'reset_timeout': float(os.getenv('WEBHOOK_BREAKER_RESET', '30')),
+        'max_retry_after': float(os.getenv('WEBHOOK_MAX_RETRY_AFTER', '300')),
+    }
+
+
+def get_export_config() -> Dict[str, Any]:
+    """
+    Get export file settings from environment variables.
+    
+    Variables (all optional):
+        EXPORT_FORMAT: 'json' (compact array, default), 'ndjson', or the
+            columnar 'parquet' / 'arrow' (Arrow IPC; need pyarrow)
+        EXPORT_COMPRESSION: 'none', 'gzip' or 'zstd' (default 'none', or
+            'zstd' for parquet); parquet also takes 'snappy', 'lz4' and
+            'brotli', arrow 'lz4' (arrow files are memory-mappable only uncompressed)
+        EXPORT_ROW_GROUP_SIZE: Rows per Parquet row group / Arrow record batch (default 65536)
+        SERIALIZER: Record encoding, 'json' (default), 'orjson' or 'msgpack';
+            msgpack exports are written as .msgpack record streams whatever
+            EXPORT_FORMAT says
+    
+    Returns:
+        Dictionary of keyword arguments for open_export_writer
+    """
+    serializer = get_serializer_name()
+    export_format = 'msgpack' if serializer == 'msgpack' else os.getenv('EXPORT_FORMAT', 'json').lower()
+    compression = os.getenv('EXPORT_COMPRESSION', 'zstd' if export_format == 'parquet' else 'none').lower()
+    config = {
+        'export_format': export_format,
+        'compression': None if compression in ('', 'none') else compression,
+        'serializer': serializer,
+    }
+    if export_format in ('parquet', 'arrow'):
+        config['row_group_size'] = int(os.getenv('EXPORT_ROW_GROUP_SIZE', '65536'))
+    return config
+
+
+def get_serializer_name() -> str:
+    """
+    Get the record serializer shared by export files and webhooks.
+    
+    Returns:
+        SERIALIZER environment variable ('json', 'orjson' or 'msgpack'), or 'json'
+    """
+    return os.getenv('SERIALIZER', 'json').strip().lower() or 'json'
+
+
+def get_state_dir() -> str:
+    """
+    Get the directory for local job state (watermarks, dedup index).
+    
+    Returns:
+        STATE_DIR environment variable, or 'state'
+    """
+    return os.getenv('STATE_DIR', 'state')
+
+
+def get_spool_config() -> Dict[str, Any]:
+    """
+    Get delivery spool settings from environment variables.
+    
+    Variables (all optional):
+        SPOOL: Keep webhook batches that fail after all retries for replay (default true)
+        SPOOL_DIR: Spool directory (default <STATE_DIR>/spool)
+    
+    Returns:
+        Dictionary with 'enabled' and 'directory'
+    """
+    return {
+        'enabled': _get_flag('SPOOL', True),
+        'directory': os.getenv('SPOOL_DIR') or os.path.join(get_state_dir(), 'spool'),
+    }
+
+
+def get_dedup_max_keys() -> int:
+    """
+    Get the maximum number of keys kept in a dedup index.
+    
+    Returns:
+        DEDUP_MAX_KEYS environment variable, or 1000000
+    """
+    return int(os.getenv('DEDUP_MAX_KEYS', '1000000'))
+
+
+def get_job_workers() -> int:
+    """
+    Get the number of background export jobs the API runs at once.
+    
+    Returns:
+        EXPORT_JOB_WORKERS environment variable, or 2
+    """
+    return int(os.getenv('EXPORT_JOB_WORKERS', '2'))
+
+
+def get_query_cache_config() -> Dict[str, float]:
+    """
+    Get query result cache settings from environment variables.
+    
+    Variables (all optional):
+        QUERY_CACHE_MAX_MB: Approximate memory budget in megabytes (default 64)
+        QUERY_CACHE_TTL: Default seconds a cached result stays valid (default 60)
+    
+    Returns:
+        Dictionary of keyword arguments for QueryCache
+    """
+    return {
+        'max_bytes': int(float(os.getenv('QUERY_CACHE_MAX_MB', '64')) * 1024 * 1024),
+        'default_ttl': float(os.getenv('QUERY_CACHE_TTL', '60')),
+    }
+
+
+def get_scheduler_config() -> Dict[str, float]:
+    """
+    Get in-process scheduler settings from environment variables.
+    
+    Variables (all optional):
+        SCHEDULER_WORKERS: Jobs that may run at the same time (default 2)
+        SCHEDULER_MISFIRE_GRACE: Seconds a run may start late before it is skipped (default 300)
+    
+    Returns:
+        Dictionary of keyword arguments for Scheduler
+    """
+    return {
+        'max_workers': int(os.getenv('SCHEDULER_WORKERS', '2')),
+        'misfire_grace_time': float(os.getenv('SCHEDULER_MISFIRE_GRACE', '300')),
+    }
+
+
+def get_job_schedule(job_name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Get the schedule for a scheduler job.
+    
+    Reads SCHEDULE_<JOB_NAME> (e.g. SCHEDULE_BIRDEYE_EXPORT='0 2 * * *' or
+    'every 15m'); 'off' disables the job.
+    
+    Args:
+        job_name: Name of the job (e.g., 'birdeye_export')
+        default: Schedule used when the variable is not set
+        
+    Returns:
+        Schedule string, or None if the job is disabled
+    """
+    schedule = os.getenv(f"SCHEDULE_{job_name.upper()}", default)
+    if not schedule or schedule.strip().lower() in ('off', 'none', 'disabled'):
+        return None
+    return schedule
+
+
+def get_pipeline_config() -> Dict[str, Any]:
+    """
+    Get overlapped export pipeline settings from environment variables.
+    
+    Variables (all optional):
+        PIPELINE: Run fetch, serialize and delivery concurrently (default true)
+        PIPELINE_QUEUE_SIZE: Chunks buffered between two stages (default 8)
+        PIPELINE_CHUNK_SIZE: Records per chunk (default 500)
+    
+    Returns:
+        Dictionary of keyword arguments for Pipeline
+    """
+    return {
+        'enabled': _get_flag('PIPELINE', True),
+        'queue_size': int(os.getenv('PIPELINE_QUEUE_SIZE', '8')),
+        'chunk_size': int(os.getenv('PIPELINE_CHUNK_SIZE', '500')),
+    }
+
+
+def get_warmup_config() -> Dict[str, bool]:
+    """
+    Get API startup warm-up settings from environment variables.
+    
+    Variables (all optional):
+        WARMUP_DB: Open pooled database connections at startup (default true)
+        WARMUP_HTTP: Create the webhook session and resolve endpoints at startup (default true)
+    
+    Returns:
+        Dictionary of keyword arguments for Warmup
+    """
+    return {
+        'db': _get_flag('WARMUP_DB', True),
+        'http': _get_flag('WARMUP_HTTP', True),
     }
@@ -0,0 +1,345 @@
+"""
+Thread-safe ODBC Connection Pool
+
+Keeps a bounded set of open pyodbc connections that can be shared by the
+worker threads of a single process (e.g. gunicorn --threads 8), so each
+request does not pay a full connect/auth handshake.
+"""
+
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Any
+
+import pyodbc
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a raw pyodbc connection."""
+
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection: pyodbc.Connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of pyodbc connections.
+
+    Connections are validated on checkout, recycled once they are older than
+    ``max_age`` seconds and rolled back before being returned to the pool.
+
+    Usage:
+        from connectors.connection_pool import ConnectionPool
+
+        pool = ConnectionPool(connection_string, min_size=1, max_size=8)
+
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+
+        print(pool.stats())
+    """
+
+    def __init__(self, connection_string: str, min_size: int = 1, max_size: int = 8,
+                 max_age: float = 1800, checkout_timeout: float = 30,
+                 validation_query: Optional[str] = 'SELECT 1'):
+        """
+        Initialize the pool. No connections are opened until warm() or acquire().
+
+        Args:
+            connection_string: ODBC connection string used for new connections
+            min_size: Number of connections warm() keeps open
+            max_size: Maximum number of connections (idle + checked out)
+            max_age: Seconds after which a connection is closed and replaced
+            checkout_timeout: Seconds acquire() waits for a free connection
+            validation_query: Query run on checkout to validate a connection
+                (None disables validation)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self.connection_string = connection_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_age = max_age
+        self.checkout_timeout = checkout_timeout
+        self.validation_query = validation_query
+
+        self._idle = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        # Counters exposed via stats()
+        self._checkouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self) -> _PooledConnection:
+        """Open a new physical connection (called without holding the lock)."""
+        connection = pyodbc.connect(self.connection_string)
+        logging.info("Connection pool opened a new database connection")
+        return _PooledConnection(connection)
+
+    def _discard(self, pooled: _PooledConnection):
+        """Close a physical connection, ignoring driver errors."""
+        try:
+            pooled.connection.close()
+        except pyodbc.Error as e:
+            logging.debug(f"Error closing pooled connection: {e}")
+
+    def _is_expired(self, pooled: _PooledConnection) -> bool:
+        return self.max_age is not None and time.monotonic() - pooled.created_at > self.max_age
+
+    def _is_valid(self, pooled: _PooledConnection) -> bool:
+        """Run the validation query; False means the connection is unusable."""
+        if not self.validation_query:
+            return True
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute(self.validation_query)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except pyodbc.Error as e:
+            logging.warning(f"Pooled connection failed validation: {e}")
+            return False
+
+    def warm(self):
+        """Open connections until at least min_size exist in the pool."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._open()
+            except pyodbc.Error:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._created += 1
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> pyodbc.Connection:
+        """
+        Check a connection out of the pool.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to checkout_timeout)
+
+        Returns:
+            pyodbc.Connection: A validated connection; pass it back with release()
+
+        Raises:
+            PoolTimeoutError: If no connection is available in time
+            pyodbc.Error: If a new connection cannot be opened
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserve a slot and open the connection outside the lock
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout}s waiting for a database connection "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                try:
+                    pooled = self._open()
+                except pyodbc.Error:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._created += 1
+            elif self._is_expired(pooled) or not self._is_valid(pooled):
+                with self._cond:
+                    if self._is_expired(pooled):
+                        self._recycled += 1
+                    else:
+                        self._invalidated += 1
+                    self._size -= 1
+                    self._cond.notify()
+                self._discard(pooled)
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._in_use[id(pooled.connection)] = pooled
+            return pooled.connection
+
+    def release(self, connection: pyodbc.Connection, discard: bool = False):
+        """
+        Return a connection to the pool.
+
+        Any open transaction is rolled back. Expired or broken connections are
+        closed instead of being reused.
+
+        Args:
+            connection: Connection previously returned by acquire()
+            discard: Close the connection instead of returning it to the pool
+        """
+        with self._cond:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            logging.warning("Attempted to release a connection not owned by this pool")
+            return
+
+        if not discard:
+            try:
+                pooled.connection.rollback()
+            except pyodbc.Error as e:
+                logging.warning(f"Discarding pooled connection after rollback failure: {e}")
+                discard = True
+
+        if not discard and self._is_expired(pooled):
+            discard = True
+            with self._cond:
+                self._recycled += 1
+
+        if discard or self._closed:
+            self._discard(pooled)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that acquires a connection and releases it on exit."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except pyodbc.Error:
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool usage statistics.
+
+        Returns:
+            Dictionary with sizes, checkout counts and wait times (seconds)
+        """
+        with self._cond:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'checkouts': self._checkouts,
+                'created': self._created,
+                'recycled': self._recycled,
+                'invalidated': self._invalidated,
+                'timeouts': self._timeouts,
+                'wait_time_total': round(self._wait_total, 6),
+                'wait_time_max': round(self._wait_max, 6),
+                'wait_time_avg': round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+            }
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+        logging.info("Connection pool closed")
+
+
+# Process-wide pools keyed by connection string
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(connection_string: str, **pool_kwargs) -> ConnectionPool:
+    """
+    Get (or create) the process-wide pool for a connection string.
+
+    Args:
+        connection_string: ODBC connection string
+        **pool_kwargs: ConnectionPool options, only used when the pool is created
+
+    Returns:
+        Shared ConnectionPool instance
+    """
+    with _pools_lock:
+        pool = _pools.get(connection_string)
+        if pool is None:
+            if not pool_kwargs:
+                from connectors.config_loader import get_pool_config
+                pool_kwargs = get_pool_config()
+            pool = ConnectionPool(connection_string, **pool_kwargs)
+            _pools[connection_string] = pool
+        return pool
+
+
+def get_all_pool_stats() -> list:
+    """Get stats() for every process-wide pool (connection strings are not included)."""
+    with _pools_lock:
+        return [pool.stats() for pool in _pools.values()]
+
+
+def close_all_pools():
+    """Close and forget every process-wide pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,188 @@
+"""
+Content-hash Dedup Store
+
+Remembers a stable hash of the last delivered version of each record (keyed
+by e.g. src_lead_id) in a local SQLite file, so exports only send records
+that are new or have changed since the previous successful delivery.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from connectors.rows import row_to_dict
+
+
+class DedupStore:
+    """
+    SQLite-backed index of record content hashes.
+
+    filter() stages hash updates in an open transaction; call commit() after
+    the records were delivered successfully, or rollback() so they are sent
+    again next run. The index is bounded to max_keys entries by evicting the
+    keys that have not been seen for the longest time.
+
+    Usage:
+        from connectors.dedup_store import DedupStore
+
+        with DedupStore('state/birdeye_dedup.sqlite') as dedup:
+            summary = sink.send(dedup.filter(records, key_field='src_lead_id'))
+            if summary['failed_batches']:
+                dedup.rollback()
+            else:
+                dedup.commit()
+            print(dedup.stats())
+    """
+
+    def __init__(self, path: str, max_keys: int = 1_000_000, lookup_batch_size: int = 500):
+        """
+        Open (or create) the dedup index.
+
+        Args:
+            path: SQLite database file
+            max_keys: Maximum keys retained; least recently seen keys are evicted
+            lookup_batch_size: Records looked up per SELECT ... IN (...) query
+        """
+        self.path = path
+        self.max_keys = max_keys
+        self.lookup_batch_size = lookup_batch_size
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS record_hashes ("
+            " record_key TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " last_seen REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_record_hashes_last_seen ON record_hashes (last_seen)"
+        )
+        self._conn.commit()
+        self._reset_counts()
+
+    def _reset_counts(self):
+        self._counts = {'new': 0, 'changed': 0, 'skipped': 0, 'evicted': 0}
+
+    @staticmethod
+    def content_hash(record: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> str:
+        """
+        Stable hash of a record's exported fields.
+
+        Args:
+            record: Record dictionary, or a namedtuple/slots row
+            fields: Fields to include (all fields when None)
+
+        Returns:
+            Hex digest that only changes when a field value changes
+        """
+        if fields is not None:
+            record = {field: record.get(field) for field in fields}
+        elif type(record) is not dict:
+            record = row_to_dict(record)
+        encoded = json.dumps(record, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _process_chunk(self, chunk: List[Dict[str, Any]], key_field: str,
+                       fields: Optional[Sequence[str]], now: float) -> List[Dict[str, Any]]:
+        """Look up a chunk of records, stage hash updates and return the ones to send."""
+        keyed = [(str(record.get(key_field)), self.content_hash(record, fields), record)
+                 for record in chunk]
+        keys = list({key for key, _, _ in keyed})
+        placeholders = ','.join('?' * len(keys))
+
+        with self._lock:
+            known = dict(self._conn.execute(
+                f"SELECT record_key, content_hash FROM record_hashes WHERE record_key IN ({placeholders})",
+                keys
+            ).fetchall())
+
+            to_send = []
+            for key, digest, record in keyed:
+                previous = known.get(key)
+                if previous == digest:
+                    self._counts['skipped'] += 1
+                    continue
+                self._counts['new' if previous is None else 'changed'] += 1
+                known[key] = digest
+                to_send.append(record)
+
+            # Stage every seen key so unchanged records are not evicted as stale
+            self._conn.executemany(
+                "INSERT INTO record_hashes (record_key, content_hash, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(record_key) DO UPDATE SET "
+                "content_hash = excluded.content_hash, last_seen = excluded.last_seen",
+                [(key, digest, now) for key, digest, _ in keyed]
+            )
+        return to_send
+
+    def filter(self, records: Iterable[Dict[str, Any]], key_field: str,
+               fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield only records that are new or changed since the last commit().
+
+        Records without a key value are always yielded.
+
+        Args:
+            records: Iterable of record dictionaries
+            key_field: Field that identifies a record (e.g. 'src_lead_id')
+            fields: Fields included in the content hash (all fields when None)
+
+        Yields:
+            New or changed records
+        """
+        now = time.time()
+        chunk = []
+        for record in records:
+            if record.get(key_field) is None:
+                self._counts['new'] += 1
+                yield record
+                continue
+            chunk.append(record)
+            if len(chunk) >= self.lookup_batch_size:
+                yield from self._process_chunk(chunk, key_field, fields, now)
+                chunk = []
+        if chunk:
+            yield from self._process_chunk(chunk, key_field, fields, now)
+
+    def commit(self):
+        """Persist the staged hashes (call after successful delivery) and evict old keys."""
+        with self._lock:
+            overflow = self._conn.execute("SELECT COUNT(*) FROM record_hashes").fetchone()[0] - self.max_keys
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM record_hashes WHERE record_key IN ("
+                    " SELECT record_key FROM record_hashes ORDER BY last_seen ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._counts['evicted'] += overflow
+            self._conn.commit()
+        logging.info(f"Dedup index committed: {self.stats()}")
+
+    def rollback(self):
+        """Discard staged hashes so the same records are sent again next run."""
+        with self._lock:
+            self._conn.rollback()
+        logging.info("Dedup index changes rolled back")
+
+    def stats(self) -> Dict[str, int]:
+        """Counts of new, changed, skipped and evicted records for this run."""
+        return dict(self._counts)
+
+    def close(self):
+        """Close the database (uncommitted changes are discarded)."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -0,0 +1,287 @@
+"""
+Outbound Delivery Controller
+
+Adapts how hard webhook sinks push a destination, shared by every sink (and
+service) posting to the same host in this process:
+
+- Concurrency limit with AIMD: each delivered request raises the limit by
+  1/limit (about +1 per round of requests), each 429, 5xx, timeout or
+  over-target latency halves it (at most once per round trip).
+- Retry-After: a 429/503 with Retry-After pauses new requests to the host
+  until then, for every worker rather than just the one that got it.
+- Circuit breaker: after `failure_threshold` consecutive failures the
+  circuit opens and requests fail fast (no connection, no timeout wait);
+  after `reset_timeout` seconds one trial request is let through, and its
+  outcome closes or re-opens the circuit.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from connectors import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Numeric circuit states for the gauge
+CIRCUIT_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised by DeliveryController.acquire while the circuit is open."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delay in seconds or an HTTP date).
+
+    Returns:
+        Seconds to wait (0 or more), or None if absent or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class DeliveryController:
+    """
+    Adaptive concurrency limit, Retry-After pauses and circuit breaker for one destination.
+
+    Usage:
+        from connectors.delivery_controller import get_controller, CircuitOpenError
+
+        controller = get_controller(endpoint)
+        try:
+            trial = controller.acquire()
+        except CircuitOpenError:
+            ...                                     # fail fast (e.g. spool the batch)
+        started = time.monotonic()
+        try:
+            response = session.post(endpoint, ...)
+        finally:
+            controller.release(trial, time.monotonic() - started, response.status_code)
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 4, min_concurrency: int = 1,
+                 initial_concurrency: Optional[int] = None, latency_target: float = 0.0,
+                 decrease_ratio: float = 0.5, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, max_retry_after: float = 300.0):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Destination name (usually the endpoint host)
+            max_concurrency: Upper bound of the concurrency limit
+            min_concurrency: Lower bound of the concurrency limit
+            initial_concurrency: Starting limit (defaults to max_concurrency)
+            latency_target: Treat successful requests slower than this many
+                seconds as overload (0 = only react to errors)
+            decrease_ratio: Multiplier applied to the limit on overload
+            failure_threshold: Consecutive failures that open the circuit (0 = no breaker)
+            reset_timeout: Seconds the circuit stays open before a trial request
+            max_retry_after: Longest Retry-After pause honoured, in seconds
+        """
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise ValueError("Need 1 <= min_concurrency <= max_concurrency")
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.decrease_ratio = decrease_ratio
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_retry_after = max_retry_after
+
+        self.limit = float(initial_concurrency or max_concurrency)
+        self.in_flight = 0
+        self.circuit = CLOSED
+        self.consecutive_failures = 0
+        self.latency_ewma: Optional[float] = None
+        self.counts = {'succeeded': 0, 'throttled': 0, 'failed': 0, 'rejected_fast': 0}
+
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _set_circuit(self, state: str):
+        if state != self.circuit:
+            logging.warning(f"Circuit for {self.name} {self.circuit} -> {state}")
+            self.circuit = state
+            if state == OPEN:
+                self._opened_at = time.monotonic()
+
+    def acquire(self) -> bool:
+        """
+        Wait for a request slot.
+
+        Blocks while the concurrency limit is reached or a Retry-After pause
+        is in effect.
+
+        Returns:
+            True if this request is the circuit's half-open trial
+
+        Raises:
+            CircuitOpenError: While the circuit is open (or a trial is already running)
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.circuit == OPEN and now - self._opened_at >= self.reset_timeout:
+                    self._set_circuit(HALF_OPEN)
+                if self.circuit == OPEN or (self.circuit == HALF_OPEN and self._trial_in_flight):
+                    self.counts['rejected_fast'] += 1
+                    metrics.WEBHOOK_THROTTLED.inc(endpoint=self.name, reason='circuit_open')
+                    raise CircuitOpenError(f"Circuit for {self.name} is {self.circuit}")
+                paused = self._paused_until - now
+                if paused > 0:
+                    self._cond.wait(paused)
+                    continue
+                if self.circuit == HALF_OPEN:
+                    # Only the trial request goes out until the circuit closes again
+                    if self.in_flight:
+                        self._cond.wait(0.1)
+                        continue
+                    self._trial_in_flight = True
+                    self.in_flight += 1
+                    return True
+                if self.in_flight < max(self.min_concurrency, int(self.limit)):
+                    self.in_flight += 1
+                    return False
+                self._cond.wait(1.0)
+
+    def _decrease(self, now: float):
+        """Multiplicative decrease, at most once per round trip."""
+        if now - self._last_decrease < (self.latency_ewma or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_concurrency), self.limit * self.decrease_ratio)
+
+    def release(self, trial: bool, latency: float, status_code: Optional[int] = None,
+                retry_after: Optional[float] = None):
+        """
+        Record the outcome of a request acquired with acquire().
+
+        Args:
+            trial: The value returned by acquire()
+            latency: Request duration in seconds
+            status_code: HTTP status, or None for a timeout/connection error
+            retry_after: Parsed Retry-After of the response, if any
+        """
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            if trial:
+                self._trial_in_flight = False
+
+            if status_code is not None:
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + min(retry_after, self.max_retry_after))
+                metrics.WEBHOOK_THROTTLED.inc(endpoint=self.name, reason='retry_after')
+
+            if status_code == 429:
+                # Throttled: the endpoint is up, so back off without counting towards the breaker
+                self.counts['throttled'] += 1
+                metrics.WEBHOOK_THROTTLED.inc(endpoint=self.name, reason='rate_limited')
+                self._decrease(now)
+                if trial:
+                    self._set_circuit(CLOSED)
+            elif status_code is None or status_code >= 500 or status_code == 408:
+                self.counts['failed'] += 1
+                self.consecutive_failures += 1
+                self._decrease(now)
+                if trial or (self.failure_threshold and self.consecutive_failures >= self.failure_threshold):
+                    self._set_circuit(OPEN)
+            else:
+                # Delivered, or refused for reasons of its own (4xx): the endpoint is healthy
+                self.counts['succeeded'] += 1
+                self.consecutive_failures = 0
+                if trial:
+                    self._set_circuit(CLOSED)
+                if self.latency_target and latency > self.latency_target:
+                    metrics.WEBHOOK_THROTTLED.inc(endpoint=self.name, reason='latency')
+                    self._decrease(now)
+                elif 200 <= status_code < 300:
+                    self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def retry_delay(self) -> float:
+        """Seconds left of the current Retry-After pause."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Current controller state.
+
+        Returns:
+            Dictionary with the concurrency limit, in-flight requests, circuit
+            state, consecutive failures, latency average, remaining pause and
+            outcome counts
+        """
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'endpoint': self.name,
+                'limit': round(self.limit, 2),
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'circuit': self.circuit,
+                'consecutive_failures': self.consecutive_failures,
+                'open_for': round(max(0.0, self.reset_timeout - (now - self._opened_at)), 1) if self.circuit == OPEN else 0,
+                'paused_for': round(max(0.0, self._paused_until - now), 2),
+                'latency_ewma': round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+                **self.counts,
+            }
+
+
+_controllers: Dict[str, DeliveryController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_controller(endpoint: str) -> Optional[DeliveryController]:
+    """
+    Get the process-wide controller for an endpoint's host.
+
+    Sinks of every service posting to the same host share it, so their
+    combined load adapts to that destination.
+
+    Args:
+        endpoint: Webhook URL
+
+    Returns:
+        DeliveryController, or None if adaptive delivery is disabled (WEBHOOK_ADAPTIVE=false)
+    """
+    from connectors.config_loader import get_delivery_config
+
+    config = get_delivery_config()
+    if not config.pop('enabled'):
+        return None
+    name = urlsplit(endpoint).netloc or endpoint
+    with _controllers_lock:
+        if name not in _controllers:
+            _controllers[name] = DeliveryController(name, **config)
+        return _controllers[name]
+
+
+def get_controllers() -> List[DeliveryController]:
+    """Controllers created in this process."""
+    with _controllers_lock:
+        return list(_controllers.values())
@@ -0,0 +1,403 @@
+"""
+Durable Delivery Spool
+
+Webhook batches that still fail after their retries are appended to an
+on-disk spool instead of only being logged, so they can be resent later
+without querying the database or re-running the export.
+
+The spool is a directory with two append-only files:
+
+    batches.log  one entry per batch: a JSON header line, the request body
+                 exactly as it was POSTed, and a newline
+    acks.log     "<offset> <outcome>" lines for entries that were delivered
+                 (or rejected by the endpoint and given up on)
+
+An entry is identified by its byte offset in batches.log. Replaying sends
+every entry without an ack line, with the same Idempotency-Key header as the
+original attempt, and acks it once the endpoint accepts it; entries are never
+sent again after their ack. Once every entry is acked the files are
+truncated. The files are locked with flock, so the API, the scheduler and
+the service scripts can share one spool.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from connectors import metrics
+
+BATCHES_FILE = 'batches.log'
+ACKS_FILE = 'acks.log'
+REPLAY_LOCK_FILE = 'replay.lock'
+
+
+class DeliverySpool:
+    """
+    Append-only on-disk spool of undelivered webhook batches.
+
+    Usage:
+        from connectors.delivery_spool import DeliverySpool
+
+        spool = DeliverySpool('state/spool')
+        spool.append('birdeye', endpoint, body, 'application/json', key='run-3', batch_index=3)
+
+        print(spool.stats())        # pending batches/bytes, oldest pending age
+        summary = spool.replay()    # resend pending batches, oldest first
+    """
+
+    def __init__(self, directory: str = 'state/spool'):
+        """
+        Open (and create if needed) a spool directory.
+
+        A partially written entry left by a crash is truncated away.
+
+        Args:
+            directory: Directory holding batches.log and acks.log
+        """
+        self.directory = directory
+        self.batches_path = os.path.join(directory, BATCHES_FILE)
+        self.acks_path = os.path.join(directory, ACKS_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with self._locked() as f:
+            self._recover(f)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the thread and file locks on batches.log; yields it opened for reading and appending."""
+        with self._lock:
+            with open(self.batches_path, 'a+b') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield f
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _scan(f) -> Iterator[Tuple[int, Dict[str, Any], int]]:
+        """Yield (offset, header, body offset) for every complete entry."""
+        size = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            line = f.readline()
+            if not line.endswith(b'\n'):
+                return
+            try:
+                header = json.loads(line)
+            except ValueError:
+                return
+            body_offset = offset + len(line)
+            end = body_offset + header['length'] + 1
+            if end > size:
+                return
+            yield offset, header, body_offset
+            offset = end
+
+    def _recover(self, f):
+        """Truncate a torn entry at the end of batches.log."""
+        end = 0
+        for offset, header, body_offset in self._scan(f):
+            end = body_offset + header['length'] + 1
+        size = os.fstat(f.fileno()).st_size
+        if size > end:
+            logging.warning(f"Truncating {size - end} bytes of incomplete spool entry in {self.batches_path}")
+            f.truncate(end)
+
+    def _read_acks(self) -> Dict[int, str]:
+        if not os.path.exists(self.acks_path):
+            return {}
+        acks = {}
+        with open(self.acks_path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    acks[int(parts[0])] = parts[1]
+        return acks
+
+    def append(self, service: str, endpoint: str, body: bytes, content_type: str,
+               key: Optional[str] = None, batch_index: int = 0, record_count: int = 0,
+               error: Optional[str] = None) -> int:
+        """
+        Durably append an undelivered batch.
+
+        Args:
+            service: Service name (metrics, filtering replays)
+            endpoint: Webhook URL the batch is for
+            body: Request body as it was POSTed
+            content_type: Content-Type of the body
+            key: Idempotency key sent with every attempt
+            batch_index: Batch index within its export
+            record_count: Records in the batch
+            error: Last delivery error
+
+        Returns:
+            Offset of the new entry
+        """
+        header = {
+            'service': service,
+            'endpoint': endpoint,
+            'content_type': content_type,
+            'key': key,
+            'batch_index': batch_index,
+            'records': record_count,
+            'length': len(body),
+            'created': time.time(),
+            'error': error,
+        }
+        entry = json.dumps(header, separators=(',', ':')).encode('utf-8') + b'\n' + body + b'\n'
+        with self._locked() as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(entry)
+            f.flush()
+            os.fsync(f.fileno())
+        metrics.SPOOL_BATCHES.inc(service=service, outcome='spooled')
+        return offset
+
+    def ack(self, offset: int, outcome: str = 'delivered'):
+        """
+        Mark an entry as done so it is never sent again.
+
+        Args:
+            offset: Entry offset
+            outcome: 'delivered', or 'rejected' for an entry the endpoint refused
+        """
+        with self._locked():
+            with open(self.acks_path, 'a') as f:
+                f.write(f"{offset} {outcome}\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def pending(self, service: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Headers of the entries waiting to be delivered, oldest first.
+
+        Args:
+            service: Only entries for this service
+
+        Returns:
+            List of header dicts, each with its 'offset'
+        """
+        with self._locked() as f:
+            acks = self._read_acks()
+            return [
+                dict(header, offset=offset)
+                for offset, header, _ in self._scan(f)
+                if offset not in acks and (service is None or header['service'] == service)
+            ]
+
+    def read_body(self, entry: Dict[str, Any]) -> bytes:
+        """Read the request body of a pending entry."""
+        with self._locked() as f:
+            f.seek(entry['offset'])
+            f.readline()
+            return f.read(entry['length'])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Spool size and backlog.
+
+        Returns:
+            Dictionary with pending_batches, pending_records, pending_bytes,
+            oldest_pending_age (seconds, None when empty), acked_batches and
+            file_bytes
+        """
+        pending = self.pending()
+        oldest = min((entry['created'] for entry in pending), default=None)
+        file_bytes = os.path.getsize(self.batches_path) if os.path.exists(self.batches_path) else 0
+        return {
+            'directory': self.directory,
+            'pending_batches': len(pending),
+            'pending_records': sum(entry['records'] for entry in pending),
+            'pending_bytes': sum(entry['length'] for entry in pending),
+            'oldest_pending_age': round(time.time() - oldest, 1) if oldest is not None else None,
+            'acked_batches': len(self._read_acks()),
+            'file_bytes': file_bytes,
+        }
+
+    def compact(self) -> bool:
+        """
+        Truncate both files once every entry has been acked.
+
+        Only called while holding the replay lock, so no replay still refers
+        to old offsets.
+
+        Returns:
+            True if the spool was emptied
+        """
+        with self._locked() as f:
+            acks = self._read_acks()
+            if any(offset not in acks for offset, _, _ in self._scan(f)):
+                return False
+            f.truncate(0)
+            open(self.acks_path, 'w').close()
+        return True
+
+    @contextmanager
+    def _replay_lock(self) -> Iterator[bool]:
+        """Non-blocking lock held for a whole replay; yields False if another replay is running."""
+        with open(os.path.join(self.directory, REPLAY_LOCK_FILE), 'w') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def replay(self, service: Optional[str] = None, session=None, max_batches: Optional[int] = None,
+               max_workers: int = 4, stop_on_failure: bool = True, **sink_options) -> Dict[str, Any]:
+        """
+        Resend pending batches, oldest first, without touching the database.
+
+        Each batch is sent with its original body and Idempotency-Key and
+        acked once delivered. Batches the endpoint rejects outright (4xx other
+        than 408/425/429) are acked as 'rejected' and logged. After the first
+        batch that still fails, no further batches are started (the endpoint
+        is presumably still down) unless stop_on_failure is False.
+
+        Args:
+            service: Only replay batches for this service
+            session: Optional shared requests.Session
+            max_batches: Replay at most this many batches
+            max_workers: Batches sent in parallel
+            stop_on_failure: Stop starting batches after one fails
+            **sink_options: WebhookSink retry/timeout options (max_retries, timeout, ...)
+
+        Returns:
+            Summary with replayed, failed, rejected and remaining pending
+            batches, elapsed seconds and batches_per_sec
+        """
+        from connectors.webhook_sink import WebhookSink
+
+        started = time.monotonic()
+        summary = {'replayed': 0, 'failed': 0, 'rejected': 0, 'records': 0, 'skipped': False}
+
+        with self._replay_lock() as acquired:
+            if not acquired:
+                logging.info(f"Another replay of {self.directory} is running, skipping")
+                summary['skipped'] = True
+                summary['pending'] = len(self.pending(service))
+                return summary
+
+            entries = self.pending(service)
+            if max_batches is not None:
+                entries = entries[:max_batches]
+            sinks: Dict[Tuple[str, str], WebhookSink] = {}
+            stopped = threading.Event()
+            counts_lock = threading.Lock()
+
+            def resend(entry):
+                if stopped.is_set():
+                    return
+                sink = sinks[(entry['service'], entry['endpoint'])]
+                result = sink.post_body(self.read_body(entry), entry['batch_index'], entry['records'],
+                                        idempotency_key=entry['key'], content_type=entry['content_type'])
+                if result['success']:
+                    outcome = 'replayed'
+                    self.ack(entry['offset'])
+                elif not result['retryable']:
+                    outcome = 'rejected'
+                    self.ack(entry['offset'], 'rejected')
+                    logging.error(f"Spooled batch {entry['key']} for {entry['service']} was rejected "
+                                  f"({result['error']}), dropping it from the spool")
+                else:
+                    outcome = 'failed'
+                    if stop_on_failure:
+                        stopped.set()
+                metrics.SPOOL_BATCHES.inc(service=entry['service'], outcome=outcome)
+                with counts_lock:
+                    summary[outcome] += 1
+                    if outcome == 'replayed':
+                        summary['records'] += entry['records']
+
+            try:
+                for entry in entries:
+                    if (entry['service'], entry['endpoint']) not in sinks:
+                        sinks[(entry['service'], entry['endpoint'])] = WebhookSink(
+                            entry['endpoint'], entry['service'], session=session,
+                            max_workers=max_workers, **sink_options)
+                with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='spool-replay') as executor:
+                    for future in [executor.submit(resend, entry) for entry in entries]:
+                        future.result()
+            finally:
+                for sink in sinks.values():
+                    sink.close()
+
+            remaining = len(self.pending(service))
+            if self.compact():
+                logging.info(f"Delivery spool {self.directory} drained and compacted")
+
+        elapsed = time.monotonic() - started
+        summary.update({
+            'pending': remaining,
+            'elapsed': round(elapsed, 3),
+            'batches_per_sec': round(summary['replayed'] / elapsed, 2) if elapsed else None,
+        })
+        if entries:
+            logging.info(
+                f"Spool replay: {summary['replayed']} batches ({summary['records']} records) delivered, "
+                f"{summary['failed']} failed, {summary['rejected']} rejected, {remaining} still pending "
+                f"({elapsed:.2f}s)"
+            )
+        return summary
+
+
+_spool: Optional[DeliverySpool] = None
+_spool_lock = threading.Lock()
+
+
+def get_spool() -> Optional[DeliverySpool]:
+    """
+    Get the process-wide delivery spool.
+
+    Returns:
+        DeliverySpool in SPOOL_DIR, or None if spooling is disabled (SPOOL=false)
+    """
+    global _spool
+    from connectors.config_loader import get_spool_config
+
+    config = get_spool_config()
+    if not config['enabled']:
+        return None
+    with _spool_lock:
+        if _spool is None or _spool.directory != config['directory']:
+            _spool = DeliverySpool(config['directory'])
+        return _spool
+
+
+def replay_pending(session=None, service: Optional[str] = None,
+                   max_batches: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Replay the process-wide spool with the WEBHOOK_* retry settings.
+
+    Used by the scheduler's spool_replay job and the API's replay endpoint.
+
+    Args:
+        session: Optional shared requests.Session
+        service: Only replay batches for this service
+        max_batches: Replay at most this many batches
+
+    Returns:
+        Replay summary, or None if spooling is disabled
+    """
+    from connectors.config_loader import get_webhook_config
+
+    spool = get_spool()
+    if spool is None:
+        return None
+    config = get_webhook_config()
+    return spool.replay(
+        service=service, session=session, max_batches=max_batches,
+        max_workers=config['max_workers'], max_retries=config['max_retries'], timeout=config['timeout'],
+        connect_timeout=config['connect_timeout'],
+    )
@@ -0,0 +1,397 @@
+"""
+Export helpers for ODBC Data Bridge service scripts
+
+Write records incrementally so exports can consume a streaming row iterator
+(ODBCConnector.iter_query) without holding the whole result set.
+
+Columnar formats (Parquet, Arrow IPC) are written by
+connectors.columnar_export; open_export_writer picks the writer for a format.
+"""
+
+import csv
+import gzip
+import io
+import os
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+from connectors import metrics
+from connectors.rows import row_to_dict
+from connectors.serializers import Serializer, get_serializer
+
+EXPORT_FORMATS = ('json', 'ndjson', 'msgpack')
+EXPORT_COMPRESSIONS = (None, 'gzip', 'zstd')
+STREAM_FORMATS = ('ndjson', 'csv')
+# Written by connectors.columnar_export (compression is inside the file)
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+_FORMAT_SUFFIXES = {'json': '.json', 'ndjson': '.ndjson', 'msgpack': '.msgpack',
+                    'parquet': '.parquet', 'arrow': '.arrow'}
+_COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def resolve_export_path(output_path: str, export_format: str = 'json',
+                        compression: Optional[str] = None) -> str:
+    """
+    Adjust an export path's extension to match the format and compression.
+
+    e.g. exports/birdeye_export.json -> exports/birdeye_export.ndjson.gz
+    (columnar files keep their extension: exports/birdeye_export.parquet)
+
+    Args:
+        output_path: Requested output path
+        export_format: 'json', 'ndjson', 'msgpack', 'parquet' or 'arrow'
+        compression: None, 'gzip' or 'zstd' (or a columnar codec)
+
+    Returns:
+        Output path with the matching extension
+    """
+    root, ext = os.path.splitext(output_path)
+    if ext in _FORMAT_SUFFIXES.values():
+        output_path = root + _FORMAT_SUFFIXES.get(export_format, '.json')
+    if export_format in COLUMNAR_FORMATS:
+        return output_path
+    suffix = _COMPRESSION_SUFFIXES.get(compression)
+    if suffix and not output_path.endswith(suffix):
+        output_path += suffix
+    return output_path
+
+
+class ExportWriter:
+    """
+    Streaming export file writer.
+
+    Records are encoded one at a time as NDJSON (one object per line), as a
+    compact JSON array or as a MessagePack stream, optionally gzip/zstd
+    compressed. Output goes to a
+    temporary file that is atomically renamed into place when the writer is
+    closed successfully, so readers never see a partial export.
+
+    Usage:
+        from connectors.export_utils import ExportWriter
+
+        with ExportWriter('exports/leads.json', export_format='ndjson', compression='gzip') as writer:
+            writer.write_many(connector.iter_query(query))
+
+        print(writer.path, writer.count)
+    """
+
+    def __init__(self, output_path: str, export_format: str = 'json',
+                 compression: Optional[str] = None, compress_level: Optional[int] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 serializer: Union[str, Serializer, None] = None):
+        """
+        Open a temporary file next to the final export path.
+
+        Args:
+            output_path: Requested output path (extension adjusted by resolve_export_path)
+            export_format: 'json' (compact array), 'ndjson' or 'msgpack'
+            compression: None, 'gzip' or 'zstd' (requires the zstandard package)
+            compress_level: Optional compression level
+            columns: Column names for plain tuple rows (row_factory='tuple');
+                dicts and namedtuple/slots rows carry their own names
+            serializer: 'json' (default), 'orjson', 'msgpack' or a Serializer;
+                'msgpack' goes with export_format='msgpack'
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        self.serializer = get_serializer(serializer)
+        if self.serializer.binary != (export_format == 'msgpack'):
+            raise ValueError(f"Export format {export_format} cannot use the {self.serializer.name} serializer")
+        if compression not in EXPORT_COMPRESSIONS:
+            raise ValueError(f"Unsupported export compression: {compression}")
+
+        self.export_format = export_format
+        self.compression = compression
+        self.columns = columns
+        self.path = resolve_export_path(output_path, export_format, compression)
+        self.count = 0
+        self.bytes_written = 0
+        self.serialize_seconds = 0.0
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Unique per writer: threads of one process (job workers, request threads) share the pid
+        self._tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        self._raw = open(self._tmp_path, 'wb')
+        self._closed = False
+
+        try:
+            if compression == 'gzip':
+                self._stream = gzip.GzipFile(
+                    fileobj=self._raw, mode='wb',
+                    compresslevel=6 if compress_level is None else compress_level
+                )
+            elif compression == 'zstd':
+                try:
+                    import zstandard
+                except ImportError:
+                    raise RuntimeError("zstd compression requires the zstandard package (pip install zstandard)")
+                self._stream = zstandard.ZstdCompressor(
+                    level=3 if compress_level is None else compress_level
+                ).stream_writer(self._raw, closefd=False)
+            else:
+                self._stream = self._raw
+        except Exception:
+            self._raw.close()
+            os.remove(self._tmp_path)
+            raise
+
+        if export_format == 'json':
+            self._write(b'[')
+
+    def _write(self, data: bytes):
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def write(self, record: Dict[str, Any]) -> bytes:
+        """
+        Encode and write a single record (a dict or any connectors.rows row).
+
+        Returns:
+            The record's encoded bytes
+        """
+        started = time.perf_counter()
+        if type(record) is not dict:
+            record = row_to_dict(record, self.columns)
+        encoded = self.serializer.encoded(record)
+        self.serialize_seconds += time.perf_counter() - started
+        if self.export_format == 'ndjson':
+            self._write(encoded + b'\n')
+        elif self.export_format == 'json' and self.count:
+            self._write(b',' + encoded)
+        else:
+            self._write(encoded)
+        self.count += 1
+        return encoded
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Write every record from an iterable.
+
+        Returns:
+            Number of records written by this call
+        """
+        written = 0
+        for record in records:
+            self.write(record)
+            written += 1
+        return written
+
+    def tee(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pass records through while writing them.
+
+        Lets a single pass over a streaming result both save the export file
+        and feed another consumer (e.g. WebhookSink.send). Records are
+        yielded as EncodedRecord dicts, so a consumer using the same
+        serializer reuses their bytes instead of encoding them again.
+
+        Yields:
+            The input records as dictionaries, with their encoded bytes attached
+        """
+        wrap = self.serializer.wrap
+        for record in records:
+            if type(record) is not dict:
+                record = row_to_dict(record, self.columns)
+            yield wrap(record, self.write(record))
+
+    def close(self):
+        """Finish the file and atomically move it to its final path."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.export_format == 'json':
+            self._write(b']')
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._tmp_path, self.path)
+        metrics.SERIALIZE_SECONDS.inc(self.serialize_seconds, sink='file')
+
+    def abort(self):
+        """Discard the partial export without touching any existing file at the final path."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._stream is not self._raw:
+                self._stream.close()
+            self._raw.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class ExportStream:
+    """
+    Encode records into chunks for a streaming HTTP response.
+
+    Nothing is materialized: records are pulled from the iterator as chunks
+    are requested, and at most about chunk_size bytes are buffered. Closing
+    the stream (or the generator returned by iterating it) closes the
+    record iterator, which cancels the underlying query.
+
+    Usage:
+        from connectors.export_utils import ExportStream
+
+        stream = ExportStream(connector.iter_query(query), export_format='csv', compression='gzip')
+        return Response(stream, content_type=stream.content_type)
+    """
+
+    CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+    def __init__(self, records: Iterable[Dict[str, Any]], export_format: str = 'ndjson',
+                 compression: Optional[str] = None,
+                 serializer: Union[str, Serializer, None] = None,
+                 columns: Optional[Sequence[str]] = None, chunk_size: int = 64 * 1024):
+        """
+        Set up the stream; no records are read until it is iterated.
+
+        Args:
+            records: Iterable of dictionaries (or connectors.rows rows)
+            export_format: 'ndjson' or 'csv'
+            compression: None or 'gzip'
+            serializer: 'json' (default) or 'orjson' for NDJSON; a binary
+                serializer falls back to 'json'
+            columns: Column names for plain tuple rows, and the CSV header
+                (defaults to the first record's keys)
+            chunk_size: Bytes to buffer before yielding a chunk
+        """
+        if export_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format: {export_format}")
+        if compression not in (None, 'gzip'):
+            raise ValueError(f"Unsupported stream compression: {compression}")
+        self.serializer = get_serializer(serializer)
+        if self.serializer.binary:
+            self.serializer = get_serializer('json')
+
+        self.records = records
+        self.export_format = export_format
+        self.compression = compression
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.content_type = self.CONTENT_TYPES[export_format]
+        self.count = 0
+        self.bytes_sent = 0
+
+    def _encode_ndjson(self, records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        encoded = self.serializer.encoded
+        for record in records:
+            self.count += 1
+            yield encoded(record) + b'\n'
+
+    def _encode_csv(self, records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header = self.columns
+        if header is not None:
+            writer.writerow(header)
+        for record in records:
+            if header is None:
+                header = list(record)
+                writer.writerow(header)
+            writer.writerow(['' if value is None else value for value in map(record.get, header)])
+            self.count += 1
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Header only (no rows)
+            yield buffer.getvalue().encode('utf-8')
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Yield encoded (and optionally gzip-compressed) chunks.
+
+        Yields:
+            Chunks of roughly chunk_size bytes; the last may be shorter
+        """
+        records = (record if type(record) is dict else row_to_dict(record, self.columns)
+                   for record in self.records)
+        encode = self._encode_csv if self.export_format == 'csv' else self._encode_ndjson
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self.compression == 'gzip' else None
+        pending = []
+        pending_bytes = 0
+        try:
+            for data in encode(records):
+                pending.append(data)
+                pending_bytes += len(data)
+                if pending_bytes >= self.chunk_size:
+                    chunk = b''.join(pending)
+                    pending, pending_bytes = [], 0
+                    if compressor is not None:
+                        chunk = compressor.compress(chunk)
+                    if chunk:
+                        self.bytes_sent += len(chunk)
+                        yield chunk
+            chunk = b''.join(pending)
+            if compressor is not None:
+                chunk = compressor.compress(chunk) + compressor.flush()
+            if chunk:
+                self.bytes_sent += len(chunk)
+                yield chunk
+        finally:
+            # Stops the query when the client went away mid-stream
+            close = getattr(self.records, 'close', None)
+            if close is not None:
+                close()
+
+
+def open_export_writer(output_path: str, export_format: str = 'json',
+                       compression: Optional[str] = None, **options: Any):
+    """
+    Open the export writer for a format.
+
+    Args:
+        output_path: Requested output path
+        export_format: 'json', 'ndjson' or 'msgpack' (ExportWriter), or
+            'parquet' or 'arrow' (ColumnarExportWriter, needs pyarrow)
+        compression: Compression for the format
+        **options: Other writer arguments (columns, serializer, row_group_size, ...)
+
+    Returns:
+        ExportWriter or ColumnarExportWriter (same write/tee/close interface)
+    """
+    if export_format in COLUMNAR_FORMATS:
+        from connectors.columnar_export import ColumnarExportWriter
+        return ColumnarExportWriter(output_path, export_format, compression, **options)
+    return ExportWriter(output_path, export_format, compression, **options)
+
+
+def write_export(records: Iterable[Dict[str, Any]], output_path: str,
+                 export_format: str = 'json', compression: Optional[str] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 serializer: Union[str, Serializer, None] = None, **options: Any):
+    """
+    Write records to an export file in one call.
+
+    Args:
+        records: Iterable (list or generator) of dictionaries
+        output_path: Requested output path
+        export_format: 'json', 'ndjson', 'msgpack', 'parquet' or 'arrow'
+        compression: None, 'gzip' or 'zstd' (or a columnar codec)
+        columns: Column names for plain tuple rows
+        serializer: 'json', 'orjson', 'msgpack' or a Serializer
+        **options: Other writer arguments (e.g. row_group_size)
+
+    Returns:
+        The closed export writer (see .path and .count)
+    """
+    with open_export_writer(output_path, export_format, compression, columns=columns,
+                            serializer=serializer, **options) as writer:
+        writer.write_many(records)
+    return writer
@@ -0,0 +1,164 @@
+"""
+Background Job Manager
+
+Runs long export jobs on a bounded thread pool so API requests can return
+immediately with a job id. Identical jobs submitted while one is still
+queued or running are collapsed into that job.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobManager:
+    """
+    Bounded background job runner with status tracking.
+
+    Usage:
+        from connectors.job_manager import JobManager
+
+        jobs = JobManager(max_workers=2)
+        job, created = jobs.submit('birdeye_export', run_export, params={'brand_name': 'X'})
+        ...
+        jobs.get(job['id'])   # status, timings and result
+    """
+
+    def __init__(self, max_workers: int = 2, max_history: int = 500):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_workers: Maximum number of jobs running at once (others wait queued)
+            max_history: Number of finished jobs kept for status lookups
+        """
+        self.max_workers = max_workers
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._active_by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _dedup_key(name: str, params: Dict[str, Any]) -> str:
+        return f"{name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    def submit(self, name: str, func: Callable[..., Optional[Dict[str, Any]]],
+               params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a job, or return the identical job that is already queued/running.
+
+        Args:
+            name: Job name (e.g. 'birdeye_export')
+            func: Callable invoked as func(**params); its return value (a
+                JSON-serializable dict) becomes the job result
+            params: Keyword arguments for func, also used to detect duplicates
+
+        Returns:
+            Tuple of (job snapshot, created) where created is False if the
+            request was collapsed into an existing job
+        """
+        params = params or {}
+        key = self._dedup_key(name, params)
+
+        with self._lock:
+            existing_id = self._active_by_key.get(key)
+            if existing_id is not None:
+                logging.info(f"Collapsed duplicate {name} request into job {existing_id}")
+                return dict(self._jobs[existing_id]), False
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'id': job_id,
+                'name': name,
+                'params': params,
+                'status': QUEUED,
+                'created_at': _utc_now(),
+                'started_at': None,
+                'finished_at': None,
+                'queue_seconds': None,
+                'run_seconds': None,
+                'result': None,
+                'error': None,
+            }
+            self._jobs[job_id] = job
+            self._active_by_key[key] = job_id
+            self._trim_history()
+            snapshot = dict(job)
+
+        self._executor.submit(self._run, job_id, key, func, params, time.monotonic())
+        logging.info(f"Queued {name} job {job_id}")
+        return snapshot, True
+
+    def _run(self, job_id: str, key: str, func: Callable, params: Dict[str, Any], queued_at: float):
+        started = time.monotonic()
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = RUNNING
+            job['started_at'] = _utc_now()
+            job['queue_seconds'] = round(started - queued_at, 3)
+
+        try:
+            result = func(**params)
+            status, error = SUCCEEDED, None
+        except Exception as e:
+            logging.error(f"Job {job_id} ({job['name']}) failed: {e}", exc_info=True)
+            result, status, error = None, FAILED, str(e)
+
+        with self._lock:
+            job['status'] = status
+            job['result'] = result
+            job['error'] = error
+            job['finished_at'] = _utc_now()
+            job['run_seconds'] = round(time.monotonic() - started, 3)
+            if self._active_by_key.get(key) == job_id:
+                del self._active_by_key[key]
+        logging.info(f"Job {job_id} ({job['name']}) {status} in {job['run_seconds']}s")
+
+    def _trim_history(self):
+        """Drop the oldest finished jobs beyond max_history (lock must be held)."""
+        excess = len(self._jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in [j for j, job in self._jobs.items() if job['status'] not in ACTIVE_STATUSES][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a snapshot of a job.
+
+        Returns:
+            Job dictionary, or None if the id is unknown (or expired from history)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, int]:
+        """Number of tracked jobs per status."""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return counts
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,107 @@
+"""
+Keyset Pagination
+
+Pages through an ordered query by remembering the sort key of the last row
+returned, instead of skipping rows with OFFSET. Each page is a seek on the
+(indexed) key, so page 1000 costs the same as page 1, and rows inserted
+while a client is paging do not shift later pages.
+
+The last key is handed to clients as an opaque cursor token: URL-safe
+base64 of a small JSON document with the key values and a fingerprint of
+the query's filters, so a token cannot be replayed against a different
+filter set.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor token that is malformed or belongs to other filters."""
+
+
+def _fingerprint(scope: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not scope:
+        return None
+    canonical = json.dumps(scope, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(row: Dict[str, Any], columns: Sequence[str],
+                  scope: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cursor token for the page after `row`.
+
+    Args:
+        row: Last row of the current page
+        columns: Sort key columns, in ORDER BY order
+        scope: Filters the page was queried with
+
+    Returns:
+        Opaque URL-safe token (dates are kept as ISO strings)
+    """
+    payload = {'k': [row[column] for column in columns]}
+    fingerprint = _fingerprint(scope)
+    if fingerprint:
+        payload['f'] = fingerprint
+    encoded = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(encoded).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token: str, columns: Sequence[str],
+                  scope: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Read the sort key back from a cursor token.
+
+    Args:
+        token: Token returned by encode_cursor
+        columns: Sort key columns, in ORDER BY order
+        scope: Filters of the current request; must match those of the token
+
+    Returns:
+        Dictionary of column -> last key value
+
+    Raises:
+        InvalidCursorError: If the token is malformed or was issued for other filters
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = payload['k']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Malformed cursor token")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursorError("Malformed cursor token")
+    if payload.get('f') != _fingerprint(scope):
+        raise InvalidCursorError("Cursor token was issued for different filters")
+    return dict(zip(columns, values))
+
+
+def keyset_condition(columns: Sequence[str], after: Dict[str, Any],
+                     descending: bool = True) -> Tuple[str, List[Any]]:
+    """
+    SQL condition selecting the rows after a key, for ORDER BY columns (all DESC or all ASC).
+
+    For (a, b) descending this is "(a < ? OR (a = ? AND b < ?))", which
+    databases without row-value comparisons can still answer from an index
+    on (a, b).
+
+    Args:
+        columns: Sort key columns, in ORDER BY order
+        after: Key of the last row already returned (from decode_cursor)
+        descending: Whether the ORDER BY is descending
+
+    Returns:
+        Tuple of (condition with ? placeholders, parameters)
+    """
+    operator = '<' if descending else '>'
+    clauses = []
+    params: List[Any] = []
+    for i, column in enumerate(columns):
+        terms = [f"{previous} = ?" for previous in columns[:i]] + [f"{column} {operator} ?"]
+        clauses.append(terms[0] if len(terms) == 1 else f"({' AND '.join(terms)})")
+        params.extend(after[name] for name in columns[:i + 1])
+    return f"({' OR '.join(clauses)})", params
@@ -2,56 +2,281 @@
 Logging utility for ODBC Data Bridge scripts
 
 Provides consistent logging configuration across all service scripts.
+
+By default log calls only format the message and put it on an in-memory
+queue; a QueueListener thread does the file and console I/O, so request
+and export threads never block on disk or stdout. Output can be plain text
+or one JSON object per line (read as structured logs by Cloud Logging),
+log files rotate by size, and noisy call sites can be rate limited or
+sampled.
 """
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from connectors import metrics
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+TEXT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+LOG_FORMATS = ('text', 'json')
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# One background listener per configured logger (replaced on reconfiguration)
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+_listeners_lock = threading.Lock()
 
 
-def setup_logger(script_name: str, log_dir: str = 'logs', log_level: str = 'INFO') -> logging.Logger:
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+    
+    Uses the field names Cloud Logging recognizes on stdout (severity,
+    message), plus the logger name, source location, exception text and any
+    `extra` fields passed to the log call.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'severity': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Throttle high-frequency INFO/DEBUG messages.
+    
+    Each call site (file and line) may log `rate` records per second, with
+    bursts of up to `burst`; excess records are dropped and the next record
+    that gets through notes how many were suppressed. WARNING and above are
+    never limited.
+    
+    A log call can also ask to be sampled: logger.info(..., extra={'sample_rate': 0.01})
+    keeps roughly 1% of the records from that call.
+    """
+    
+    def __init__(self, rate: float = 0, burst: Optional[float] = None):
+        """
+        Initialize the filter.
+        
+        Args:
+            rate: Records per second per call site (0 = no rate limit, sampling only)
+            burst: Bucket size (defaults to max(rate, 1))
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self.suppressed_total = 0
+        self._lock = threading.Lock()
+        # (pathname, lineno) -> [tokens, last refill time, suppressed since last emit]
+        self._buckets: Dict[Tuple[str, int], list] = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        
+        sample_rate = getattr(record, 'sample_rate', None)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+        if not self.rate:
+            return True
+        
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get((record.pathname, record.lineno))
+            if bucket is None:
+                bucket = self._buckets[(record.pathname, record.lineno)] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.suppressed_total += 1
+                metrics.LOG_RECORDS_DROPPED.inc(logger=record.name, reason='rate_limited')
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+            record.args = None
+            record.suppressed = suppressed
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the logging thread.
+    
+    Records are formatted on the calling thread (so mutable arguments are
+    captured as they were) and dropped, with a count, if the queue is full.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Render the traceback now; the listener thread only sees exc_text
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.LOG_RECORDS_DROPPED.inc(logger=record.name, reason='queue_full')
+
+
+def _stop_listener(name: str):
+    """Flush and stop the background listener of a logger, if any."""
+    with _listeners_lock:
+        listener = _listeners.pop(name, None)
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def shutdown_logging():
+    """Flush and stop every background log listener (registered with atexit)."""
+    for name in list(_listeners):
+        _stop_listener(name)
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(script_name: str, log_dir: Optional[str] = None, log_level: Optional[str] = None,
+                 log_format: Optional[str] = None, log_to_file: Optional[bool] = None,
+                 async_logging: Optional[bool] = None, max_bytes: Optional[int] = None,
+                 backup_count: Optional[int] = None, rate_limit: Optional[float] = None,
+                 queue_size: Optional[int] = None) -> logging.Logger:
     """
     Set up a logger for a service script with file and console handlers.
     
+    Settings not passed here come from the LOG_* environment variables
+    (see config_loader.get_log_config).
+    
     Args:
         script_name: Name of the script (used for log filename)
         log_dir: Directory to store log files
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_format: 'text' or 'json' (one JSON object per line)
+        log_to_file: Also write to a log file (console only when False, e.g. on Cloud Run)
+        async_logging: Do file and console I/O on a background QueueListener thread
+        max_bytes: Rotate the log file at this size (0 = never)
+        backup_count: Rotated log files to keep
+        rate_limit: INFO/DEBUG records per second allowed per call site (0 = unlimited)
+        queue_size: Records buffered for the background thread before dropping
     
     Returns:
         Configured logger instance
     """
-    # Create logs directory if it doesn't exist
-    os.makedirs(log_dir, exist_ok=True)
+    from connectors.config_loader import get_log_config
+    
+    config = get_log_config()
+    log_dir = config['log_dir'] if log_dir is None else log_dir
+    log_level = config['log_level'] if log_level is None else log_level
+    log_format = config['log_format'] if log_format is None else log_format
+    log_to_file = config['log_to_file'] if log_to_file is None else log_to_file
+    async_logging = config['async_logging'] if async_logging is None else async_logging
+    max_bytes = config['max_bytes'] if max_bytes is None else max_bytes
+    backup_count = config['backup_count'] if backup_count is None else backup_count
+    rate_limit = config['rate_limit'] if rate_limit is None else rate_limit
+    queue_size = config['queue_size'] if queue_size is None else queue_size
+    
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unsupported log format: {log_format} (choose from {', '.join(LOG_FORMATS)})")
+    level = getattr(logging, log_level.upper())
     
     # Create logger
     logger = logging.getLogger(script_name)
-    logger.setLevel(getattr(logging, log_level.upper()))
+    logger.setLevel(level)
     
-    # Clear existing handlers to avoid duplicates
+    # Clear existing handlers and filters to avoid duplicates
+    _stop_listener(script_name)
+    for handler in logger.handlers:
+        handler.close()
     logger.handlers.clear()
+    logger.filters.clear()
+    
+    # Create formatter
+    if log_format == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATEFMT)
     
-    # Create file handler with timestamp in filename
-    timestamp = datetime.now().strftime('%Y%m%d')
-    log_filename = os.path.join(log_dir, f"{script_name}_{timestamp}.log")
-    file_handler = logging.FileHandler(log_filename)
-    file_handler.setLevel(getattr(logging, log_level.upper()))
+    handlers = []
+    
+    if log_to_file:
+        # Create logs directory if it doesn't exist
+        os.makedirs(log_dir, exist_ok=True)
+        
+        # Create file handler with timestamp in filename, rotated by size
+        timestamp = datetime.now().strftime('%Y%m%d')
+        log_filename = os.path.join(log_dir, f"{script_name}_{timestamp}.log")
+        if max_bytes:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_filename, maxBytes=max_bytes, backupCount=backup_count))
+        else:
+            handlers.append(logging.FileHandler(log_filename))
     
     # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(getattr(logging, log_level.upper()))
+    handlers.append(logging.StreamHandler())
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    for handler in handlers:
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
     
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    if async_logging:
+        # Log calls only enqueue; the listener thread writes to the real handlers
+        log_queue = queue.Queue(maxsize=queue_size)
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        with _listeners_lock:
+            _listeners[script_name] = listener
+        logger.addHandler(NonBlockingQueueHandler(log_queue))
+    else:
+        # Add handlers to logger
+        for handler in handlers:
+            logger.addHandler(handler)
     
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Per call-site rate limit, and per-call sampling (extra={'sample_rate': ...})
+    logger.addFilter(RateLimitFilter(rate_limit))
     
     return logger
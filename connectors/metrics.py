@@ -0,0 +1,262 @@
+"""
+Pipeline Metrics
+
+Minimal thread-safe counters and histograms rendered in the Prometheus text
+exposition format, so each pipeline stage (connect, query, fetch, serialize,
+webhook, HTTP request) can be timed without extra dependencies.
+
+Usage:
+    from connectors import metrics
+
+    with metrics.DB_QUERY_SECONDS.time(operation='iter_query'):
+        cursor.execute(query)
+    metrics.DB_ROWS_FETCHED.inc(len(rows))
+
+    text = metrics.render()   # served at GET /metrics
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the counter for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (e.g. seconds) in cumulative buckets."""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        """Record one observation for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager that observes the elapsed wall-clock seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            plain = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{plain} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{plain} {state[-1]}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and gauge collectors and renders them as Prometheus text."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]):
+        """
+        Register a callable evaluated at scrape time.
+
+        The callable returns (name, help, labels, value) tuples that are
+        exposed as gauges, e.g. connection pool sizes or cache entries.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        blocks = [metric.render() for metric in metrics]
+
+        gauges: Dict[str, Tuple[str, List[str]]] = {}
+        for collector in collectors:
+            for name, help_text, labels, value in collector():
+                names = tuple(labels)
+                sample = f"{name}{_format_labels(names, [labels[n] for n in names])} {_format_value(value)}"
+                gauges.setdefault(name, (help_text, []))[1].append(sample)
+        for name, (help_text, samples) in gauges.items():
+            blocks.append('\n'.join([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", *samples]))
+
+        return '\n'.join(blocks) + '\n'
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def render() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+# Database stages
+DB_CONNECT_SECONDS = Histogram(
+    'databridge_db_connect_seconds', 'Time to obtain a database connection', ['mode'])
+DB_QUERY_SECONDS = Histogram(
+    'databridge_db_query_seconds', 'Time to execute a statement (until the cursor is ready)', ['operation'])
+DB_FETCH_SECONDS = Histogram(
+    'databridge_db_fetch_seconds', 'Time spent fetching result rows per fetch call', ['operation'])
+DB_ROWS_FETCHED = Counter(
+    'databridge_db_rows_fetched_total', 'Rows fetched from the database', ['operation'])
+DB_ROWS_WRITTEN = Counter(
+    'databridge_db_rows_written_total', 'Rows written with execute_many/bulk_insert')
+DB_ERRORS = Counter(
+    'databridge_db_errors_total', 'Database errors', ['stage'])
+
+# Export stages
+SERIALIZE_SECONDS = Counter(
+    'databridge_serialize_seconds_total', 'Cumulative time spent encoding records', ['sink'])
+EXPORT_SECONDS = Histogram(
+    'databridge_export_seconds', 'End-to-end export duration', ['service'])
+EXPORT_RECORDS = Counter(
+    'databridge_export_records_total', 'Records written to export files', ['service'])
+
+# Webhook delivery
+WEBHOOK_REQUEST_SECONDS = Histogram(
+    'databridge_webhook_request_seconds', 'Webhook POST latency per attempt', ['service', 'outcome'])
+WEBHOOK_BYTES_SENT = Counter(
+    'databridge_webhook_bytes_sent_total', 'Payload bytes delivered to webhooks', ['service'])
+WEBHOOK_RECORDS_SENT = Counter(
+    'databridge_webhook_records_sent_total', 'Records delivered to webhooks', ['service'])
+WEBHOOK_RETRIES = Counter(
+    'databridge_webhook_retries_total', 'Webhook batch retries', ['service'])
+WEBHOOK_ERRORS = Counter(
+    'databridge_webhook_errors_total', 'Webhook batches that failed after all retries', ['service'])
+WEBHOOK_THROTTLED = Counter(
+    'databridge_webhook_throttled_total',
+    'Delivery controller reactions: 429s, Retry-After pauses, slow responses and fast failures while the circuit is open',
+    ['endpoint', 'reason'])
+
+# Delivery spool
+SPOOL_BATCHES = Counter(
+    'databridge_spool_batches_total',
+    'Undelivered webhook batches spooled, and spooled batches replayed, failed again or rejected',
+    ['service', 'outcome'])
+
+# HTTP API
+HTTP_REQUEST_SECONDS = Histogram(
+    'databridge_http_request_seconds', 'API request latency', ['method', 'endpoint', 'status'])
+STREAM_EXPORTS = Counter(
+    'databridge_stream_exports_total', 'Streaming export responses by outcome', ['job', 'outcome'])
+STREAM_EXPORT_ROWS = Counter(
+    'databridge_stream_export_rows_total', 'Rows sent by streaming exports', ['job'])
+
+# Scheduler
+SCHEDULER_RUNS = Counter(
+    'databridge_scheduler_runs_total', 'Scheduled job runs by outcome', ['job', 'outcome'])
+SCHEDULER_RUN_SECONDS = Histogram(
+    'databridge_scheduler_run_seconds', 'Scheduled job run duration', ['job'])
+
+# Export pipeline
+PIPELINE_ITEMS = Counter(
+    'databridge_pipeline_items_total', 'Records (or row batches) passed on by each export pipeline stage',
+    ['pipeline', 'stage'])
+PIPELINE_WAIT_SECONDS = Counter(
+    'databridge_pipeline_wait_seconds_total',
+    'Time pipeline stages waited: side=output for room in the queue, side=consumer for the next chunk',
+    ['pipeline', 'stage', 'side'])
+
+# Logging
+LOG_RECORDS_DROPPED = Counter(
+    'databridge_log_records_dropped_total', 'Log records dropped by rate limiting or a full log queue',
+    ['logger', 'reason'])
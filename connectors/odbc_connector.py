@@ -7,7 +7,19 @@ Can be imported and used across multiple service scripts.
 
 import pyodbc
 import logging
-from typing import Optional, List, Dict, Any
+import re
+import time
+from itertools import chain, islice
+from typing import Optional, List, Dict, Any, Iterator, Iterable, Sequence
+
+from connectors.connection_pool import ConnectionPool, get_pool
+from connectors.query_cache import QueryCache
+from connectors.partitioned_reader import PartitionedReader
+from connectors.rows import ROW_FACTORIES, make_row_factory
+from connectors import metrics
+
+# Table/column names cannot be bound as parameters, so only plain identifiers are accepted
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
 
 
 class ODBCConnector:
@@ -29,14 +41,35 @@ class ODBCConnector:
         with connector:
             data = connector.execute_query("SELECT * FROM table")
             
+        # Stream large result sets with bounded memory
+        with connector:
+            for row in connector.iter_query("SELECT * FROM table", batch_size=5000):
+                ...
+            
         # Or manage connection manually
         connector.connect()
         data = connector.execute_query("SELECT * FROM table")
         connector.close()
+        
+        # Borrow from the process-wide connection pool instead of opening
+        # a new connection (close() returns it to the pool)
+        connector = ODBCConnector(..., use_pool=True)
+        with connector:
+            data = connector.execute_query("SELECT * FROM table")
+        
+        # Serve repeated queries from a shared result cache
+        connector = ODBCConnector(..., use_pool=True, cache=get_query_cache())
+        with connector:
+            data = connector.execute_query("SELECT * FROM table", cache_ttl=30)
+        
+        # Compact rows for large result sets (row.src_lead_id or row.get('src_lead_id'))
+        connector = ODBCConnector(..., row_factory='namedtuple')
     """
     
     def __init__(self, driver: str, server: str, database: str, 
-                 username: str, password: str, port: Optional[int] = None):
+                 username: str, password: str, port: Optional[int] = None,
+                 use_pool: bool = False, cache: Optional[QueryCache] = None,
+                 row_factory: str = 'dict'):
         """
         Initialize the ODBC connector with connection parameters.
         
@@ -47,14 +80,26 @@ class ODBCConnector:
             username: Database username
             password: Database password
             port: Optional port number
+            use_pool: Borrow connections from the shared ConnectionPool for
+                these parameters instead of opening a dedicated connection
+            cache: Optional QueryCache consulted by execute_query
+            row_factory: Row representation returned by execute_query/iter_query:
+                'dict' (default), 'tuple', 'namedtuple' or 'slots' (see connectors.rows)
         """
+        if row_factory not in ROW_FACTORIES:
+            raise ValueError(f"Unknown row_factory: {row_factory!r} (choose from {', '.join(ROW_FACTORIES)})")
+        
         self.driver = driver
         self.server = server
         self.database = database
         self.username = username
         self.password = password
         self.port = port
+        self.use_pool = use_pool
+        self.cache = cache
+        self.row_factory = row_factory
         self.connection = None
+        self._pool = None
         
     def _build_connection_string(self) -> str:
         """Build the ODBC connection string from parameters."""
@@ -102,10 +147,19 @@ class ODBCConnector:
             # CodeQL may flag this as logging sensitive data, but password is already masked above
             logging.debug(f"Attempting to connect with connection string: {safe_conn_str}")
             
-            self.connection = pyodbc.connect(connection_string)
+            if self.use_pool:
+                self._pool = get_pool(connection_string)
+                with metrics.DB_CONNECT_SECONDS.time(mode='pool'):
+                    self.connection = self._pool.acquire()
+                logging.debug("Checked out pooled database connection")
+                return self.connection
+            
+            with metrics.DB_CONNECT_SECONDS.time(mode='direct'):
+                self.connection = pyodbc.connect(connection_string)
             logging.info("Successfully connected to database")
             return self.connection
         except pyodbc.Error as e:
+            metrics.DB_ERRORS.inc(stage='connect')
             logging.error(f"Failed to connect to database: {e}")
             raise
     
@@ -131,33 +185,117 @@ class ODBCConnector:
         self.close()
         return False
     
-    def execute_query(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+    def _execute(self, query: str, params: Optional[tuple] = None,
+                 operation: str = 'query') -> pyodbc.Cursor:
+        """Create a cursor and execute a query on the active connection."""
+        if not self.connection:
+            raise RuntimeError("No active connection. Use context manager (with statement) or call connect() first.")
+        
+        cursor = self.connection.cursor()
+        
+        try:
+            with metrics.DB_QUERY_SECONDS.time(operation=operation):
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+        except Exception as e:
+            if isinstance(e, pyodbc.Error):
+                metrics.DB_ERRORS.inc(stage='query')
+            cursor.close()
+            raise
+        
+        return cursor
+    
+    def _open_cursor(self, query: str, params: Optional[tuple], batch_size: int,
+                     operation: str) -> pyodbc.Cursor:
+        """Validate batch_size and execute a query for one of the streaming APIs."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        try:
+            return self._execute(query, params, operation)
+        except pyodbc.Error as e:
+            logging.error(f"Query execution failed: {e}")
+            raise
+    
+    @staticmethod
+    def _fetch_batches(cursor: pyodbc.Cursor, batch_size: int, operation: str) -> Iterator[List[Any]]:
+        """
+        Yield lists of raw rows via fetchmany, closing the cursor when done.
+        
+        If the consumer stops early (closes the generator, e.g. a streaming
+        HTTP client disconnected) the statement is cancelled so the server
+        stops producing rows that nobody will read.
+        """
+        total = 0
+        try:
+            while True:
+                with metrics.DB_FETCH_SECONDS.time(operation=operation):
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                total += len(rows)
+                metrics.DB_ROWS_FETCHED.inc(len(rows), operation=operation)
+                yield rows
+            logging.info(f"Query streamed successfully, returned {total} rows")
+        except GeneratorExit:
+            logging.info(f"Query streaming stopped by the consumer after {total} rows, cancelling")
+            try:
+                cursor.cancel()
+            except pyodbc.Error as e:
+                logging.debug(f"Error cancelling query: {e}")
+            raise
+        except pyodbc.Error as e:
+            metrics.DB_ERRORS.inc(stage='fetch')
+            logging.error(f"Query streaming failed after {total} rows: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    def execute_query(self, query: str, params: Optional[tuple] = None,
+                      cache_ttl: Optional[float] = None,
+                      row_factory: Optional[str] = None) -> List[Any]:
         """
-        Execute a SELECT query and return results as a list of dictionaries.
+        Execute a SELECT query and return results as a list of dictionaries
+        (or the connector's row_factory representation).
+        
+        When the connector has a cache, results are served from it and
+        concurrent identical queries share one database round trip.
         
         Args:
             query: SQL query string
             params: Optional tuple of query parameters
+            cache_ttl: Seconds to cache this result (cache default when None,
+                0 bypasses the cache)
+            row_factory: Override the connector's row_factory for this query
             
         Returns:
-            List of dictionaries with column names as keys
+            List of rows, dictionaries with column names as keys by default
+            (read-only when cached)
         """
-        if not self.connection:
-            raise RuntimeError("No active connection. Use context manager (with statement) or call connect() first.")
-        
+        row_factory = row_factory or self.row_factory
+        if self.cache is not None and cache_ttl != 0:
+            return self.cache.get_or_load(
+                query, params, lambda: self._fetch_all(query, params, row_factory), ttl=cache_ttl,
+                variant='' if row_factory == 'dict' else row_factory
+            )
+        return self._fetch_all(query, params, row_factory)
+    
+    def _fetch_all(self, query: str, params: Optional[tuple] = None,
+                   row_factory: str = 'dict') -> List[Any]:
+        """Run a query and build the full list of rows."""
         try:
-            cursor = self.connection.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            cursor = self._execute(query, params, 'execute_query')
             
             columns = [column[0] for column in cursor.description]
-            results = []
+            make_row = make_row_factory(row_factory, columns)
+            
+            with metrics.DB_FETCH_SECONDS.time(operation='execute_query'):
+                rows = cursor.fetchall()
+            metrics.DB_ROWS_FETCHED.inc(len(rows), operation='execute_query')
             
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
+            results = list(map(make_row, rows))
             
             logging.info(f"Query executed successfully, returned {len(results)} rows")
             return results
@@ -166,6 +304,222 @@ class ODBCConnector:
             logging.error(f"Query execution failed: {e}")
             raise
     
+    def describe_query(self, query: str, params: Optional[tuple] = None) -> List[tuple]:
+        """
+        Execute a query only for its column metadata.
+        
+        Pass a query that matches no rows (e.g. with an AND 1 = 0 condition)
+        so the database returns the column types without reading any data.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            
+        Returns:
+            cursor.description (name, type_code, display_size, internal_size,
+            precision, scale, null_ok per column), e.g. for
+            columnar_export.arrow_schema
+        """
+        cursor = self._execute(query, params, 'describe')
+        try:
+            return [tuple(column) for column in cursor.description]
+        finally:
+            cursor.close()
+    
+    def iter_query(self, query: str, params: Optional[tuple] = None,
+                   batch_size: int = 1000, batches: bool = False,
+                   row_factory: Optional[str] = None) -> Iterator[Any]:
+        """
+        Execute a SELECT query and stream the results with bounded memory.
+        
+        Rows are pulled from the cursor with fetchmany(batch_size), so at most
+        one batch is held in memory at a time. The connection must stay open
+        until the generator is exhausted or closed.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            batch_size: Number of rows fetched per round trip
+            batches: Yield lists of up to batch_size rows instead of single rows
+            row_factory: Override the connector's row_factory for this query
+            
+        Yields:
+            Rows, dictionaries with column names as keys by default (or lists
+            of rows when batches=True)
+        """
+        cursor = self._open_cursor(query, params, batch_size, 'iter_query')
+        columns = [column[0] for column in cursor.description]
+        make_row = make_row_factory(row_factory or self.row_factory, columns)
+        
+        for rows in self._fetch_batches(cursor, batch_size, 'iter_query'):
+            if batches:
+                yield list(map(make_row, rows))
+            else:
+                yield from map(make_row, rows)
+    
+    def iter_query_columns(self, query: str, params: Optional[tuple] = None,
+                           batch_size: int = 10000) -> Iterator[Dict[str, tuple]]:
+        """
+        Execute a SELECT query and stream the results as column batches.
+        
+        Each fetchmany batch is transposed once into one tuple per column, so
+        no per-row dictionaries are built. Feeds MappingTransform.iter_transform_columns.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            batch_size: Number of rows fetched per round trip
+        
+        Yields:
+            Dictionaries of column name -> tuple of up to batch_size values
+        """
+        cursor = self._open_cursor(query, params, batch_size, 'columns')
+        columns = [column[0] for column in cursor.description]
+        
+        for rows in self._fetch_batches(cursor, batch_size, 'columns'):
+            yield dict(zip(columns, zip(*rows)))
+    
+    def iter_query_arrow(self, query: str, params: Optional[tuple] = None,
+                         batch_size: int = 65536) -> Iterator[Any]:
+        """
+        Execute a SELECT query and stream the results as pyarrow RecordBatches.
+        
+        The schema is derived from cursor.description (types the driver does
+        not report are inferred from the first batch), and each fetchmany
+        batch is converted column by column without per-row dictionaries.
+        Feeds ColumnarExportWriter.write_batch. Requires pyarrow.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            batch_size: Number of rows fetched per round trip (one batch each)
+        
+        Yields:
+            pyarrow.RecordBatch with up to batch_size rows (one empty batch
+            for an empty result, so the schema is still known)
+        """
+        from connectors.columnar_export import arrow_schema, rows_to_batch
+        
+        cursor = self._open_cursor(query, params, batch_size, 'arrow')
+        schema = None
+        
+        for rows in self._fetch_batches(cursor, batch_size, 'arrow'):
+            if schema is None:
+                schema = arrow_schema(cursor.description, rows)
+            yield rows_to_batch(rows, schema)
+        if schema is None:
+            yield rows_to_batch([], arrow_schema(cursor.description))
+    
+    def clone(self) -> 'ODBCConnector':
+        """Create a new, unconnected connector with the same settings."""
+        return ODBCConnector(
+            driver=self.driver,
+            server=self.server,
+            database=self.database,
+            username=self.username,
+            password=self.password,
+            port=self.port,
+            use_pool=self.use_pool,
+            cache=self.cache,
+            row_factory=self.row_factory
+        )
+    
+    def iter_query_partitioned(self, query: str, key_column: str, partitions: Sequence[Any],
+                               params: Optional[tuple] = None, max_workers: int = 4,
+                               batch_size: int = 1000, ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a query split into key ranges that run concurrently on separate connections.
+        
+        Does not need (or use) this connector's own connection; each partition
+        connects through a clone, so with use_pool=True the connections come
+        from the shared pool (size it for max_workers).
+        
+        Args:
+            query: SQL query; put {partition} where the range predicate belongs
+                (e.g. "... WHERE installed_jobs > 0 AND {partition}")
+            key_column: Column the partitions are defined on
+            partitions: Disjoint (lower, upper) half-open ranges, e.g. from
+                partitioned_reader.date_partitions or range_partitions
+                (None as a bound leaves that end open)
+            params: Parameters for ? placeholders before {partition}
+            max_workers: Partitions queried at once
+            batch_size: Rows fetched per round trip in each partition
+            ordered: Yield partitions in the given order instead of as rows arrive
+            
+        Yields:
+            Row dictionaries
+        """
+        reader = PartitionedReader(self.clone, max_workers=max_workers, batch_size=batch_size)
+        return reader.iter_rows(query, key_column, partitions, params=params, ordered=ordered)
+    
+    @staticmethod
+    def _rows_to_frame(columns: List[str], rows: List[Any],
+                       dtypes: Optional[Dict[str, Any]] = None):
+        """Build a pandas DataFrame from a chunk of cursor rows, one typed array per column."""
+        import pandas as pd
+        
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        data = {}
+        for name, column in zip(columns, values):
+            dtype = dtypes.get(name) if dtypes else None
+            data[name] = pd.Series(column, dtype=dtype)
+        return pd.DataFrame(data, columns=columns)
+    
+    def iter_query_frames(self, query: str, params: Optional[tuple] = None,
+                          chunk_size: int = 10000,
+                          dtypes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Execute a SELECT query and stream the results as pandas DataFrame chunks.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            chunk_size: Number of rows fetched per chunk
+            dtypes: Optional mapping of column name to dtype (e.g. {'revenue': 'float64'});
+                other columns use pandas type inference
+            
+        Yields:
+            pandas.DataFrame with up to chunk_size rows
+        """
+        cursor = self._open_cursor(query, params, chunk_size, 'columnar')
+        columns = [column[0] for column in cursor.description]
+        
+        for rows in self._fetch_batches(cursor, chunk_size, 'columnar'):
+            yield self._rows_to_frame(columns, rows, dtypes)
+    
+    def execute_query_columnar(self, query: str, params: Optional[tuple] = None,
+                               dtypes: Optional[Dict[str, Any]] = None,
+                               chunk_size: int = 10000):
+        """
+        Execute a SELECT query and return results as a pandas DataFrame.
+        
+        Rows are fetched chunk by chunk into typed column arrays instead of
+        building one dictionary per row.
+        
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            dtypes: Optional mapping of column name to dtype
+            chunk_size: Number of rows fetched per round trip
+            
+        Returns:
+            pandas.DataFrame with one column per result column
+        """
+        import pandas as pd
+        
+        cursor = self._open_cursor(query, params, chunk_size, 'columnar')
+        columns = [column[0] for column in cursor.description]
+        
+        frames = [self._rows_to_frame(columns, rows, dtypes)
+                  for rows in self._fetch_batches(cursor, chunk_size, 'columnar')]
+        
+        if not frames:
+            # Keep the column names (and requested dtypes) for empty results
+            return self._rows_to_frame(columns, [], dtypes)
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+    
     def execute_non_query(self, query: str, params: Optional[tuple] = None) -> int:
         """
         Execute an INSERT, UPDATE, or DELETE query.
@@ -177,16 +531,8 @@ class ODBCConnector:
         Returns:
             Number of rows affected
         """
-        if not self.connection:
-            raise RuntimeError("No active connection. Use context manager (with statement) or call connect() first.")
-        
         try:
-            cursor = self.connection.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+            cursor = self._execute(query, params, 'execute_non_query')
             
             self.connection.commit()
             rows_affected = cursor.rowcount
@@ -199,9 +545,153 @@ class ODBCConnector:
             logging.error(f"Non-query execution failed: {e}")
             raise
     
+    def _supports_fast_executemany(self) -> bool:
+        """fast_executemany is implemented by Microsoft's SQL Server ODBC drivers."""
+        return 'sql server' in (self.driver or '').lower()
+    
+    def execute_many(self, query: str, rows: Iterable[Sequence[Any]], batch_size: int = 1000,
+                     commit_every: Optional[int] = None,
+                     fast_executemany: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Execute a parameterized INSERT/UPDATE/DELETE for many rows in batches.
+        
+        Rows are sent with cursor.executemany one batch at a time and committed
+        in chunks, so N rows cost N / batch_size round trips instead of N.
+        If a batch fails (or the row iterable raises), the uncommitted chunk
+        is rolled back and the error re-raised; earlier chunks stay committed.
+        
+        Args:
+            query: SQL statement with ? placeholders
+            rows: Iterable of parameter sequences (consumed lazily)
+            batch_size: Rows per executemany call
+            commit_every: Rows per transaction (defaults to batch_size; rounded
+                up to whole batches)
+            fast_executemany: Use pyodbc's array binding; defaults to on for
+                SQL Server drivers, which support it
+            
+        Returns:
+            Dictionary with rows, batches, commits, elapsed seconds and rows_per_sec
+        """
+        if not self.connection:
+            raise RuntimeError("No active connection. Use context manager (with statement) or call connect() first.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        commit_every = commit_every or batch_size
+        if fast_executemany is None:
+            fast_executemany = self._supports_fast_executemany()
+        
+        cursor = self.connection.cursor()
+        cursor.fast_executemany = fast_executemany
+        
+        started = time.monotonic()
+        iterator = iter(rows)
+        total = committed = batches = commits = pending = 0
+        
+        try:
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                with metrics.DB_QUERY_SECONDS.time(operation='execute_many'):
+                    cursor.executemany(query, batch)
+                metrics.DB_ROWS_WRITTEN.inc(len(batch))
+                batches += 1
+                total += len(batch)
+                pending += len(batch)
+                if pending >= commit_every:
+                    self.connection.commit()
+                    commits += 1
+                    committed = total
+                    pending = 0
+            if pending:
+                self.connection.commit()
+                commits += 1
+                committed = total
+        except Exception as e:
+            # Errors from the caller's rows too: a partly executed chunk must not
+            # stay pending on the connection until the pool releases it
+            if isinstance(e, pyodbc.Error):
+                metrics.DB_ERRORS.inc(stage='execute_many')
+            self.connection.rollback()
+            logging.error(f"Bulk execution failed after {committed} committed rows: {e}")
+            raise
+        finally:
+            cursor.close()
+        
+        elapsed = time.monotonic() - started
+        stats = {
+            'rows': total,
+            'batches': batches,
+            'commits': commits,
+            'elapsed': round(elapsed, 3),
+            'rows_per_sec': round(total / elapsed, 1) if elapsed > 0 else float(total),
+        }
+        logging.info(
+            f"Bulk execution completed: {total} rows in {batches} batches, "
+            f"{commits} commits, {stats['rows_per_sec']} rows/sec"
+        )
+        return stats
+    
+    def bulk_insert(self, table: str, rows: Iterable[Any], columns: Optional[Sequence[str]] = None,
+                    batch_size: int = 1000, commit_every: Optional[int] = None,
+                    fast_executemany: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Insert many rows into a table using batched executemany.
+        
+        Args:
+            table: Table name (optionally schema-qualified)
+            rows: Iterable of dictionaries or sequences
+            columns: Column names; required for sequences, defaults to the
+                first dictionary's keys
+            batch_size: Rows per executemany call
+            commit_every: Rows per transaction (defaults to batch_size)
+            fast_executemany: See execute_many()
+            
+        Returns:
+            Dictionary with rows, batches, commits, elapsed seconds and rows_per_sec
+        """
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if first is None:
+            logging.info(f"Bulk insert into {table}: no rows")
+            return {'rows': 0, 'batches': 0, 'commits': 0, 'elapsed': 0.0, 'rows_per_sec': 0.0}
+        
+        as_dicts = isinstance(first, dict)
+        if columns is None:
+            if not as_dicts:
+                raise ValueError("columns are required when rows are sequences")
+            columns = list(first.keys())
+        
+        for name in [table, *columns]:
+            if not _IDENTIFIER.match(name):
+                raise ValueError(f"Invalid SQL identifier: {name!r}")
+        
+        query = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+        
+        def params():
+            for row in chain([first], iterator):
+                yield tuple(row.get(column) for column in columns) if as_dicts else tuple(row)
+        
+        return self.execute_many(query, params(), batch_size=batch_size,
+                                 commit_every=commit_every, fast_executemany=fast_executemany)
+    
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        """The ConnectionPool backing this connector, if use_pool is enabled and connected."""
+        return self._pool
+    
     def close(self):
-        """Close the database connection."""
+        """Close the database connection (or return it to the pool)."""
         if self.connection:
+            if self._pool is not None:
+                self._pool.release(self.connection)
+                self.connection = None
+                logging.debug("Returned database connection to pool")
+                return
             self.connection.close()
             self.connection = None
             logging.info("Database connection closed")
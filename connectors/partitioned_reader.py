@@ -0,0 +1,234 @@
+"""
+Parallel Partitioned Reader
+
+Splits a query into disjoint key ranges (e.g. install_date day buckets or
+src_lead_id ranges) and runs the partitions concurrently, each on its own
+connection, merging the rows into one ordered or unordered stream.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Marks the end of one partition's rows in a queue
+_DONE = object()
+
+
+class _PartitionError:
+    """Wraps an exception raised by a partition worker."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def date_partitions(start: date, end: date, days: int = 1) -> List[Tuple[date, date]]:
+    """
+    Split [start, end) into half-open date ranges of `days` days.
+
+    Args:
+        start: First date (inclusive)
+        end: Last date (exclusive)
+        days: Days per partition
+
+    Returns:
+        List of (lower, upper) tuples covering the range in ascending order
+    """
+    partitions = []
+    lower = start
+    while lower < end:
+        upper = min(lower + timedelta(days=days), end)
+        partitions.append((lower, upper))
+        lower = upper
+    return partitions
+
+
+def range_partitions(lower: int, upper: int, count: int) -> List[Tuple[int, int]]:
+    """
+    Split the integer range [lower, upper) into `count` roughly equal half-open ranges.
+
+    Args:
+        lower: Smallest key (inclusive)
+        upper: Largest key (exclusive)
+        count: Number of partitions
+
+    Returns:
+        List of (lower, upper) tuples in ascending order
+    """
+    if count < 1 or upper <= lower:
+        return [(lower, upper)] if upper > lower else []
+    step = -(-(upper - lower) // count)
+    return [(start, min(start + step, upper)) for start in range(lower, upper, step)]
+
+
+def build_partition_query(query: str, key_column: str, lower: bool = True, upper: bool = True) -> str:
+    """
+    Add a half-open range predicate on key_column to a query.
+
+    If the query contains a {partition} placeholder (e.g. "... WHERE x > 0 AND
+    {partition} ORDER BY ..."), the predicate is put there so the database can
+    use an index; otherwise the query is wrapped in a derived table.
+
+    Args:
+        query: SQL query, optionally containing {partition}
+        key_column: Column the partitions are defined on
+        lower: Whether the range has a lower bound (False for an open start)
+        upper: Whether the range has an upper bound (False for an open end)
+
+    Returns:
+        SQL with one extra ? parameter per bound (lower first)
+    """
+    terms = ([f"{key_column} >= ?"] if lower else []) + ([f"{key_column} < ?"] if upper else [])
+    predicate = ' AND '.join(terms) or '1 = 1'
+    if '{partition}' in query:
+        return query.replace('{partition}', predicate)
+    return f"SELECT * FROM ({query}) AS partitioned WHERE {predicate}"
+
+
+class PartitionedReader:
+    """
+    Run one query per key range concurrently and merge the results.
+
+    Each partition gets a connector from connector_factory (one connection per
+    partition), streams rows with iter_query, and hands them to the consumer
+    through a bounded queue so fast partitions cannot outrun the consumer.
+
+    Usage:
+        from connectors.partitioned_reader import PartitionedReader, date_partitions
+
+        reader = PartitionedReader(lambda: ODBCConnector(..., use_pool=True), max_workers=4)
+        rows = reader.iter_rows(
+            "SELECT * FROM databricks WHERE installed_jobs > 0 AND {partition}",
+            key_column='install_date',
+            partitions=date_partitions(start, end),
+        )
+        for row in rows:
+            ...
+    """
+
+    def __init__(self, connector_factory: Callable[[], Any], max_workers: int = 4,
+                 batch_size: int = 1000, queue_size: int = 8):
+        """
+        Initialize the reader.
+
+        Args:
+            connector_factory: Callable returning a new (unconnected) ODBCConnector
+            max_workers: Partitions queried concurrently (connections in use)
+            batch_size: Rows fetched per round trip in each partition
+            queue_size: Row batches buffered per queue before workers block
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.connector_factory = connector_factory
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.last_stats: List[Dict[str, Any]] = []
+
+    def _put(self, out: queue.Queue, item: Any, cancelled: threading.Event) -> bool:
+        """Blocking put that gives up once the consumer has gone away."""
+        while not cancelled.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_partition(self, index: int, query: str, params: tuple, out: queue.Queue,
+                       cancelled: threading.Event, stats: Dict[str, Any]):
+        # Consumer stopped (error or early close) before this partition started:
+        # don't check out a connection for rows nobody will read
+        if cancelled.is_set():
+            return
+        started = time.monotonic()
+        try:
+            connector = self.connector_factory()
+            with connector:
+                for batch in connector.iter_query(query, params, batch_size=self.batch_size, batches=True):
+                    stats['rows'] += len(batch)
+                    if not self._put(out, batch, cancelled):
+                        return
+        except BaseException as e:
+            stats['error'] = str(e)
+            self._put(out, _PartitionError(e), cancelled)
+        finally:
+            stats['elapsed'] = round(time.monotonic() - started, 3)
+            self._put(out, _DONE, cancelled)
+
+    def iter_rows(self, query: str, key_column: str, partitions: Sequence[Tuple[Any, Any]],
+                  params: Optional[tuple] = None, ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream rows from all partitions.
+
+        Args:
+            query: SQL query (see build_partition_query for the {partition} placeholder)
+            key_column: Column the partitions are defined on
+            partitions: Disjoint (lower, upper) half-open ranges; a None bound
+                leaves that end open (e.g. the newest partition, for rows keyed
+                in the future)
+            params: Parameters for ? placeholders that precede {partition} in the query
+            ordered: Yield partitions in the given order (each partition keeps the
+                query's ORDER BY); otherwise rows are yielded as they arrive
+
+        Yields:
+            Row dictionaries
+        """
+        base_params = tuple(params) if params else ()
+        cancelled = threading.Event()
+        self.last_stats = [
+            {'partition': i, 'lower': str(lower), 'upper': str(upper), 'rows': 0, 'elapsed': None, 'error': None}
+            for i, (lower, upper) in enumerate(partitions)
+        ]
+        if not partitions:
+            return
+
+        if ordered:
+            queues = [queue.Queue(maxsize=self.queue_size) for _ in partitions]
+        else:
+            shared = queue.Queue(maxsize=self.queue_size * self.max_workers)
+            queues = [shared] * len(partitions)
+
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='partition')
+        try:
+            # Partitions start in submission order, so in ordered mode the
+            # partition being consumed is always already running
+            for i, (lower, upper) in enumerate(partitions):
+                partition_query = build_partition_query(query, key_column, lower is not None, upper is not None)
+                bounds = tuple(bound for bound in (lower, upper) if bound is not None)
+                executor.submit(self._run_partition, i, partition_query, base_params + bounds,
+                                queues[i], cancelled, self.last_stats[i])
+
+            if ordered:
+                for q in queues:
+                    yield from self._drain(q, 1)
+            else:
+                yield from self._drain(queues[0], len(partitions))
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        total = sum(s['rows'] for s in self.last_stats)
+        logging.info(
+            f"Partitioned read completed: {total} rows from {len(partitions)} partitions "
+            f"on {self.max_workers} connections in {time.monotonic() - started:.2f}s"
+        )
+
+    @staticmethod
+    def _drain(q: queue.Queue, expected_done: int) -> Iterator[Dict[str, Any]]:
+        """Yield rows from a queue until expected_done partitions have finished."""
+        done = 0
+        while done < expected_done:
+            item = q.get()
+            if item is _DONE:
+                done += 1
+            elif isinstance(item, _PartitionError):
+                raise item.error
+            else:
+                yield from item
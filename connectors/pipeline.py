@@ -0,0 +1,304 @@
+"""
+Overlapped Export Pipeline
+
+Runs the stages of an export (fetch, transform, serialize, deliver) at the
+same time instead of one after another. Each stage iterates its input on
+its own thread and hands records to the next stage in chunks through a
+bounded queue, so the database keeps fetching while records are encoded
+and the webhook is sending, and a slow stage blocks the ones before it
+(backpressure) instead of letting them buffer the whole result set.
+
+Stages are ordinary generator chains (iter_query, WatermarkTracker.track,
+ExportWriter.tee, ...): wrapping one in Pipeline.stage moves its iteration
+to a thread, and the last consumer (usually WebhookSink.send, which has its
+own worker pool) runs on the calling thread.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from connectors import metrics
+
+# Marks the end of a stage's output in its queue
+_DONE = object()
+
+# Pipelines currently running in this process (for the API's queue depth gauges)
+_active: List['Pipeline'] = []
+_active_lock = threading.Lock()
+
+
+class PipelineCancelled(Exception):
+    """Raised in a stage thread whose input was abandoned because the pipeline was closed."""
+
+
+class _StageError:
+    """Wraps an exception raised by a stage thread."""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Stage:
+    """One stage: a thread iterating an iterable into a bounded queue of chunks."""
+
+    def __init__(self, pipeline: 'Pipeline', name: str, iterable: Iterable[Any], chunk_size: int):
+        self.pipeline = pipeline
+        self.name = name
+        self.iterable = iterable
+        self.chunk_size = chunk_size
+        self.queue: queue.Queue = queue.Queue(maxsize=pipeline.queue_size)
+        self.items = 0
+        self.max_depth = 0
+        # Time this stage waited for room in its queue (the next stage is slower)
+        self.output_wait_seconds = 0.0
+        # Time the next stage waited for this stage's output (this stage is slower)
+        self.consumer_wait_seconds = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self.thread = threading.Thread(target=self._run, name=f"{pipeline.name}-{name}", daemon=True)
+
+    def _put(self, item: Any) -> bool:
+        """Put an item, blocking while the queue is full; gives up once the pipeline is closed."""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            started = time.perf_counter()
+            stop = self.pipeline._stop
+            while True:
+                if stop.is_set():
+                    return False
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            waited = time.perf_counter() - started
+            self.output_wait_seconds += waited
+            metrics.PIPELINE_WAIT_SECONDS.inc(waited, pipeline=self.pipeline.name, stage=self.name, side='output')
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _run(self):
+        self.started = time.perf_counter()
+        iterator = iter(self.iterable)
+        try:
+            chunk = []
+            for item in iterator:
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    if not self._put(chunk):
+                        return
+                    self.items += len(chunk)
+                    metrics.PIPELINE_ITEMS.inc(len(chunk), pipeline=self.pipeline.name, stage=self.name)
+                    chunk = []
+            if chunk:
+                if not self._put(chunk):
+                    return
+                self.items += len(chunk)
+                metrics.PIPELINE_ITEMS.inc(len(chunk), pipeline=self.pipeline.name, stage=self.name)
+            self._put(_DONE)
+        except PipelineCancelled:
+            pass
+        except Exception as e:
+            self.error = str(e)
+            self._put(_StageError(e))
+        finally:
+            # Closes the generator chain on this thread, e.g. cancelling an unfinished query
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logging.warning(f"Error closing pipeline stage {self.name}: {e}")
+            self.finished = time.perf_counter()
+
+    def _get(self) -> Any:
+        """Take the next chunk, waiting for the stage to produce one."""
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        started = time.perf_counter()
+        stop = self.pipeline._stop
+        while True:
+            try:
+                item = self.queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if stop.is_set():
+                    raise PipelineCancelled(f"Pipeline {self.pipeline.name} was closed")
+        waited = time.perf_counter() - started
+        self.consumer_wait_seconds += waited
+        metrics.PIPELINE_WAIT_SECONDS.inc(waited, pipeline=self.pipeline.name, stage=self.name, side='consumer')
+        return item
+
+    def output(self) -> Iterator[Any]:
+        """Yield the stage's records in order, re-raising an error from the stage thread."""
+        completed = False
+        try:
+            while True:
+                item = self._get()
+                if item is _DONE:
+                    completed = True
+                    return
+                if type(item) is _StageError:
+                    raise item.error
+                yield from item
+        finally:
+            if not completed:
+                # The consumer stopped early or failed: stop every stage
+                self.pipeline._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Items passed on (records, or batches for a batch stage), queue depth and wait times."""
+        end = self.finished or time.perf_counter()
+        elapsed = end - self.started if self.started else 0.0
+        return {
+            'stage': self.name,
+            'items': self.items,
+            'items_per_sec': round(self.items / elapsed, 1) if elapsed else None,
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'output_wait_seconds': round(self.output_wait_seconds, 3),
+            'consumer_wait_seconds': round(self.consumer_wait_seconds, 3),
+            'running': self.thread.is_alive(),
+            'error': self.error,
+        }
+
+
+class Pipeline:
+    """
+    Overlap the stages of an export with bounded queues between them.
+
+    stage() starts a thread that iterates the given iterable and returns an
+    iterator over its output, to be wrapped by the next stage. Queues hold
+    at most queue_size chunks of chunk_size records, so the whole pipeline
+    buffers a bounded number of records and a slow consumer throttles the
+    database reader. An error in any stage is re-raised by the consumer;
+    closing the pipeline (or abandoning its output) stops every stage and
+    closes their inputs.
+
+    With enabled=False, stage() returns the iterable unchanged and the
+    export runs sequentially on the calling thread as before.
+
+    Usage:
+        from connectors.pipeline import Pipeline
+
+        with ExportWriter(path) as writer, WebhookSink(endpoint, 'birdeye') as sink, \\
+                Pipeline('birdeye', queue_size=8) as pipeline:
+            rows = pipeline.stage('fetch', connector.iter_query(query))
+            records = pipeline.stage('serialize', writer.tee(rows))
+            summary = sink.send(records)    # deliver, on this thread
+
+        print(pipeline.stats())
+    """
+
+    def __init__(self, name: str, queue_size: int = 8, chunk_size: int = 500, enabled: bool = True):
+        """
+        Initialize the pipeline.
+
+        Args:
+            name: Pipeline name (thread names, metrics labels and logs)
+            queue_size: Chunks buffered between two stages before the producer blocks
+            chunk_size: Records handed over per queue operation
+            enabled: Run stages on threads; False runs everything on the calling thread
+        """
+        if queue_size < 1 or chunk_size < 1:
+            raise ValueError("queue_size and chunk_size must be at least 1")
+        self.name = name
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.enabled = enabled
+        self._stages: List[_Stage] = []
+        self._stop = threading.Event()
+        self._started: Optional[float] = None
+        self._closed = False
+
+    def stage(self, name: str, iterable: Iterable[Any], chunk_size: Optional[int] = None) -> Iterable[Any]:
+        """
+        Run the iteration of `iterable` on a new stage thread.
+
+        Args:
+            name: Stage name, e.g. 'fetch', 'transform', 'serialize'
+            iterable: The stage's work, usually a generator wrapping the
+                previous stage's output
+            chunk_size: Items per queue operation for this stage (e.g. 1 when
+                the items are already row batches)
+
+        Returns:
+            Iterator over the stage's output (the iterable itself when disabled)
+        """
+        if not self.enabled:
+            return iterable
+        if self._closed:
+            raise RuntimeError(f"Pipeline {self.name} is closed")
+        if self._started is None:
+            self._started = time.perf_counter()
+            with _active_lock:
+                _active.append(self)
+        stage = _Stage(self, name, iterable, chunk_size or self.chunk_size)
+        self._stages.append(stage)
+        stage.thread.start()
+        return stage.output()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-stage throughput and queue statistics.
+
+        A stage whose consumer_wait_seconds is high is the bottleneck; one
+        whose output_wait_seconds is high is being throttled by a slower
+        stage after it.
+
+        Returns:
+            Dictionary with the pipeline name, elapsed seconds and a 'stages' list
+        """
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            'pipeline': self.name,
+            'enabled': self.enabled,
+            'elapsed': round(elapsed, 3),
+            'stages': [stage.stats() for stage in self._stages],
+        }
+
+    def close(self):
+        """Stop every stage (if still running), wait for the threads and log the stage statistics."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        for stage in self._stages:
+            stage.thread.join()
+        with _active_lock:
+            if self in _active:
+                _active.remove(self)
+        if self._stages:
+            stats = self.stats()
+            logging.info(
+                f"Pipeline {self.name} finished in {stats['elapsed']:.2f}s: " + ", ".join(
+                    f"{s['stage']} {s['items']} items ({s['items_per_sec'] or 0:.0f}/s, "
+                    f"waited {s['output_wait_seconds']:.2f}s on next stage, "
+                    f"next stage waited {s['consumer_wait_seconds']:.2f}s)"
+                    for s in stats['stages']
+                )
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def get_active_pipelines() -> List[Pipeline]:
+    """Pipelines currently running in this process."""
+    with _active_lock:
+        return list(_active)
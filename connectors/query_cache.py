@@ -0,0 +1,241 @@
+"""
+Query Result Cache
+
+TTL + LRU cache for SELECT results, keyed by normalized SQL and parameters.
+Concurrent identical queries are coalesced (single-flight), so N callers
+asking for the same uncached result cause one database round trip.
+"""
+
+import re
+import sys
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(query: str) -> str:
+    """Collapse whitespace and drop a trailing semicolon so formatting does not split cache keys."""
+    return _WHITESPACE.sub(' ', query).strip().rstrip(';').strip()
+
+
+def estimate_size(rows: List[Any]) -> int:
+    """Approximate memory footprint in bytes of a list of rows (dicts or tuple-like rows)."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in (row.values() if isinstance(row, dict) else row):
+            size += sys.getsizeof(value)
+    return size
+
+
+class _Flight:
+    """An in-progress load that concurrent callers wait on."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryCache:
+    """
+    Thread-safe, memory-bounded TTL/LRU cache with single-flight loading.
+
+    Cached results are shared between callers and must be treated as read-only.
+
+    Usage:
+        from connectors.query_cache import QueryCache
+
+        cache = QueryCache(max_bytes=64 * 1024 * 1024, default_ttl=60)
+        rows = cache.get_or_load(query, params, lambda: connector.execute_query(query, params))
+
+        cache.invalidate(table='databricks')
+        print(cache.stats())
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: float = 60):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Approximate memory budget; least recently used entries are evicted
+            default_ttl: Seconds a result stays valid when no per-query TTL is given
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # key -> (expires_at, size, result)
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, int, Any]]' = OrderedDict()
+        self._flights: Dict[Tuple[str, str], _Flight] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def make_key(query: str, params: Optional[tuple] = None, variant: str = '') -> Tuple[str, str, str]:
+        """Cache key for a query, its parameters and the result representation."""
+        return normalize_sql(query), repr(tuple(params)) if params else '', variant
+
+    def _remove(self, key):
+        """Drop an entry (lock must be held)."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _store(self, key, result, ttl: float):
+        """Insert an entry and evict LRU entries over the budget (lock must be held)."""
+        size = estimate_size(result) if isinstance(result, list) else sys.getsizeof(result)
+        if size > self.max_bytes:
+            logging.debug(f"Query result of ~{size} bytes exceeds cache budget, not cached")
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, result)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def get_or_load(self, query: str, params: Optional[tuple], loader: Callable[[], Any],
+                    ttl: Optional[float] = None, variant: str = '') -> Any:
+        """
+        Return a cached result, or load it once for all concurrent callers.
+
+        Args:
+            query: SQL query string
+            params: Optional tuple of query parameters
+            loader: Zero-argument callable that runs the query
+            ttl: Seconds to cache this result (defaults to default_ttl)
+            variant: Distinguishes results of the same query built differently
+                (e.g. the connector's row_factory)
+
+        Returns:
+            The (shared, read-only) query result
+        """
+        key = self.make_key(query, params, variant)
+        ttl = self.default_ttl if ttl is None else ttl
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[2]
+                self._remove(key)
+                self._expirations += 1
+
+            self._misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            result = loader()
+            flight.result = result
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    self._store(key, result, ttl)
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.event.set()
+
+    def invalidate(self, query: Optional[str] = None, params: Optional[tuple] = None,
+                   table: Optional[str] = None) -> int:
+        """
+        Remove cached results.
+
+        With no arguments the whole cache is cleared. In-flight loads are
+        detached so their results are not cached.
+
+        Args:
+            query: Remove the entries for this query (and params), in every variant
+            params: Parameters of the query to remove
+            table: Remove every entry whose SQL references this table name
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if query is not None:
+                prefix = self.make_key(query, params)[:2]
+                keys = [key for key in self._entries if key[:2] == prefix]
+                for key in [key for key in self._flights if key[:2] == prefix]:
+                    del self._flights[key]
+            elif table is not None:
+                pattern = re.compile(rf'\b{re.escape(table)}\b', re.IGNORECASE)
+                keys = [key for key in self._entries if pattern.search(key[0])]
+                for key in [key for key in self._flights if pattern.search(key[0])]:
+                    del self._flights[key]
+            else:
+                keys = list(self._entries)
+                self._flights.clear()
+
+            for key in keys:
+                self._remove(key)
+
+        if keys:
+            logging.info(f"Invalidated {len(keys)} cached query results")
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and ratio, evictions and current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'in_flight': len(self._flights),
+            }
+
+
+_query_cache: Optional[QueryCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """
+    Get the process-wide query cache (configured from QUERY_CACHE_* settings).
+
+    Returns:
+        Shared QueryCache instance
+    """
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            from connectors.config_loader import get_query_cache_config
+            _query_cache = QueryCache(**get_query_cache_config())
+        return _query_cache
@@ -0,0 +1,154 @@
+"""
+Row Representations
+
+Compact alternatives to one dict per result row, selected with
+ODBCConnector(row_factory=...):
+
+    'dict'        dict of column name -> value (default)
+    'tuple'       plain tuple in cursor column order (smallest, no names)
+    'namedtuple'  tuple subclass with attribute access, cached per column list
+    'slots'       __slots__ class with attribute access, cached per column list
+
+namedtuple and slots rows also provide .get(name, default) and _asdict(),
+so code written against row dicts (row.get(...)) keeps working. Both use
+the original column names, also for columns whose names are not valid
+attributes (e.g. 'COUNT(*)', which is only reachable as an attribute by
+its positional name _<index>). Plain tuples carry no names; consumers
+that need them take a `columns` argument.
+"""
+
+import keyword
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+ROW_FACTORIES = ('dict', 'tuple', 'namedtuple', 'slots')
+
+
+def _field_names(columns: Sequence[str]) -> Tuple[str, ...]:
+    """Column names usable as attributes; invalid or duplicate names become _<index>."""
+    names = []
+    for index, name in enumerate(columns):
+        if (not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name)
+                or name.startswith('_') or name in names):
+            name = f'_{index}'
+        names.append(name)
+    return tuple(names)
+
+
+def _column_index(columns: Sequence[str]) -> Dict[str, int]:
+    """Column name -> position (a duplicated name maps to its last column, as in a dict row)."""
+    return {name: index for index, name in enumerate(columns)}
+
+
+def _get(self, name: str, default: Any = None) -> Any:
+    """Value of a column by name, like dict.get (only columns, never attributes like count)."""
+    index = self._column_index.get(name)
+    return default if index is None else self[index]
+
+
+def _asdict(self) -> Dict[str, Any]:
+    """Dictionary of original column name -> value."""
+    return dict(zip(self._columns, self))
+
+
+class SlotsRow:
+    """Base class for generated __slots__ row classes (see slots_row_class)."""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _columns: Tuple[str, ...] = ()
+    _column_index: Dict[str, int] = {}
+
+    get = _get
+    _asdict = _asdict
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return getattr(self, self._fields[index])
+
+    def __eq__(self, other):
+        if isinstance(other, SlotsRow):
+            return self._fields == other._fields and tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({values})'
+
+
+@lru_cache(maxsize=256)
+def namedtuple_row_class(columns: Tuple[str, ...]) -> type:
+    """Cached namedtuple class (with .get) for a column list."""
+    # rename=True accepts the positional _<index> names of invalid columns
+    base = namedtuple('Row', _field_names(columns), rename=True)
+    return type('Row', (base,), {'__slots__': (), '_columns': columns, '_column_index': _column_index(columns),
+                                 'get': _get, '_asdict': _asdict})
+
+
+@lru_cache(maxsize=256)
+def slots_row_class(columns: Tuple[str, ...]) -> type:
+    """Cached __slots__ class for a column list, constructed positionally: cls(*row)."""
+    fields = _field_names(columns)
+    cls = type('Row', (SlotsRow,), {'__slots__': fields, '_fields': fields, '_columns': columns,
+                                    '_column_index': _column_index(columns)})
+    # Assign through the slot descriptors directly (no per-value setattr name lookup)
+    setters = tuple(getattr(cls, name).__set__ for name in fields)
+
+    def __init__(self, *values):
+        if len(values) != len(setters):
+            raise TypeError(f"Row takes {len(setters)} values ({len(values)} given)")
+        for setter, value in zip(setters, values):
+            setter(self, value)
+
+    cls.__init__ = __init__
+    return cls
+
+
+def make_row_factory(kind: str, columns: Sequence[str]) -> Callable[[Sequence[Any]], Any]:
+    """
+    Build a converter from a raw cursor row to the requested representation.
+
+    Args:
+        kind: One of ROW_FACTORIES
+        columns: Column names from cursor.description
+
+    Returns:
+        Callable taking one cursor row
+    """
+    if kind == 'dict':
+        columns = list(columns)
+        return lambda row: dict(zip(columns, row))
+    if kind == 'tuple':
+        return tuple
+    if kind == 'namedtuple':
+        return namedtuple_row_class(tuple(columns))._make
+    if kind == 'slots':
+        cls = slots_row_class(tuple(columns))
+        return lambda row: cls(*row)
+    raise ValueError(f"Unknown row_factory: {kind!r} (choose from {', '.join(ROW_FACTORIES)})")
+
+
+def row_to_dict(row: Any, columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Convert any supported row to a dictionary.
+
+    Args:
+        row: dict, namedtuple/slots row, or plain tuple
+        columns: Column names, required for plain tuples
+
+    Returns:
+        Dictionary of column name -> value (the row itself if already a dict)
+    """
+    if isinstance(row, dict):
+        return row
+    if hasattr(row, '_asdict'):
+        return row._asdict()
+    if columns is None:
+        raise TypeError(f"Cannot convert {type(row).__name__} row to a record without column names")
+    return dict(zip(columns, row))
@@ -0,0 +1,386 @@
+"""
+In-Process Job Scheduler
+
+Runs service jobs on cron or interval schedules inside one long-running
+process, so imports, configuration, pooled database connections and HTTP
+sessions are set up once instead of on every cron invocation.
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from connectors import metrics
+
+_CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+
+_DURATION = re.compile(r'^(\d+)\s*([smhd]?)$')
+_DURATION_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    """Expand one cron field (*, n, a-b, */n, a-b/n and comma lists) into a set of values."""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {field}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range {low}-{high}: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression (minute hour day-of-month month day-of-week),
+    evaluated in local time. Day-of-week 0 and 7 are Sunday.
+
+    Usage:
+        schedule = CronSchedule('0 2 * * *')
+        schedule.next_after(datetime.now())
+    """
+
+    def __init__(self, expression: str):
+        self.expression = _CRON_ALIASES.get(expression.strip(), expression.strip())
+        fields = self.expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, t: datetime) -> bool:
+        # Like cron: when both day fields are restricted, either may match
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after`."""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t <= limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def __str__(self):
+        return self.expression
+
+
+class IntervalSchedule:
+    """Fixed interval between runs, e.g. IntervalSchedule(900) for every 15 minutes."""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+    def __str__(self):
+        return f"every {self.seconds:g}s"
+
+
+def parse_schedule(spec: str):
+    """
+    Parse a schedule string.
+
+    Accepts a cron expression ('0 2 * * *'), a cron alias ('@hourly') or an
+    interval ('every 15m', 'every 30s', 'every 2h', 'every 1d').
+
+    Args:
+        spec: Schedule string
+
+    Returns:
+        CronSchedule or IntervalSchedule
+    """
+    spec = spec.strip()
+    if spec.lower().startswith('every '):
+        match = _DURATION.match(spec[6:].strip().lower())
+        if not match:
+            raise ValueError(f"Invalid interval: {spec!r}")
+        return IntervalSchedule(int(match.group(1)) * _DURATION_UNITS[match.group(2)])
+    return CronSchedule(spec)
+
+
+class _ScheduledJob:
+    """A registered job and its run history."""
+
+    def __init__(self, name: str, func: Callable, schedule, max_instances: int,
+                 misfire_grace_time: float, args: tuple, kwargs: Dict[str, Any]):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.max_instances = max_instances
+        self.misfire_grace_time = misfire_grace_time
+        self.args = args
+        self.kwargs = kwargs
+        self.next_run: Optional[datetime] = None
+        self.running = 0
+        self.runs = 0
+        self.failures = 0
+        self.misfires = 0
+        self.overlaps = 0
+        self.last_started: Optional[datetime] = None
+        self.last_finished: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        def iso(value):
+            return value.isoformat(timespec='seconds') if value else None
+        return {
+            'name': self.name,
+            'schedule': str(self.schedule),
+            'next_run': iso(self.next_run),
+            'max_instances': self.max_instances,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'misfires': self.misfires,
+            'overlaps_skipped': self.overlaps,
+            'last_started': iso(self.last_started),
+            'last_finished': iso(self.last_finished),
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+            'last_duration': self.last_duration,
+        }
+
+
+class Scheduler:
+    """
+    Thread-based cron/interval scheduler.
+
+    - Overlap prevention: a job with max_instances=1 (the default) is skipped,
+      not queued, when its previous run is still going.
+    - Misfires: a run that cannot start within misfire_grace_time seconds of
+      its scheduled time (process paused, all workers busy) is skipped; missed
+      runs are coalesced, so a job never fires several times to catch up.
+    - max_workers bounds how many jobs run at once across all jobs.
+
+    Usage:
+        from connectors.scheduler import Scheduler
+
+        scheduler = Scheduler(max_workers=2, misfire_grace_time=300)
+        scheduler.add_job('birdeye_export', run_birdeye, '0 2 * * *')
+        scheduler.add_job('heartbeat', ping, 'every 5m', max_instances=1)
+        scheduler.run_forever()
+    """
+
+    def __init__(self, max_workers: int = 4, misfire_grace_time: float = 300):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers: Jobs that may run concurrently across all jobs
+            misfire_grace_time: Default seconds a run may start late before it is skipped
+        """
+        self.max_workers = max_workers
+        self.misfire_grace_time = misfire_grace_time
+        self._jobs: Dict[str, _ScheduledJob] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def add_job(self, name: str, func: Callable, schedule, max_instances: int = 1,
+                misfire_grace_time: Optional[float] = None, args: tuple = (),
+                kwargs: Optional[Dict[str, Any]] = None):
+        """
+        Register a job.
+
+        Args:
+            name: Unique job name
+            func: Callable run on each fire
+            schedule: Schedule string (see parse_schedule) or schedule object
+            max_instances: Concurrent runs allowed for this job
+            misfire_grace_time: Seconds a run may start late (defaults to the scheduler's)
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+        """
+        if isinstance(schedule, str):
+            schedule = parse_schedule(schedule)
+        if max_instances < 1:
+            raise ValueError("max_instances must be at least 1")
+        job = _ScheduledJob(
+            name, func, schedule, max_instances,
+            self.misfire_grace_time if misfire_grace_time is None else misfire_grace_time,
+            tuple(args), dict(kwargs or {})
+        )
+        with self._lock:
+            if name in self._jobs:
+                raise ValueError(f"Job already registered: {name}")
+            job.next_run = schedule.next_after(datetime.now())
+            self._jobs[name] = job
+        self._wakeup.set()
+        logging.info(f"Scheduled job {name} ({schedule}), next run at {job.next_run:%Y-%m-%d %H:%M:%S}")
+
+    def start(self):
+        """Start the scheduling thread."""
+        if self._thread is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scheduled-job')
+        self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            now = datetime.now()
+            with self._lock:
+                for job in self._jobs.values():
+                    if job.next_run <= now:
+                        scheduled = job.next_run
+                        job.next_run = job.schedule.next_after(now)
+                        self._fire(job, scheduled)
+                next_run = min((job.next_run for job in self._jobs.values()), default=None)
+            # Re-check at least once a minute so wall-clock changes are noticed
+            timeout = 60.0 if next_run is None else min(60.0, max(0.0, (next_run - datetime.now()).total_seconds()))
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _fire(self, job: _ScheduledJob, scheduled: datetime):
+        """Hand a due run to the executor unless it misfired or would overlap (lock must be held)."""
+        if self._misfired(job, scheduled):
+            return
+        if job.running >= job.max_instances:
+            job.overlaps += 1
+            metrics.SCHEDULER_RUNS.inc(job=job.name, outcome='skipped_overlap')
+            logging.warning(
+                f"Skipping {job.name} run scheduled at {scheduled:%H:%M:%S}: "
+                f"{job.running} run(s) still in progress (max_instances={job.max_instances})"
+            )
+            return
+        job.running += 1
+        self._executor.submit(self._run, job, scheduled)
+
+    def _misfired(self, job: _ScheduledJob, scheduled: datetime) -> bool:
+        """Record and report a run that is too late to start (lock must be held)."""
+        lateness = (datetime.now() - scheduled).total_seconds()
+        if lateness <= job.misfire_grace_time:
+            return False
+        job.misfires += 1
+        metrics.SCHEDULER_RUNS.inc(job=job.name, outcome='misfired')
+        logging.warning(
+            f"Skipping {job.name} run scheduled at {scheduled:%Y-%m-%d %H:%M:%S}: "
+            f"{lateness:.0f}s late (misfire grace {job.misfire_grace_time:g}s)"
+        )
+        return True
+
+    def _run(self, job: _ScheduledJob, scheduled: Optional[datetime]):
+        with self._lock:
+            # Waited too long for a free worker
+            if scheduled is not None and self._misfired(job, scheduled):
+                job.running -= 1
+                return
+            job.last_started = datetime.now()
+
+        logging.info(f"Running scheduled job {job.name}")
+        started = time.perf_counter()
+        error = None
+        try:
+            job.func(*job.args, **job.kwargs)
+        except BaseException as e:
+            # SystemExit from a script-style main() must not kill the worker
+            error = f"{type(e).__name__}: {e}"
+            logging.error(f"Scheduled job {job.name} failed: {error}", exc_info=not isinstance(e, SystemExit))
+        elapsed = time.perf_counter() - started
+
+        outcome = 'failed' if error else 'succeeded'
+        metrics.SCHEDULER_RUNS.inc(job=job.name, outcome=outcome)
+        metrics.SCHEDULER_RUN_SECONDS.observe(elapsed, job=job.name)
+        with self._lock:
+            job.running -= 1
+            job.runs += 1
+            job.failures += 1 if error else 0
+            job.last_finished = datetime.now()
+            job.last_status = outcome
+            job.last_error = error
+            job.last_duration = round(elapsed, 3)
+        logging.info(f"Scheduled job {job.name} {outcome} in {elapsed:.2f}s")
+
+    def run_now(self, name: str) -> bool:
+        """
+        Trigger a job immediately, outside its schedule.
+
+        Returns:
+            False if the job is already running max_instances times
+        """
+        with self._lock:
+            job = self._jobs[name]
+            if job.running >= job.max_instances:
+                return False
+            job.running += 1
+        if self._executor is None:
+            self._run(job, None)
+        else:
+            self._executor.submit(self._run, job, None)
+        return True
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Snapshot of every job's schedule, state and run counters."""
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
+
+    def shutdown(self, wait: bool = True):
+        """Stop scheduling new runs; optionally wait for running jobs to finish."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def run_forever(self):
+        """Start the scheduler and block until SIGINT/SIGTERM, then shut down gracefully."""
+        import signal
+
+        def stop(signum, frame):
+            logging.info(f"Received signal {signum}, stopping scheduler")
+            self._stopped.set()
+            self._wakeup.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        self.start()
+        while not self._stopped.wait(1.0):
+            pass
+        self.shutdown(wait=True)
@@ -0,0 +1,382 @@
+"""
+Column-Oriented Transform Engine
+
+Declarative record mappings (rename, concat, format, coerce, default) that
+run over column batches instead of building each output record with
+per-field Python code. Rows are split into one array per source column,
+each output column is computed with a single vectorized operation (NumPy
+for numeric and datetime conversions), and records are reassembled once.
+
+The scalar path (transform_row) applies the same semantics to one record,
+so both paths produce identical output. Input rows may be dictionaries,
+namedtuple/slots rows, or plain tuples with their column names passed as
+`columns` (see connectors.rows).
+"""
+
+import datetime
+import string
+from itertools import islice
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from connectors.rows import row_to_dict
+
+_FORMATTER = string.Formatter()
+
+_COERCE_TYPES = {
+    'str': str,
+    'float': float,
+    'int': int,
+    'bool': bool,
+}
+
+
+class _Expression:
+    """An output column computed from one or more source columns."""
+
+    columns: Sequence[str] = ()
+
+    def evaluate(self, columns: Mapping[str, Sequence[Any]], length: int) -> Sequence[Any]:
+        """Compute the output column from source column arrays."""
+        raise NotImplementedError
+
+    def evaluate_row(self, row: Mapping[str, Any]) -> Any:
+        """Compute the output value for a single record."""
+        raise NotImplementedError
+
+
+class Rename(_Expression):
+    """Copy a source column unchanged (missing columns become None)."""
+
+    def __init__(self, column: str):
+        self.columns = (column,)
+
+    def evaluate(self, columns, length):
+        return columns[self.columns[0]]
+
+    def evaluate_row(self, row):
+        return row.get(self.columns[0])
+
+
+class Default(_Expression):
+    """Copy a source column, replacing None (or a missing column) with a fixed value."""
+
+    def __init__(self, column: str, value: Any):
+        self.columns = (column,)
+        self.value = value
+
+    def evaluate(self, columns, length):
+        values = np.array(columns[self.columns[0]], dtype=object)
+        values[np.equal(values, None)] = self.value
+        return values
+
+    def evaluate_row(self, row):
+        value = row.get(self.columns[0])
+        return self.value if value is None else value
+
+
+class Format(_Expression):
+    """
+    Build a string from a str.format template over source columns,
+    e.g. Format('{customer_city}, {customer_state} {customer_zip_postal}').
+
+    Values are formatted like an f-string (None becomes 'None').
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        columns = []
+        positional = []
+        for literal, field, spec, conversion in _FORMATTER.parse(template):
+            positional.append(literal.replace('{', '{{').replace('}', '}}'))
+            if field is None:
+                continue
+            if field not in columns:
+                columns.append(field)
+            positional.append('{' + str(columns.index(field))
+                              + (f'!{conversion}' if conversion else '')
+                              + (f':{spec}' if spec else '') + '}')
+        self.columns = tuple(columns)
+        # Same template with positional fields, so it can be mapped over columns
+        self._positional = ''.join(positional)
+
+    def evaluate(self, columns, length):
+        if not self.columns:
+            return [self.template] * length
+        return list(map(self._positional.format, *(columns[name] for name in self.columns)))
+
+    def evaluate_row(self, row):
+        return self._positional.format(*(row.get(name) for name in self.columns))
+
+
+class Concat(Format):
+    """Join source columns as strings with a separator."""
+
+    def __init__(self, *columns: str, sep: str = ''):
+        escaped = sep.replace('{', '{{').replace('}', '}}')
+        super().__init__(escaped.join('{' + name + '}' for name in columns))
+
+
+class Coerce(_Expression):
+    """
+    Convert a source column to str, float, int or bool.
+
+    With a default, missing and falsy values (None, '', 0) are replaced by
+    the default before conversion, like float(row.get(column) or 0).
+    """
+
+    def __init__(self, column: str, to: Any, default: Any = None):
+        name = to if isinstance(to, str) else getattr(to, '__name__', '')
+        if name not in _COERCE_TYPES:
+            raise ValueError(f"Unsupported coercion: {to!r} (choose from {', '.join(_COERCE_TYPES)})")
+        self.columns = (column,)
+        self.to = name
+        self.default = default
+        self._convert = _COERCE_TYPES[name]
+
+    def evaluate(self, columns, length):
+        values = columns[self.columns[0]]
+        if self.default is not None:
+            values = np.array(values, dtype=object)
+            values[~values.astype(bool)] = self.default
+        if self.to == 'float':
+            return np.asarray(values, dtype=object).astype(np.float64).tolist()
+        if self.to == 'str':
+            return _column_to_str(values)
+        return list(map(self._convert, values))
+
+    def evaluate_row(self, row):
+        value = row.get(self.columns[0])
+        if self.default is not None:
+            value = value or self.default
+        return self._convert(value)
+
+
+def _column_to_str(values: Sequence[Any]) -> List[str]:
+    """str() every value, formatting naive whole-second datetime columns with NumPy."""
+    values = values if isinstance(values, list) else list(values)
+    if len(values) > 1 and set(map(type, values)) == {datetime.datetime}:
+        import pandas as pd
+
+        try:
+            stamps = pd.to_datetime(pd.Series(values, dtype=object))
+        except (ValueError, OverflowError):
+            stamps = None
+        # str() adds microseconds and offsets per value; only the uniform case is vectorized
+        if stamps is not None and stamps.dt.tz is None:
+            raw = stamps.to_numpy()
+            seconds = raw.astype('datetime64[s]')
+            if not (seconds != raw).any():
+                return np.char.replace(np.datetime_as_string(seconds, unit='s'), 'T', ' ').tolist()
+    return list(map(str, values))
+
+
+def _record_builder(names: Sequence[str]):
+    """Return a function that builds one output dict from positional values."""
+    names = tuple(names)
+
+    def build_record(*values):
+        return dict(zip(names, values))
+
+    return build_record
+
+
+# Declarative helpers for mapping specs
+def rename(column: str) -> Rename:
+    """Output column copied from `column`."""
+    return Rename(column)
+
+
+def default(column: str, value: Any) -> Default:
+    """Output column copied from `column`, with None replaced by `value`."""
+    return Default(column, value)
+
+
+def fmt(template: str) -> Format:
+    """Output column built from a str.format template over source columns."""
+    return Format(template)
+
+
+def concat(*columns: str, sep: str = '') -> Concat:
+    """Output column joining source columns with `sep`."""
+    return Concat(*columns, sep=sep)
+
+
+def coerce(column: str, to: Any, default: Any = None) -> Coerce:
+    """Output column converted to str/float/int/bool, optionally defaulting falsy values."""
+    return Coerce(column, to, default)
+
+
+class MappingTransform:
+    """
+    Apply a declarative mapping of output fields to column expressions.
+
+    Usage:
+        from connectors.transform import MappingTransform, rename, fmt, coerce
+
+        transform = MappingTransform({
+            'id': rename('src_lead_id'),
+            'location': fmt('{customer_city}, {customer_state}'),
+            'value': coerce('bookings_gross', float, default=0),
+        })
+
+        records = transform.transform(rows)            # list of dicts
+        for record in transform.iter_transform(rows):  # streaming, in batches
+            ...
+    """
+
+    def __init__(self, mapping: Dict[str, _Expression], batch_size: int = 10000):
+        """
+        Initialize the transform.
+
+        Args:
+            mapping: Output field name -> expression (output keys keep this order);
+                a plain string is shorthand for rename(string)
+            batch_size: Rows per column batch in iter_transform
+        """
+        self.mapping = {
+            name: Rename(expression) if isinstance(expression, str) else expression
+            for name, expression in mapping.items()
+        }
+        self.batch_size = batch_size
+        self.output_columns = list(self.mapping)
+        source = []
+        for expression in self.mapping.values():
+            source.extend(name for name in expression.columns if name not in source)
+        self.source_columns = source
+        self._build_record = _record_builder(self.output_columns)
+
+    def _columns_from_rows(self, rows: List[Any],
+                           names: Optional[Sequence[str]] = None) -> Dict[str, Sequence[Any]]:
+        """Split rows into one list per source column (missing columns are left out)."""
+        columns = {}
+        if not rows:
+            return columns
+        first = rows[0]
+        if not isinstance(first, Mapping):
+            # Named rows are read by attribute, plain tuples by position in `names`
+            fields = getattr(first, '_fields', None)
+            if fields is None and names is None:
+                raise TypeError(f"{type(first).__name__} rows need their column names (columns=...)")
+            if fields is not None:
+                # Row classes from connectors.rows map original column names to
+                # positions (columns like 'COUNT(*)' have positional attribute names)
+                positions = getattr(first, '_column_index', None) or {name: i for i, name in enumerate(fields)}
+                for name in self.source_columns:
+                    if name in positions:
+                        columns[name] = list(map(attrgetter(fields[positions[name]]), rows))
+                return columns
+            for name in self.source_columns:
+                if name in names:
+                    columns[name] = list(map(itemgetter(list(names).index(name)), rows))
+            return columns
+        for name in self.source_columns:
+            try:
+                columns[name] = list(map(itemgetter(name), rows))
+            except KeyError:
+                # Some rows lack the column; missing values become None
+                columns[name] = [row.get(name) for row in rows]
+        return columns
+
+    def transform_columns(self, columns: Mapping[str, Sequence[Any]],
+                          length: Optional[int] = None) -> Dict[str, Sequence[Any]]:
+        """
+        Transform a column batch.
+
+        Args:
+            columns: Source column name -> sequence of values (missing columns are None)
+            length: Number of rows (taken from the first column if omitted)
+
+        Returns:
+            Output column name -> sequence of values
+        """
+        if length is None:
+            length = len(next(iter(columns.values()))) if columns else 0
+        columns = dict(columns)
+        for name in self.source_columns:
+            if name not in columns:
+                columns[name] = [None] * length
+        return {name: expression.evaluate(columns, length) for name, expression in self.mapping.items()}
+
+    def _records(self, output: Dict[str, Sequence[Any]], length: int) -> List[Dict[str, Any]]:
+        """Reassemble output columns into records."""
+        if not output:
+            return [{} for _ in range(length)]
+        values = [column.tolist() if isinstance(column, np.ndarray) else column
+                  for column in output.values()]
+        return list(map(self._build_record, *values))
+
+    def transform_batch(self, rows: Sequence[Any],
+                        columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Transform a list of rows as one column batch.
+
+        Args:
+            rows: Row dictionaries, namedtuple/slots rows or plain tuples
+            columns: Column names, required for plain tuple rows
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        return self._records(self.transform_columns(self._columns_from_rows(rows, columns), len(rows)),
+                             len(rows))
+
+    def transform_frame(self, frame):
+        """
+        Transform a pandas DataFrame (e.g. from ODBCConnector.iter_query_frames).
+
+        Returns:
+            pandas.DataFrame with the output columns
+        """
+        import pandas as pd
+
+        columns = {name: frame[name].tolist() for name in self.source_columns if name in frame}
+        output = self.transform_columns(columns, len(frame))
+        return pd.DataFrame({name: pd.Series(values, dtype=object) for name, values in output.items()},
+                            columns=self.output_columns, index=frame.index)
+
+    def transform_row(self, row: Any, columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Transform a single row (same output as the column path)."""
+        if not isinstance(row, Mapping) and not hasattr(row, 'get'):
+            row = row_to_dict(row, columns)
+        return {name: expression.evaluate_row(row) for name, expression in self.mapping.items()}
+
+    def iter_transform(self, rows: Iterable[Any],
+                       columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily transform rows in column batches of batch_size.
+
+        Args:
+            rows: Iterable of rows (see transform_batch)
+            columns: Column names, required for plain tuple rows
+
+        Yields:
+            Output records, in input order
+        """
+        iterator = iter(rows)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield from self.transform_batch(batch, columns)
+
+    def iter_transform_columns(self, batches: Iterable[Mapping[str, Sequence[Any]]]) -> Iterator[Dict[str, Any]]:
+        """
+        Transform column batches (e.g. ODBCConnector.iter_query_columns) without
+        building intermediate row dictionaries.
+
+        Yields:
+            Output records, in input order
+        """
+        for columns in batches:
+            length = len(next(iter(columns.values()))) if columns else 0
+            yield from self._records(self.transform_columns(columns, length), length)
+
+    def transform(self, rows: Iterable[Any], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Transform every row and return a list of output records."""
+        if not isinstance(rows, list):
+            return list(self.iter_transform(rows, columns))
+        records = []
+        for start in range(0, len(rows), self.batch_size):
+            records.extend(self.transform_batch(rows[start:start + self.batch_size], columns))
+        return records
@@ -0,0 +1,258 @@
+"""
+Startup Warm-up
+
+Cold-start support for the API on Cloud Run. api.py only imports what it
+needs to start serving; the heavy modules (pyodbc, requests, the export
+services) are imported in a background thread, which then opens the pooled
+database connections and the shared webhook session. A readiness endpoint
+reports the progress, and the import, warm-up and time-to-first-response
+durations are kept for /ready and /metrics.
+
+Under gunicorn the warm-up is started from the post_fork hook in
+gunicorn.conf.py, so every worker warms its own connections (neither
+threads nor database connections survive a fork).
+"""
+
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Sequence
+from urllib.parse import urlparse
+
+# Modules api.py defers to the warm-up thread (or to the first request using them)
+WARM_IMPORTS = (
+    'pyodbc',
+    'requests',
+    'connectors.odbc_connector',
+    'connectors.webhook_sink',
+    'services.birdeye_export',
+)
+
+
+def warm_db_pool():
+    """
+    Open the process-wide pool's minimum connections for the configured database.
+
+    Returns:
+        Number of idle pooled connections
+
+    Raises:
+        pyodbc.Error: If a connection cannot be opened
+    """
+    from connectors.config_loader import get_db_config
+    from connectors.odbc_connector import ODBCConnector
+
+    DB_CONFIG = get_db_config()
+    connector = ODBCConnector(
+        driver=DB_CONFIG['driver'],
+        server=DB_CONFIG['server'],
+        database=DB_CONFIG['database'],
+        username=DB_CONFIG['username'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG.get('port'),
+        use_pool=True
+    )
+    with connector:
+        connector.pool.warm()
+    return connector.pool.stats()['idle']
+
+
+def warm_http_session(services: Sequence[str] = ('birdeye',)):
+    """
+    Create the shared webhook session and resolve the endpoint hosts.
+
+    No request is sent: webhook endpoints are not safe to probe, and an idle
+    TLS connection would be closed by the server long before the next export.
+
+    Returns:
+        List of resolved endpoint hosts
+    """
+    from connectors.config_loader import get_endpoint
+    from connectors.webhook_sink import get_shared_session
+
+    get_shared_session()
+    hosts = []
+    for service in services:
+        try:
+            url = urlparse(get_endpoint(service))
+        except RuntimeError:
+            continue
+        if url.hostname:
+            socket.getaddrinfo(url.hostname, url.port or (443 if url.scheme == 'https' else 80),
+                               type=socket.SOCK_STREAM)
+            hosts.append(url.hostname)
+    return hosts
+
+
+class Warmup:
+    """
+    Background warm-up of imports, database connections and HTTP sessions.
+
+    A step that fails is recorded and warm-up continues; the process is ready
+    once every step has finished, since connections are also made on demand.
+
+    Usage:
+        from connectors.warmup import get_warmup
+
+        warmup = get_warmup()
+        warmup.start()
+        ...
+        warmup.status()   # {'state': 'ready', 'ready': True, 'steps': {...}, ...}
+    """
+
+    def __init__(self, imports: Sequence[str] = WARM_IMPORTS, db: bool = True, http: bool = True):
+        """
+        Initialize the warm-up.
+
+        Args:
+            imports: Modules to import in the background
+            db: Open pooled database connections
+            http: Create the shared webhook session
+        """
+        self.imports = tuple(imports)
+        self.db = db
+        self.http = http
+        self.pid = os.getpid()
+        self.created_at = time.monotonic()
+        self.timings: Dict[str, float] = {}
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._steps: Dict[str, Dict[str, Any]] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def record(self, name: str, seconds: float):
+        """Record a startup duration (e.g. 'api_import') for status() and /metrics."""
+        with self._lock:
+            self.timings[name] = round(seconds, 4)
+
+    def mark_first_response(self):
+        """
+        Record the time from startup to the first response (only the first call counts).
+
+        Startup is when this Warmup was created: right after the fork under
+        gunicorn, or at the top of api.py otherwise.
+        """
+        if 'first_response' in self.timings:
+            return
+        seconds = time.monotonic() - self.created_at
+        with self._lock:
+            if 'first_response' in self.timings:
+                return
+            self.timings['first_response'] = round(seconds, 4)
+        logging.info(f"First response {seconds:.3f}s after startup")
+
+    def start(self) -> bool:
+        """
+        Start warming up in a daemon thread.
+
+        Returns:
+            True if this call started it, False if it was already started
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+        self._thread.start()
+        return True
+
+    def _step(self, name: str, func: Callable[[], Any]):
+        started = time.monotonic()
+        with self._lock:
+            self._steps[name] = {'status': 'running'}
+        try:
+            detail = func()
+        except Exception as e:
+            logging.warning(f"Warm-up step {name} failed: {e}")
+            step = {'status': 'failed', 'error': str(e)}
+        else:
+            step = {'status': 'done'}
+            if isinstance(detail, dict):
+                step['detail'] = detail
+        step['seconds'] = round(time.monotonic() - started, 4)
+        with self._lock:
+            self._steps[name] = step
+
+    def run(self):
+        """Run every warm-up step in the calling thread."""
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        try:
+            for module in self.imports:
+                self._step(f'import:{module}', partial(importlib.import_module, module))
+            if self.db:
+                self._step('db_pool', lambda: {'idle_connections': warm_db_pool()})
+            if self.http:
+                self._step('http_session', lambda: {'resolved_hosts': warm_http_session()})
+        finally:
+            self._finished_at = time.monotonic()
+            self.record('warmup', self._finished_at - self._started_at)
+            self._done.set()
+            failed = [name for name, step in self._steps.items() if step['status'] == 'failed']
+            logging.info(f"Warm-up finished in {self.timings['warmup']:.3f}s"
+                         + (f" ({len(failed)} steps failed: {', '.join(failed)})" if failed else ""))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for warm-up to finish; returns True if it has."""
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Warm-up state for the readiness endpoint.
+
+        Returns:
+            Dictionary with state ('pending', 'warming', 'ready' or 'degraded'
+            when a step failed), per-step results and startup timings in seconds
+        """
+        with self._lock:
+            steps = {name: dict(step) for name, step in self._steps.items()}
+            timings = dict(self.timings)
+        if self._thread is None and not self.ready:
+            state = 'pending'
+        elif not self.ready:
+            state = 'warming'
+        elif any(step['status'] == 'failed' for step in steps.values()):
+            state = 'degraded'
+        else:
+            state = 'ready'
+        return {
+            'state': state,
+            'ready': self.ready,
+            'pid': self.pid,
+            'uptime': round(time.monotonic() - self.created_at, 3),
+            'timings': timings,
+            'steps': steps,
+        }
+
+
+_warmup: Optional[Warmup] = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> Warmup:
+    """
+    Get the process-wide Warmup.
+
+    A forked worker gets a fresh instance, since the parent's thread and
+    connections do not carry over.
+
+    Returns:
+        Shared Warmup instance for this process
+    """
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None or _warmup.pid != os.getpid():
+            from connectors.config_loader import get_warmup_config
+            _warmup = Warmup(**get_warmup_config())
+        return _warmup
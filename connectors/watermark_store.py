@@ -0,0 +1,133 @@
+"""
+Watermark Store for incremental extraction
+
+Persists a per-job checkpoint (e.g. the last install_date / src_lead_id
+successfully delivered) in a small JSON file so scheduled runs only pull
+rows newer than the previous successful run.
+"""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+
+class WatermarkStore:
+    """
+    File-backed store of per-job watermarks.
+
+    Usage:
+        from connectors.watermark_store import WatermarkStore
+
+        store = WatermarkStore('state/watermarks.json')
+        watermark = store.get('birdeye_export')   # None on first run
+        ...
+        store.set('birdeye_export', {'install_date': '2024-01-31', 'src_lead_id': 1234})
+    """
+
+    def __init__(self, path: str = 'state/watermarks.json'):
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON file holding all job watermarks
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def _save(self, data: Dict[str, Any]):
+        """Write the whole file atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Unique per write: stores in other threads of this process may save at the same time
+        tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, job: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the watermark for a job.
+
+        Args:
+            job: Job name
+
+        Returns:
+            The stored watermark value, or None if the job has no checkpoint
+        """
+        with self._lock:
+            entry = self._load().get(job)
+        return entry['value'] if entry else None
+
+    def set(self, job: str, value: Dict[str, Any]):
+        """
+        Store a new watermark for a job.
+
+        Args:
+            job: Job name
+            value: JSON-serializable watermark (dates are stored as strings)
+        """
+        with self._lock:
+            data = self._load()
+            data[job] = {
+                'value': value,
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+            }
+            self._save(data)
+
+    def clear(self, job: str):
+        """Remove a job's watermark so the next run does a full extract."""
+        with self._lock:
+            data = self._load()
+            if data.pop(job, None) is not None:
+                self._save(data)
+
+
+class WatermarkTracker:
+    """
+    Track the highest key seen in a row stream.
+
+    Keys are compared as tuples of the configured columns, so a composite
+    watermark such as (install_date, src_lead_id) breaks ties on equal dates.
+
+    Usage:
+        tracker = WatermarkTracker(['install_date', 'src_lead_id'])
+        export(tracker.track(connector.iter_query(query)))
+        if delivered and tracker.value:
+            store.set('birdeye_export', tracker.value)
+    """
+
+    def __init__(self, columns):
+        """
+        Args:
+            columns: Column names making up the watermark, most significant first
+        """
+        self.columns = list(columns)
+        self._max = None
+
+    def track(self, rows):
+        """Pass rows through while recording the highest key (rows with NULL keys are ignored)."""
+        for row in rows:
+            key = tuple(row.get(column) for column in self.columns)
+            if None not in key and (self._max is None or key > self._max):
+                self._max = key
+            yield row
+
+    @property
+    def value(self) -> Optional[Dict[str, Any]]:
+        """Highest key seen as a JSON-friendly dict (dates as ISO strings), or None."""
+        if self._max is None:
+            return None
+        return {
+            column: value.isoformat() if hasattr(value, 'isoformat') else value
+            for column, value in zip(self.columns, self._max)
+        }
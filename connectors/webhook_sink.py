@@ -0,0 +1,369 @@
+"""
+Batched Webhook Sink
+
+Splits records into count- and size-bounded batches and POSTs them to a
+webhook endpoint over a pooled keep-alive requests.Session, with bounded
+parallelism and per-batch retries (exponential backoff with full jitter).
+Batches that still fail can be kept in a DeliverySpool and replayed later.
+Load on each destination host is adapted by a shared DeliveryController
+(AIMD concurrency limit, Retry-After, circuit breaker).
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from connectors import metrics
+from connectors.delivery_controller import CircuitOpenError, DeliveryController, get_controller, parse_retry_after
+from connectors.rows import row_to_dict
+from connectors.serializers import Serializer, get_serializer
+
+# Status codes worth retrying; other 4xx responses fail the batch immediately
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class WebhookSink:
+    """
+    Deliver records to a webhook endpoint in concurrent batches.
+
+    Each batch is sent as {"data": [...], "service": ..., "record_count": n,
+    "batch_index": i}, so the receiver sees the same shape as the previous
+    single-POST payload, once per batch. Records are encoded with the
+    configured serializer (JSON, or MessagePack with SERIALIZER=msgpack);
+    records from ExportWriter.tee arrive already encoded and are not
+    serialized again.
+
+    Every request carries an Idempotency-Key header (<run id>-<batch index>)
+    that stays the same across retries and spool replays, so receivers can
+    drop duplicates. With a spool, batches that fail with a retryable error
+    after all retries are appended to it for replay.
+
+    Requests go through the destination's DeliveryController: concurrency
+    adapts to 429s, errors and latency, a Retry-After pauses every worker,
+    and while the circuit is open batches fail at once (and are spooled)
+    instead of waiting for timeouts.
+
+    Usage:
+        from connectors.webhook_sink import WebhookSink
+
+        with WebhookSink(endpoint, 'birdeye', max_batch_records=500, max_workers=4) as sink:
+            summary = sink.send(records)
+
+        if summary['failed_batches']:
+            ...
+    """
+
+    def __init__(self, endpoint: str, service: str, max_batch_records: int = 500,
+                 max_batch_bytes: int = 1_000_000, max_workers: int = 4,
+                 max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, timeout: float = 30.0, connect_timeout: float = 5.0,
+                 session: Optional[requests.Session] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 serializer: Union[str, Serializer, None] = None,
+                 spool=None, controller: Optional[DeliveryController] = None):
+        """
+        Initialize the sink.
+
+        Args:
+            endpoint: Webhook URL
+            service: Service name included in every payload
+            max_batch_records: Maximum records per batch
+            max_batch_bytes: Approximate maximum encoded size of a batch's records
+            max_workers: Maximum number of batches in flight at once
+            max_retries: Retries per batch after the first attempt
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Maximum backoff delay in seconds
+            timeout: Per-request read timeout in seconds
+            connect_timeout: Connection timeout in seconds
+            session: Optional shared requests.Session (created if not provided)
+            columns: Column names for plain tuple rows (row_factory='tuple');
+                dicts and namedtuple/slots rows carry their own names
+            serializer: 'json' (default), 'orjson', 'msgpack' or a Serializer
+            spool: Optional DeliverySpool for batches that cannot be delivered
+            controller: DeliveryController to use (defaults to the shared one
+                for the endpoint's host; none with WEBHOOK_ADAPTIVE=false)
+        """
+        if max_batch_records < 1 or max_workers < 1:
+            raise ValueError("max_batch_records and max_workers must be at least 1")
+
+        self.endpoint = endpoint
+        self.service = service
+        self.max_batch_records = max_batch_records
+        self.max_batch_bytes = max_batch_bytes
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.columns = columns
+        self.serializer = get_serializer(serializer)
+        self.spool = spool
+        self.controller = controller if controller is not None else get_controller(endpoint)
+
+        self._owns_session = session is None
+        self.session = session or self._create_session(max_workers)
+
+    @staticmethod
+    def _create_session(max_workers: int) -> requests.Session:
+        """Create a keep-alive session with a connection pool sized for max_workers."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _iter_batches(self, records: Iterable[Dict[str, Any]]) -> Iterator[List[bytes]]:
+        """Encode records (unless already encoded) and group them into count/size bounded batches."""
+        batch: List[bytes] = []
+        batch_bytes = 0
+        encode_seconds = 0.0
+        encode = self.serializer.encoded
+        for record in records:
+            started = time.perf_counter()
+            if not isinstance(record, dict):
+                record = row_to_dict(record, self.columns)
+            encoded = encode(record)
+            encode_seconds += time.perf_counter() - started
+            if batch and (len(batch) >= self.max_batch_records
+                          or batch_bytes + len(encoded) > self.max_batch_bytes):
+                metrics.SERIALIZE_SECONDS.inc(encode_seconds, sink='webhook')
+                encode_seconds = 0.0
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(encoded)
+            batch_bytes += len(encoded) + 1
+        metrics.SERIALIZE_SECONDS.inc(encode_seconds, sink='webhook')
+        if batch:
+            yield batch
+
+    def _build_body(self, batch: List[bytes], batch_index: int) -> bytes:
+        """Assemble the payload for a batch from pre-encoded records."""
+        return self.serializer.encode_batch(
+            batch, service=self.service, record_count=len(batch), batch_index=batch_index)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt (1-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def post_body(self, body: bytes, batch_index: int, record_count: int,
+                  idempotency_key: Optional[str] = None,
+                  content_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        POST an already built payload with retries. Never raises.
+
+        Used for new batches and for spool replays.
+
+        Args:
+            body: Request body
+            batch_index: Batch index (logs and result)
+            record_count: Records in the payload (metrics and result)
+            idempotency_key: Sent as the Idempotency-Key header
+            content_type: Content-Type (defaults to the serializer's)
+
+        Returns:
+            Result dict (success, retryable, attempts, status_code, error, ...)
+        """
+        headers = {'Content-Type': content_type or self.serializer.content_type}
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        started = time.monotonic()
+        attempt = 0
+        error = None
+        status_code = None
+        retryable = False
+
+        controller = self.controller
+
+        while True:
+            attempt += 1
+            trial = False
+            if controller is not None:
+                try:
+                    trial = controller.acquire()
+                except CircuitOpenError as e:
+                    # Fail fast; the batch is spooled rather than retried against a dead endpoint
+                    status_code = None
+                    error = str(e)
+                    retryable = True
+                    break
+            attempt_started = time.perf_counter()
+            status_code = None
+            retry_after = None
+            try:
+                response = self.session.post(
+                    self.endpoint,
+                    data=body,
+                    headers=headers,
+                    timeout=(self.connect_timeout, self.timeout)
+                )
+                status_code = response.status_code
+                metrics.WEBHOOK_REQUEST_SECONDS.observe(
+                    time.perf_counter() - attempt_started, service=self.service, outcome=str(status_code))
+                if response.ok:
+                    error = None
+                else:
+                    error = f"HTTP {status_code}"
+                    retryable = status_code in RETRYABLE_STATUS_CODES
+                    if status_code in (429, 503):
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            except requests.RequestException as e:
+                metrics.WEBHOOK_REQUEST_SECONDS.observe(
+                    time.perf_counter() - attempt_started, service=self.service, outcome='error')
+                error = str(e)
+                retryable = True
+            finally:
+                if controller is not None:
+                    controller.release(trial, time.perf_counter() - attempt_started, status_code, retry_after)
+
+            if error is None or not retryable or attempt > self.max_retries:
+                break
+
+            metrics.WEBHOOK_RETRIES.inc(service=self.service)
+            delay = self._backoff(attempt)
+            if retry_after and controller is None:
+                # With a controller, acquire() waits out the pause for every worker
+                delay = max(delay, min(retry_after, self.backoff_max))
+            logging.warning(
+                f"Batch {batch_index} to {self.service} failed ({error}), "
+                f"retrying in {delay:.2f}s (attempt {attempt}/{self.max_retries})"
+            )
+            time.sleep(delay)
+
+        if error is None:
+            metrics.WEBHOOK_BYTES_SENT.inc(len(body), service=self.service)
+            metrics.WEBHOOK_RECORDS_SENT.inc(record_count, service=self.service)
+        else:
+            metrics.WEBHOOK_ERRORS.inc(service=self.service)
+
+        return {
+            'batch_index': batch_index,
+            'record_count': record_count,
+            'bytes': len(body),
+            'attempts': attempt,
+            'status_code': status_code,
+            'success': error is None,
+            'retryable': error is not None and retryable,
+            'error': error,
+            'elapsed': round(time.monotonic() - started, 3),
+        }
+
+    def _send_batch(self, batch: List[bytes], batch_index: int, run_id: str) -> Dict[str, Any]:
+        """POST one batch with retries, spooling it if it still fails. Never raises; returns a result dict."""
+        body = self._build_body(batch, batch_index)
+        key = f"{run_id}-{batch_index}"
+        result = self.post_body(body, batch_index, len(batch), idempotency_key=key)
+        result['spooled'] = False
+        if not result['success'] and result['retryable'] and self.spool is not None:
+            try:
+                self.spool.append(self.service, self.endpoint, body, self.serializer.content_type,
+                                  key=key, batch_index=batch_index, record_count=len(batch),
+                                  error=result['error'])
+                result['spooled'] = True
+            except OSError as e:
+                logging.error(f"Could not spool failed batch {batch_index} for {self.service}: {e}")
+        return result
+
+    def send(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Send records in batches and wait for every batch to finish.
+
+        Records are consumed lazily; at most 2 * max_workers batches are held
+        in memory at a time. HTTP failures are reported in the result rather
+        than raised, but errors raised by the records iterable propagate.
+        With a spool, batches that fail with a retryable error are appended
+        to it ('spooled_batches' of the 'failed_batches').
+
+        Args:
+            records: Iterable of dictionaries or connectors.rows rows (list or generator)
+
+        Returns:
+            Summary dictionary with totals and a 'results' list of per-batch results
+        """
+        started = time.monotonic()
+        in_flight = threading.BoundedSemaphore(self.max_workers * 2)
+        futures = []
+        run_id = uuid.uuid4().hex[:12]
+
+        def run(batch, index):
+            try:
+                return self._send_batch(batch, index, run_id)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix=f"webhook-{self.service}") as executor:
+            for index, batch in enumerate(self._iter_batches(records)):
+                in_flight.acquire()
+                futures.append(executor.submit(run, batch, index))
+
+        results = [future.result() for future in futures]
+        failed = [r for r in results if not r['success']]
+        elapsed = time.monotonic() - started
+
+        summary = {
+            'service': self.service,
+            'batches': len(results),
+            'failed_batches': len(failed),
+            'spooled_batches': sum(1 for r in failed if r['spooled']),
+            'records': sum(r['record_count'] for r in results),
+            'records_sent': sum(r['record_count'] for r in results if r['success']),
+            'bytes_sent': sum(r['bytes'] for r in results if r['success']),
+            'elapsed': round(elapsed, 3),
+            'results': results,
+        }
+
+        logging.info(
+            f"Webhook delivery for {self.service}: {summary['records_sent']}/{summary['records']} "
+            f"records in {summary['batches'] - summary['failed_batches']}/{summary['batches']} "
+            f"batches ({elapsed:.2f}s)"
+        )
+        for result in failed:
+            logging.error(
+                f"Batch {result['batch_index']} ({result['record_count']} records) to "
+                f"{self.service} failed after {result['attempts']} attempts: {result['error']}"
+                + (" (spooled for replay)" if result['spooled'] else "")
+            )
+        return summary
+
+    def close(self):
+        """Close the HTTP session if this sink created it."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Get the process-wide keep-alive session for webhook delivery.
+
+    Long-running processes (the API, the scheduler) pass it to WebhookSink so
+    TCP/TLS connections stay warm between exports; the pool is sized from
+    WEBHOOK_CONCURRENCY.
+
+    Returns:
+        Shared requests.Session
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            from connectors.config_loader import get_webhook_config
+            _shared_session = WebhookSink._create_session(get_webhook_config()['max_workers'])
+        return _shared_session
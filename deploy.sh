@@ -79,6 +79,9 @@ EXAMPLE_SERVICE_ENDPOINT="https://hooks.zapier.com/hooks/catch/23151206/umyaaov/
 # Logging
 LOG_DIR="logs"
 LOG_LEVEL="INFO"
+# Cloud Run's filesystem is ephemeral: log JSON to stdout for Cloud Logging instead of files
+LOG_FORMAT="json"
+LOG_TO_FILE="false"
 
 echo -e "${BLUE}Configuration:${NC}"
 echo "  Service Name: ${SERVICE_NAME}"
@@ -105,6 +108,7 @@ gcloud run deploy ${SERVICE_NAME} \
   --source . \
   --region ${REGION} \
   --allow-unauthenticated \
+  --no-cpu-throttling \
   --set-env-vars "DB_DRIVER=${DB_DRIVER}" \
   --set-env-vars "DB_SERVER=${DB_SERVER}" \
   --set-env-vars "DB_DATABASE=${DB_DATABASE}" \
@@ -115,6 +119,8 @@ gcloud run deploy ${SERVICE_NAME} \
   --set-env-vars "EXAMPLE_SERVICE_ENDPOINT=${EXAMPLE_SERVICE_ENDPOINT}" \
   --set-env-vars "LOG_DIR=${LOG_DIR}" \
   --set-env-vars "LOG_LEVEL=${LOG_LEVEL}" \
+  --set-env-vars "LOG_FORMAT=${LOG_FORMAT}" \
+  --set-env-vars "LOG_TO_FILE=${LOG_TO_FILE}" \
   --quiet
 
 echo ""
@@ -66,6 +66,7 @@ gcloud run deploy $SERVICE_NAME \
   --image gcr.io/$PROJECT_ID/$SERVICE_NAME:$IMAGE_TAG \
   --region $REGION \
   --allow-unauthenticated \
+  --no-cpu-throttling \
   --set-env-vars "DB_DRIVER=MariaDB,DB_SERVER=34.152.118.156,DB_DATABASE=odcb_databridge-db,DB_USERNAME=odcb-databridge-db,DB_PASSWORD=${DB_PASSWORD},DB_PORT=3306,BIRDEYE_ENDPOINT=https://hooks.zapier.com/hooks/catch/23151206/umyaaov/,EXAMPLE_SERVICE_ENDPOINT=https://hooks.zapier.com/hooks/catch/23151206/umyaaov/,LOG_DIR=logs,LOG_LEVEL=INFO" \
   --quiet
 
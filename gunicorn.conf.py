@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for ODBC DataBridge
+
+Gunicorn loads ./gunicorn.conf.py automatically; command-line flags (as in
+the Dockerfile) take precedence over the settings here.
+
+Each worker starts warming up right after it is forked, so the deferred
+imports, database connections and webhook session are prepared while the
+worker is still loading the app, instead of on the first request.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+bind = f":{os.environ.get('PORT', '8080')}"
+
+
+def post_fork(server, worker):
+    from connectors.warmup import get_warmup
+
+    get_warmup().start()
+    server.log.info(f"Worker {worker.pid} started warm-up")
@@ -0,0 +1,123 @@
+"""
+Job Scheduler for ODBC DataBridge
+
+Long-running alternative to one cron entry per service script. The services
+are imported once and run on cron or interval schedules inside this process,
+sharing pooled database connections and a keep-alive HTTP session between
+runs instead of paying interpreter startup, imports and a cold connection
+every time.
+
+Schedules come from SCHEDULE_<JOB> environment variables, e.g.
+    SCHEDULE_BIRDEYE_EXPORT=0 2 * * *      (default)
+    SCHEDULE_EXAMPLE_SERVICE=every 1h      (disabled unless set)
+
+Usage:
+    python scheduler.py                       # run until SIGINT/SIGTERM
+    python scheduler.py --list                # show jobs and their next run
+    python scheduler.py --run birdeye_export  # run one job now and exit
+    python scheduler.py --run spool_replay    # resend spooled webhook batches and exit
+"""
+
+import sys
+import os
+import argparse
+import json
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from connectors.logger_utils import setup_logger
+from connectors.config_loader import get_scheduler_config, get_job_schedule
+from connectors.scheduler import Scheduler
+from connectors.webhook_sink import get_shared_session
+from connectors.warmup import warm_db_pool
+from connectors.delivery_spool import replay_pending
+from services import birdeye_export, example_service
+
+# Schedule used when SCHEDULE_<JOB> is not set (None = disabled)
+DEFAULT_SCHEDULES = {
+    'birdeye_export': '0 2 * * *',
+    'example_service': None,
+    'spool_replay': 'every 5m',
+}
+
+
+def build_jobs():
+    """
+    Create the job callables.
+
+    Every job borrows connections from the shared pool and posts through one
+    shared HTTP session, so both stay warm between runs. spool_replay resends
+    webhook batches that failed in earlier runs, without touching the database.
+
+    Returns:
+        Dictionary of job name -> zero-argument callable
+    """
+    session = get_shared_session()
+    birdeye_logger = setup_logger('birdeye_export')
+    example_logger = setup_logger('example_service')
+
+    return {
+        'birdeye_export': lambda: birdeye_export.run_export(birdeye_logger, use_pool=True, session=session),
+        'example_service': lambda: example_service.run(example_logger, use_pool=True, session=session),
+        'spool_replay': lambda: replay_pending(session=session),
+    }
+
+
+def warm_connections(logger):
+    """Open the pooled database connections up front so the first run starts warm."""
+    try:
+        idle = warm_db_pool()
+        logger.info(f"Warmed database connection pool: {idle} idle connections")
+    except Exception as e:
+        # Jobs connect on demand; a database that is down now may be up at run time
+        logger.warning(f"Could not pre-warm database connections: {e}")
+
+
+def main(argv=None):
+    """Main execution function for the scheduler."""
+    parser = argparse.ArgumentParser(description="Run service jobs on cron/interval schedules")
+    parser.add_argument('--list', action='store_true', help="List scheduled jobs and exit")
+    parser.add_argument('--run', metavar='JOB', help="Run one job immediately and exit")
+    args = parser.parse_args(argv)
+
+    logger = setup_logger('scheduler')
+    jobs = build_jobs()
+
+    if args.run:
+        if args.run not in jobs:
+            parser.error(f"Unknown job {args.run} (choose from {', '.join(jobs)})")
+        scheduler = Scheduler(max_workers=1)
+        scheduler.add_job(args.run, jobs[args.run], 'every 1d')
+        scheduler.run_now(args.run)
+        result = scheduler.jobs()[0]
+        logger.info(f"Job {args.run} {result['last_status']} in {result['last_duration']}s")
+        sys.exit(0 if result['last_status'] == 'succeeded' else 1)
+
+    scheduler = Scheduler(**get_scheduler_config())
+    for name, func in jobs.items():
+        schedule = get_job_schedule(name, DEFAULT_SCHEDULES.get(name))
+        if schedule is None:
+            logger.info(f"Job {name} is disabled (set SCHEDULE_{name.upper()} to enable)")
+            continue
+        scheduler.add_job(name, func, schedule, max_instances=1)
+
+    if args.list:
+        print(json.dumps(scheduler.jobs(), indent=2))
+        return
+
+    if not scheduler.jobs():
+        logger.error("No jobs are scheduled, exiting")
+        sys.exit(1)
+
+    warm_connections(logger)
+    for job in scheduler.jobs():
+        logger.info(f"Job {job['name']}: {job['schedule']}, next run at {job['next_run']}")
+
+    logger.info("Scheduler started")
+    scheduler.run_forever()
+    logger.info("Scheduler stopped")
+
+
+if __name__ == "__main__":
+    main()
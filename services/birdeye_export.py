@@ -4,25 +4,384 @@ Birdeye Export Service
 This script connects to the data warehouse, retrieves data, and exports it
 for integration with Birdeye service. Single destination script.
 
+Runs are incremental: only rows newer than the last successfully delivered
+(install_date, src_lead_id) watermark are exported. The first run, and any
+run with --full-refresh, exports the last 30 days. Records whose content is
+unchanged since they were last delivered are not re-sent (--no-dedup sends
+everything).
+
+The export API reuses the same query with filters (brand, install date
+range, ...) pushed down as bound parameters, and pages through it with
+keyset pagination on (install_date, src_lead_id).
+
 Usage:
     python services/birdeye_export.py
+    python services/birdeye_export.py --full-refresh
+    python services/birdeye_export.py --full-refresh --parallel 4
     
 Cron example:
     # Run every day at 2 AM
     0 2 * * * cd /path/to/odbc-databridge && python services/birdeye_export.py
+    
+Scheduler (keeps connections and imports warm between runs):
+    SCHEDULE_BIRDEYE_EXPORT='0 2 * * *' python scheduler.py
 """
 
 import sys
 import os
+import time
+import argparse
+from contextlib import nullcontext
+from datetime import date, timedelta
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from connectors.odbc_connector import ODBCConnector
 from connectors.logger_utils import setup_logger
-from connectors.config_loader import get_db_config, get_endpoint
-import json
-import requests
+from connectors.config_loader import (
+    get_db_config, get_endpoint, get_webhook_config, get_export_config, get_state_dir,
+    get_dedup_max_keys, get_pipeline_config
+)
+from connectors.export_utils import COLUMNAR_FORMATS, open_export_writer, write_export
+from connectors.webhook_sink import WebhookSink
+from connectors import metrics
+from connectors.watermark_store import WatermarkStore, WatermarkTracker
+from connectors.dedup_store import DedupStore
+from connectors.partitioned_reader import date_partitions
+from connectors.pipeline import Pipeline
+from connectors.delivery_spool import get_spool
+from connectors.keyset import decode_cursor, encode_cursor, keyset_condition
+
+JOB_NAME = 'birdeye_export'
+
+# Composite watermark: install_date first, src_lead_id breaks ties within a day
+WATERMARK_COLUMNS = ['install_date', 'src_lead_id']
+
+# Keyset pagination key, matching the ORDER BY (newest first)
+PAGE_KEY = ['install_date', 'src_lead_id']
+
+# Seconds the first page (no cursor) is served from the query cache; later
+# pages always seek on the database so new rows are not hidden from pagers
+FIRST_PAGE_CACHE_TTL = 10
+
+# Query databricks table for BirdEye review requests
+# Focus on installed jobs for review solicitation
+BIRDEYE_QUERY = """
+    SELECT 
+        src_lead_id,
+        brand,
+        customer_name,
+        customer_email,
+        customer_phone,
+        customer_address_1,
+        customer_city,
+        customer_state,
+        customer_zip_postal,
+        product_of_interest,
+        install_date,
+        revenue,
+        appt_statuses
+    FROM databricks
+    WHERE installed_jobs > 0
+        AND install_date IS NOT NULL
+        {window}
+    ORDER BY install_date DESC, src_lead_id DESC
+"""
+
+# Full refresh window on the database clock, same bounds as the single query
+PARTITION_WINDOW_QUERY = "SELECT DATE_SUB(CURDATE(), INTERVAL 30 DAY), CURDATE()"
+
+
+def _day_after(value):
+    return date.fromisoformat(value) + timedelta(days=1)
+
+
+# Filters accepted by the export API: name -> (column, operator, value parser).
+# Values are bound as parameters, never formatted into the SQL. end_date is
+# inclusive, so it becomes install_date < the following day (also for DATETIME columns)
+EXPORT_FILTERS = {
+    'brand_name': ('brand', '=', str),
+    'customer_state': ('customer_state', '=', str),
+    'product_of_interest': ('product_of_interest', '=', str),
+    'start_date': ('install_date', '>=', date.fromisoformat),
+    'end_date': ('install_date', '<', _day_after),
+}
+
+
+def parse_filters(filters):
+    """
+    Validate export filters from an API request.
+    
+    Args:
+        filters: Dictionary of filter name -> value (a list of values means
+            "any of" for the equality filters); empty values are ignored
+        
+    Returns:
+        Dictionary of filter name -> list of parsed values
+        
+    Raises:
+        ValueError: For an unknown filter or an invalid value
+    """
+    parsed = {}
+    for name, value in (filters or {}).items():
+        if value is None or value == '' or value == []:
+            continue
+        if name not in EXPORT_FILTERS:
+            raise ValueError(f"Unknown filter: {name} (choose from {', '.join(EXPORT_FILTERS)})")
+        column, operator, parse = EXPORT_FILTERS[name]
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if len(values) > 1 and operator != '=':
+            raise ValueError(f"Filter {name} takes a single value")
+        try:
+            parsed[name] = [parse(str(item)) for item in values]
+        except ValueError:
+            raise ValueError(f"Invalid value for {name}: {value!r}")
+    return parsed
+
+
+def build_birdeye_query(watermark=None, filters=None, after=None, limit=None):
+    """
+    Build the Birdeye query for a full (30-day), incremental or filtered run.
+    
+    Args:
+        watermark: Stored watermark dict with install_date and src_lead_id,
+            or None for a full refresh
+        filters: Filters from parse_filters; without a start_date (or a
+            watermark) the last 30 days are exported
+        after: Keyset pagination: PAGE_KEY values of the last row of the
+            previous page (from decode_cursor)
+        limit: Maximum number of rows
+        
+    Returns:
+        Tuple of (query, params) where params is None for a full refresh
+    """
+    conditions = []
+    params = []
+    if watermark:
+        conditions.append("(install_date > ? OR (install_date = ? AND src_lead_id > ?))")
+        params.extend([watermark['install_date'], watermark['install_date'], watermark['src_lead_id']])
+    elif not filters or 'start_date' not in filters:
+        conditions.append("install_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)")
+    
+    for name, values in (filters or {}).items():
+        column, operator, _ = EXPORT_FILTERS[name]
+        if len(values) > 1:
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+        else:
+            conditions.append(f"{column} {operator} ?")
+        params.extend(values)
+    
+    if after:
+        condition, after_params = keyset_condition(PAGE_KEY, after, descending=True)
+        conditions.append(condition)
+        params.extend(after_params)
+    
+    query = BIRDEYE_QUERY.format(window="\n        ".join(f"AND {condition}" for condition in conditions))
+    if limit:
+        query += f"    LIMIT {int(limit)}\n"
+    return query, tuple(params) or None
+
+
+def fetch_page(connector, filters=None, cursor=None, limit=1000):
+    """
+    Fetch one page of Birdeye records with keyset pagination.
+    
+    Each page seeks past the (install_date, src_lead_id) of the previous
+    page's last row instead of using OFFSET, so deep pages are as cheap as
+    the first and new rows do not shift the pages a client is reading.
+    
+    Args:
+        connector: Connected ODBCConnector (dictionary rows); with a cache,
+            the first page is cached for FIRST_PAGE_CACHE_TTL seconds
+        filters: Filters from parse_filters
+        cursor: next_cursor token of the previous page, or None for the first page
+        limit: Records per page
+        
+    Returns:
+        Tuple of (records, next_cursor) where next_cursor is None on the last page
+        
+    Raises:
+        InvalidCursorError: For a malformed token or one issued for other filters
+    """
+    after = decode_cursor(cursor, PAGE_KEY, scope=filters) if cursor else None
+    # One extra row tells whether there is a next page
+    query, params = build_birdeye_query(filters=filters, after=after, limit=limit + 1)
+    records = connector.execute_query(query, params, cache_ttl=0 if after else FIRST_PAGE_CACHE_TTL)
+    if len(records) <= limit:
+        return records, None
+    records = records[:limit]
+    return records, encode_cursor(records[-1], PAGE_KEY, scope=filters)
+
+
+def iter_export_records(connector, filters=None):
+    """
+    Lazily yield Birdeye records (no watermark, no dedup).
+    
+    Used by the API's streaming export endpoint.
+    
+    Args:
+        connector: Connected ODBCConnector
+        filters: Filters from parse_filters (default: the last 30 days)
+        
+    Returns:
+        Iterator of record dictionaries
+    """
+    query, params = build_birdeye_query(filters=filters)
+    return connector.iter_query(query, params)
+
+
+def iter_full_refresh_parallel(connector, max_workers):
+    """
+    Stream the 30-day full refresh as one query per install_date day,
+    running max_workers days concurrently on separate connections.
+    
+    Days are yielded newest first, matching the ORDER BY install_date DESC
+    of the single-query version. The window is taken from the database
+    clock, like the single query's DATE_SUB(CURDATE(), INTERVAL 30 DAY), and
+    the newest partition is open-ended, so future-dated rows and app/DB
+    timezone differences don't change the result set.
+    
+    Args:
+        connector: ODBCConnector whose settings are cloned per partition
+        max_workers: Number of concurrent partition queries
+        
+    Returns:
+        Iterator of row dictionaries
+    """
+    with connector.clone() as clock:
+        start, today = clock.execute_query(PARTITION_WINDOW_QUERY, cache_ttl=0, row_factory='tuple')[0]
+    partitions = date_partitions(start, today) + [(today, None)]
+    query = BIRDEYE_QUERY.format(window="AND {partition}")
+    return connector.iter_query_partitioned(
+        query, 'install_date', list(reversed(partitions)),
+        max_workers=max_workers, ordered=True
+    )
+
+
+def birdeye_export_schema(connector):
+    """
+    Arrow schema for a Parquet/Arrow export of the Birdeye query.
+    
+    Taken from the database's column types (the query run with a condition
+    that matches no rows), not inferred from the first row group, where a
+    column that happens to be all NULL would become a string column.
+    
+    Args:
+        connector: ODBCConnector (connected briefly if it is not connected)
+        
+    Returns:
+        pyarrow.Schema, or None when EXPORT_FORMAT is not columnar
+    """
+    if get_export_config()['export_format'] not in COLUMNAR_FORMATS:
+        return None
+    from connectors.columnar_export import arrow_schema
+    
+    query = BIRDEYE_QUERY.format(window="AND 1 = 0")
+    if connector.connection is not None:
+        return arrow_schema(connector.describe_query(query))
+    with connector:
+        return arrow_schema(connector.describe_query(query))
+
+
+def deliver_to_birdeye(data, logger, output_path='exports/birdeye_export.json', dedup=None, session=None,
+                       pipeline=None, schema=None):
+    """
+    Save data locally and send it to the Birdeye endpoint.
+    
+    Args:
+        data: List or iterator of dictionaries containing the data to export
+            (e.g. ODBCConnector.iter_query) - it is consumed once
+        logger: Logger instance for logging
+        output_path: Path to save the exported file (extension follows EXPORT_FORMAT
+            and EXPORT_COMPRESSION)
+        dedup: Optional DedupStore; when given, every record is saved locally
+            but only new or changed records (by src_lead_id) are sent, and the
+            index is committed only if every batch was delivered
+        session: Optional shared requests.Session for the webhook (e.g. from
+            get_shared_session in long-running processes)
+        pipeline: Optional Pipeline; records are then serialized and written
+            on a stage thread while the webhook delivers earlier batches, and
+            the pipeline is closed before returning
+        schema: Optional pyarrow schema for Parquet/Arrow exports (see
+            birdeye_export_schema); inferred from the first row group if None
+        
+    Batches that still fail after their retries are kept in the delivery
+    spool (unless SPOOL=false) and count as delivered for dedup and the
+    watermark, since replaying the spool delivers them without a new query.
+        
+    Returns:
+        Tuple of (export file path, delivery summary); the summary is None
+        when no endpoint is configured
+    """
+    started = time.perf_counter()
+    if pipeline is None:
+        pipeline = Pipeline('birdeye', enabled=False)
+    export_config = get_export_config()
+    if schema is not None:
+        export_config['schema'] = schema
+    
+    try:
+        endpoint = get_endpoint('birdeye')
+    except RuntimeError as e:
+        logger.error(f"Failed to send data to Birdeye endpoint: {e}")
+        # Don't raise - allow local export to succeed even if webhook fails
+        with pipeline:
+            writer = write_export(data, output_path, **export_config)
+        logger.info(f"Wrote {writer.count} records to {writer.path}")
+        metrics.EXPORT_RECORDS.inc(writer.count, service='birdeye')
+        metrics.EXPORT_SECONDS.observe(time.perf_counter() - started, service='birdeye')
+        return writer.path, None
+    
+    # Save data locally while sending it in concurrent batches; the pipeline
+    # is closed (stage threads stopped) before the writer is finalized
+    logger.info(f"Sending data to Birdeye endpoint: {endpoint}")
+    try:
+        with open_export_writer(output_path, **export_config) as writer, \
+                WebhookSink(endpoint, 'birdeye', session=session, spool=get_spool(),
+                            **get_webhook_config()) as sink, \
+                pipeline:
+            records = pipeline.stage('serialize', writer.tee(data))
+            if dedup is not None:
+                records = dedup.filter(records, key_field='src_lead_id')
+            summary = sink.send(records)
+    except Exception:
+        if dedup is not None:
+            dedup.rollback()
+        raise
+    logger.info(f"Wrote {writer.count} records to {writer.path}")
+    if pipeline.enabled:
+        summary['pipeline'] = pipeline.stats()
+    # Batches that are neither delivered nor spooled for replay
+    summary['undelivered_batches'] = summary['failed_batches'] - summary['spooled_batches']
+    
+    if dedup is not None:
+        summary['dedup'] = dedup.stats()
+        logger.info(
+            f"Dedup: {summary['dedup']['new']} new, {summary['dedup']['changed']} changed, "
+            f"{summary['dedup']['skipped']} unchanged records skipped"
+        )
+        if summary['undelivered_batches']:
+            dedup.rollback()
+        else:
+            dedup.commit()
+    
+    if summary['failed_batches']:
+        # Don't raise - allow local export to succeed even if webhook fails
+        logger.error(
+            f"Failed to send {summary['failed_batches']} of {summary['batches']} batches "
+            f"({summary['records'] - summary['records_sent']} records) to Birdeye endpoint"
+        )
+        if summary['spooled_batches']:
+            logger.warning(f"{summary['spooled_batches']} failed batches were spooled and will be "
+                           f"resent by the spool replay")
+    else:
+        logger.info(f"Successfully sent {summary['records_sent']} records to Birdeye endpoint "
+                    f"in {summary['batches']} batches")
+    
+    metrics.EXPORT_RECORDS.inc(writer.count, service='birdeye')
+    metrics.EXPORT_SECONDS.observe(time.perf_counter() - started, service='birdeye')
+    return writer.path, summary
 
 
 def export_to_birdeye(data, logger, output_path='exports/birdeye_export.json'):
@@ -31,100 +390,131 @@ def export_to_birdeye(data, logger, output_path='exports/birdeye_export.json'):
     Sends data to Zapier mock endpoint and saves locally.
     
     Args:
-        data: List of dictionaries containing the data to export
+        data: List or iterator of dictionaries containing the data to export
+            (e.g. ODBCConnector.iter_query) - it is consumed once
         logger: Logger instance for logging
-        output_path: Path to save the exported file
+        output_path: Path to save the exported file (extension follows EXPORT_FORMAT
+            and EXPORT_COMPRESSION)
+        
+    Returns:
+        Path of the written export file
+    """
+    output_file, _ = deliver_to_birdeye(data, logger, output_path)
+    return output_file
+
+
+def run_export(logger, full_refresh=False, dedup=True, parallel=1, use_pool=False, session=None):
     """
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    Run one Birdeye export: query, save, deliver and advance the watermark.
     
-    # Save data locally
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+    Args:
+        logger: Logger instance for logging
+        full_refresh: Ignore the stored watermark and export the last 30 days
+        dedup: Skip records delivered unchanged before
+        parallel: Read a full refresh as day partitions on this many connections
+        use_pool: Borrow the connection from the shared pool (kept warm between
+            runs in long-running processes such as the scheduler)
+        session: Optional shared requests.Session for the webhook
+        
+    Returns:
+        Delivery summary (None when no endpoint is configured)
+        
+    Raises:
+        Exception: Any database, export or configuration error
+    """
+    # Load configuration from .env file
+    logger.info("Loading configuration")
+    DB_CONFIG = get_db_config()
     
-    # Send data to Zapier endpoint
-    try:
-        endpoint = get_endpoint('birdeye')
-        logger.info(f"Sending data to Birdeye endpoint: {endpoint}")
+    # Load the incremental checkpoint
+    store = WatermarkStore(os.path.join(get_state_dir(), 'watermarks.json'))
+    watermark = None if full_refresh else store.get(JOB_NAME)
+    if watermark:
+        logger.info(f"Incremental run from watermark {watermark}")
+    else:
+        logger.info("Full refresh: exporting the last 30 days")
+    
+    # Initialize connector
+    logger.info("Initializing database connector")
+    connector = ODBCConnector(
+        driver=DB_CONFIG['driver'],
+        server=DB_CONFIG['server'],
+        database=DB_CONFIG['database'],
+        username=DB_CONFIG['username'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG.get('port'),
+        use_pool=use_pool or parallel > 1
+    )
+    
+    # Connect to database using context manager. Day partitions connect through
+    # clones of the connector, so it stays unconnected then: its own connection
+    # would hold a pool slot that no partition worker could use
+    read_partitions = watermark is None and parallel > 1
+    with nullcontext() if read_partitions else connector:
+        if not read_partitions:
+            logger.info("Connected to database successfully")
         
-        response = requests.post(
-            endpoint,
-            json={'data': data, 'service': 'birdeye', 'record_count': len(data)},
-            headers={'Content-Type': 'application/json'},
-            timeout=30
-        )
+        # Column types for Parquet/Arrow exports come from the database, not the first rows
+        schema = birdeye_export_schema(connector)
         
-        response.raise_for_status()
-        logger.info(f"Successfully sent data to Birdeye endpoint. Status: {response.status_code}")
+        # Execute query and stream rows straight into the export,
+        # tracking the highest watermark key on the way through
+        logger.info("Executing data query")
+        tracker = WatermarkTracker(WATERMARK_COLUMNS)
+        if read_partitions:
+            logger.info(f"Reading day partitions on {parallel} connections")
+            rows = iter_full_refresh_parallel(connector, parallel)
+        else:
+            query, params = build_birdeye_query(watermark)
+            rows = connector.iter_query(query, params)
         
-    except Exception as e:
-        logger.error(f"Failed to send data to Birdeye endpoint: {e}")
-        # Don't raise - allow local export to succeed even if webhook fails
+        # Export data for Birdeye, skipping records delivered unchanged before.
+        # Rows are fetched on a pipeline thread while earlier rows are being
+        # serialized and delivered (PIPELINE=false runs the stages in sequence)
+        logger.info("Exporting data for Birdeye")
+        with Pipeline('birdeye', **get_pipeline_config()) as pipeline:
+            data = pipeline.stage('fetch', tracker.track(rows))
+            if not dedup:
+                output_file, summary = deliver_to_birdeye(data, logger, session=session, pipeline=pipeline,
+                                                          schema=schema)
+            else:
+                dedup_path = os.path.join(get_state_dir(), 'birdeye_dedup.sqlite')
+                with DedupStore(dedup_path, max_keys=get_dedup_max_keys()) as dedup_store:
+                    output_file, summary = deliver_to_birdeye(data, logger, dedup=dedup_store, session=session,
+                                                              pipeline=pipeline, schema=schema)
+        logger.info(f"Data exported successfully to {output_file}")
+    
+    # Connection automatically closed by context manager
     
-    return output_path
+    # Advance the checkpoint only once every batch was delivered (or spooled for replay)
+    if summary is None or summary['undelivered_batches']:
+        logger.warning("Delivery incomplete, watermark not advanced")
+    elif tracker.value:
+        store.set(JOB_NAME, tracker.value)
+        logger.info(f"Watermark advanced to {tracker.value}")
+    
+    return summary
 
 
-def main():
+def main(argv=None):
     """Main execution function for Birdeye export."""
+    parser = argparse.ArgumentParser(description="Export installed jobs to Birdeye")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Ignore the stored watermark and export the last 30 days")
+    parser.add_argument('--no-dedup', action='store_true',
+                        help="Send every exported record, even if unchanged since the last run")
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                        help="Split a full refresh into day partitions read on N concurrent connections")
+    args = parser.parse_args(argv)
+    
     # Set up logging
     logger = setup_logger('birdeye_export')
     
     logger.info("Starting Birdeye export process")
     
     try:
-        # Load configuration from .env file
-        logger.info("Loading configuration")
-        DB_CONFIG = get_db_config()
-        
-        # Initialize connector
-        logger.info("Initializing database connector")
-        connector = ODBCConnector(
-            driver=DB_CONFIG['driver'],
-            server=DB_CONFIG['server'],
-            database=DB_CONFIG['database'],
-            username=DB_CONFIG['username'],
-            password=DB_CONFIG['password'],
-            port=DB_CONFIG.get('port')
-        )
-        
-        # Connect to database using context manager
-        with connector:
-            logger.info("Connected to database successfully")
-            
-            # Query databricks table for BirdEye review requests
-            # Focus on installed jobs for review solicitation
-            query = """
-                SELECT 
-                    src_lead_id,
-                    brand,
-                    customer_name,
-                    customer_email,
-                    customer_phone,
-                    customer_address_1,
-                    customer_city,
-                    customer_state,
-                    customer_zip_postal,
-                    product_of_interest,
-                    install_date,
-                    revenue,
-                    appt_statuses
-                FROM databricks
-                WHERE installed_jobs > 0
-                    AND install_date IS NOT NULL
-                    AND install_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAYS)
-                ORDER BY install_date DESC
-            """
-            
-            # Execute query
-            logger.info("Executing data query")
-            data = connector.execute_query(query)
-            logger.info(f"Retrieved {len(data)} records from database")
-            
-            # Export data for Birdeye
-            logger.info("Exporting data for Birdeye")
-            output_file = export_to_birdeye(data, logger)
-            logger.info(f"Data exported successfully to {output_file}")
-        
-        # Connection automatically closed by context manager
+        run_export(logger, full_refresh=args.full_refresh, dedup=not args.no_dedup,
+                   parallel=args.parallel)
         logger.info("Birdeye export completed successfully")
         
     except Exception as e:
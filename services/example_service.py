@@ -10,18 +10,82 @@ Usage:
 Cron example:
     # Run every hour
     0 * * * * cd /path/to/odbc-databridge && python services/example_service.py
+    
+Scheduler (keeps connections and imports warm between runs):
+    SCHEDULE_EXAMPLE_SERVICE='0 * * * *' python scheduler.py
 """
 
 import sys
 import os
+import time
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from connectors.odbc_connector import ODBCConnector
 from connectors.logger_utils import setup_logger
-from connectors.config_loader import get_db_config, get_endpoint
-import requests
+from connectors.config_loader import (
+    get_db_config, get_endpoint, get_webhook_config, get_export_config, get_pipeline_config
+)
+from connectors.export_utils import open_export_writer, write_export
+from connectors.webhook_sink import WebhookSink
+from connectors.pipeline import Pipeline
+from connectors.delivery_spool import get_spool
+from connectors.transform import MappingTransform, rename, fmt, coerce
+from connectors import metrics
+
+
+# Export record layout for databricks lead rows, applied column-wise in batches
+EXPORT_MAPPING = MappingTransform({
+    'id': rename('src_lead_id'),
+    'brand': rename('brand'),
+    'customer': rename('customer_name'),
+    'contact_email': rename('customer_email'),
+    'contact_phone': rename('customer_phone'),
+    'location': fmt('{customer_city}, {customer_state} {customer_zip_postal}'),
+    'stage': rename('appt_statuses'),
+    'service': rename('product_of_interest'),
+    'lead_source': rename('enterprise_ad_sub_category'),
+    'value': coerce('bookings_gross', float, default=0),
+    'lead_date': coerce('lead_created_date', str),
+})
+
+
+# Leads that need follow-up, newest first
+EXAMPLE_QUERY = """
+    SELECT 
+        src_lead_id,
+        brand,
+        customer_name,
+        customer_email,
+        customer_phone,
+        customer_address_1,
+        customer_city,
+        customer_state,
+        customer_zip_postal,
+        appt_statuses,
+        product_of_interest,
+        enterprise_ad_sub_category,
+        bookings_gross,
+        lead_created_date
+    FROM databricks
+    WHERE raw_leads > 0
+        AND lead_created_date IS NOT NULL
+    ORDER BY lead_created_date DESC
+"""
+
+
+def transform_row(row):
+    """
+    Transform a single databricks lead row into the export format.
+    
+    Args:
+        row: Dictionary for one query result row
+        
+    Returns:
+        Processed record
+    """
+    return EXPORT_MAPPING.transform_row(row)
 
 
 def process_data(data):
@@ -35,62 +99,155 @@ def process_data(data):
         Processed data ready for export
     """
     # Example processing: transform and enrich databricks lead data
-    processed = []
-    for row in data:
-        processed.append({
-            'id': row.get('src_lead_id'),
-            'brand': row.get('brand'),
-            'customer': row.get('customer_name'),
-            'contact_email': row.get('customer_email'),
-            'contact_phone': row.get('customer_phone'),
-            'location': f"{row.get('customer_city')}, {row.get('customer_state')} {row.get('customer_zip_postal')}",
-            'stage': row.get('appt_statuses'),
-            'service': row.get('product_of_interest'),
-            'lead_source': row.get('enterprise_ad_sub_category'),
-            'value': float(row.get('bookings_gross', 0) or 0),
-            'lead_date': str(row.get('lead_created_date'))
-        })
-    return processed
-
-
-def export_data(data, logger, output_path='exports/example_export.json'):
+    return EXPORT_MAPPING.transform(data)
+
+
+def iter_process_data(data):
+    """
+    Lazily process rows, e.g. straight from ODBCConnector.iter_query.
+    
+    Rows are transformed in column batches of EXPORT_MAPPING.batch_size.
+    
+    Args:
+        data: Iterable of dictionaries containing the query results
+        
+    Returns:
+        Iterator over the processed records
+    """
+    return EXPORT_MAPPING.iter_transform(data)
+
+
+def export_data(data, logger, output_path='exports/example_export.json', session=None, pipeline=None):
     """
     Export processed data to destination.
     Sends data to Zapier mock endpoint and saves locally.
     
     Args:
-        data: Processed data to export
+        data: Processed data to export (list or iterator, consumed once)
         logger: Logger instance for logging
-        output_path: Path to save the export file
+        output_path: Path to save the export file (extension follows EXPORT_FORMAT
+            and EXPORT_COMPRESSION)
+        session: Optional shared requests.Session for the webhook
+        pipeline: Optional Pipeline; records are then serialized and written
+            on a stage thread, and the pipeline is closed before returning
+        
+    Returns:
+        Path of the written export file
     """
-    import json
+    started = time.perf_counter()
+    if pipeline is None:
+        pipeline = Pipeline('example_service', enabled=False)
     
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Save data locally
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
-    
-    # Send data to endpoint
     try:
         endpoint = get_endpoint('example_service')
-        logger.info(f"Sending data to endpoint: {endpoint}")
-        
-        response = requests.post(
-            endpoint,
-            json={'data': data, 'service': 'example_service', 'record_count': len(data)},
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+    except RuntimeError as e:
+        logger.error(f"Failed to send data to endpoint: {e}")
+        # Don't raise - allow local export to succeed even if webhook fails
+        with pipeline:
+            writer = write_export(data, output_path, **get_export_config())
+        logger.info(f"Wrote {writer.count} records to {writer.path}")
+        metrics.EXPORT_RECORDS.inc(writer.count, service='example_service')
+        metrics.EXPORT_SECONDS.observe(time.perf_counter() - started, service='example_service')
+        return writer.path
+    
+    # Save data locally while sending it in concurrent batches
+    logger.info(f"Sending data to endpoint: {endpoint}")
+    with open_export_writer(output_path, **get_export_config()) as writer, \
+            WebhookSink(endpoint, 'example_service', session=session, spool=get_spool(),
+                        **get_webhook_config()) as sink, \
+            pipeline:
+        summary = sink.send(pipeline.stage('serialize', writer.tee(data)))
+    logger.info(f"Wrote {writer.count} records to {writer.path}")
+    
+    if summary['failed_batches']:
+        # Don't raise - allow local export to succeed even if webhook fails
+        logger.error(
+            f"Failed to send {summary['failed_batches']} of {summary['batches']} batches "
+            f"({summary['records'] - summary['records_sent']} records) to endpoint"
         )
+        if summary['spooled_batches']:
+            logger.warning(f"{summary['spooled_batches']} failed batches were spooled and will be "
+                           f"resent by the spool replay")
+    else:
+        logger.info(f"Successfully sent {summary['records_sent']} records to endpoint "
+                    f"in {summary['batches']} batches")
+    
+    metrics.EXPORT_RECORDS.inc(writer.count, service='example_service')
+    metrics.EXPORT_SECONDS.observe(time.perf_counter() - started, service='example_service')
+    return writer.path
+
+
+def iter_export_records(connector, pipeline=None):
+    """
+    Query the leads and lazily yield processed export records.
+    
+    Used by run() and by the API's streaming export endpoint.
+    
+    Args:
+        connector: Connected ODBCConnector
+        pipeline: Optional Pipeline to fetch the column batches on a stage thread
+        
+    Yields:
+        Processed records, one fetch batch at a time
+    """
+    data = connector.iter_query_columns(EXAMPLE_QUERY)
+    if pipeline is not None:
+        # Items are already fetch batches, so hand them over one at a time
+        data = pipeline.stage('fetch', data, chunk_size=1)
+    return EXPORT_MAPPING.iter_transform_columns(data)
+
+
+def run(logger, use_pool=False, session=None):
+    """
+    Run one export: query, process and deliver the data.
+    
+    Args:
+        logger: Logger instance for logging
+        use_pool: Borrow the connection from the shared pool (kept warm between
+            runs in long-running processes such as the scheduler)
+        session: Optional shared requests.Session for the webhook
         
-        response.raise_for_status()
-        logger.info(f"Successfully sent data to endpoint. Status: {response.status_code}")
+    Returns:
+        Path of the written export file
         
-    except Exception as e:
-        logger.error(f"Failed to send data to endpoint: {e}")
-        # Don't raise - allow local export to succeed even if webhook fails
+    Raises:
+        Exception: Any database, export or configuration error
+    """
+    # Load configuration from .env file
+    logger.info("Loading configuration")
+    DB_CONFIG = get_db_config()
+    
+    # Initialize connector with database configuration
+    logger.info("Initializing database connector")
+    connector = ODBCConnector(
+        driver=DB_CONFIG['driver'],
+        server=DB_CONFIG['server'],
+        database=DB_CONFIG['database'],
+        username=DB_CONFIG['username'],
+        password=DB_CONFIG['password'],
+        port=DB_CONFIG.get('port'),
+        use_pool=use_pool
+    )
     
-    return output_path
+    # Connect to database using context manager
+    with connector:
+        logger.info("Connected to database successfully")
+        
+        # Query databricks table for all active leads, streaming column batches
+        # through column-wise processing into the export. Batches are fetched
+        # on a pipeline thread; processing shares the serialize stage's thread
+        # (both are CPU-bound, so separate threads would only contend for the GIL)
+        logger.info("Executing data query")
+        with Pipeline('example_service', **get_pipeline_config()) as pipeline:
+            processed_data = iter_export_records(connector, pipeline)
+            
+            # Export data
+            logger.info("Exporting data")
+            output_file = export_data(processed_data, logger, session=session, pipeline=pipeline)
+        logger.info(f"Data exported successfully to {output_file}")
+    
+    # Connection automatically closed by context manager
+    return output_file
 
 
 def main():
@@ -101,64 +258,7 @@ def main():
     logger.info("Starting example service process")
     
     try:
-        # Load configuration from .env file
-        logger.info("Loading configuration")
-        DB_CONFIG = get_db_config()
-        
-        # Initialize connector with database configuration
-        logger.info("Initializing database connector")
-        connector = ODBCConnector(
-            driver=DB_CONFIG['driver'],
-            server=DB_CONFIG['server'],
-            database=DB_CONFIG['database'],
-            username=DB_CONFIG['username'],
-            password=DB_CONFIG['password'],
-            port=DB_CONFIG.get('port')
-        )
-        
-        # Connect to database using context manager
-        with connector:
-            logger.info("Connected to database successfully")
-            
-            # Query databricks table for all active leads
-            # This demonstrates querying leads that need follow-up
-            query = """
-                SELECT 
-                    src_lead_id,
-                    brand,
-                    customer_name,
-                    customer_email,
-                    customer_phone,
-                    customer_address_1,
-                    customer_city,
-                    customer_state,
-                    customer_zip_postal,
-                    appt_statuses,
-                    product_of_interest,
-                    enterprise_ad_sub_category,
-                    bookings_gross,
-                    lead_created_date
-                FROM databricks
-                WHERE raw_leads > 0
-                    AND lead_created_date IS NOT NULL
-                ORDER BY lead_created_date DESC
-            """
-            
-            # Execute query
-            logger.info("Executing data query")
-            data = connector.execute_query(query)
-            logger.info(f"Retrieved {len(data)} records from database")
-            
-            # Process the data
-            logger.info("Processing data")
-            processed_data = process_data(data)
-            
-            # Export data
-            logger.info("Exporting data")
-            output_file = export_data(processed_data, logger)
-            logger.info(f"Data exported successfully to {output_file}")
-        
-        # Connection automatically closed by context manager
+        run(logger)
         logger.info("Process completed successfully")
         
     except Exception as e:
@@ -0,0 +1,75 @@
+"""
+Shared test fixtures.
+
+The suite runs offline: when pyodbc cannot be imported (no ODBC driver
+manager installed), a minimal stand-in module is registered so the
+connectors import, and database tests run against an in-memory SQLite
+warehouse attached to an ODBCConnector instead of a real connection.
+"""
+
+import sqlite3
+import sys
+import types
+from datetime import date, timedelta
+
+import pytest
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    pyodbc = types.ModuleType('pyodbc')
+
+    class Error(Exception):
+        """Stand-in for pyodbc.Error."""
+
+    def connect(*args, **kwargs):
+        raise Error("pyodbc is not available in the test environment")
+
+    pyodbc.Error = Error
+    pyodbc.Connection = object
+    pyodbc.Cursor = object
+    pyodbc.connect = connect
+    sys.modules['pyodbc'] = pyodbc
+
+# Bind dates as ISO text (the Birdeye filters and keyset cursors use them)
+sqlite3.register_adapter(date, date.isoformat)
+
+WAREHOUSE_COLUMNS = [
+    'src_lead_id', 'brand', 'customer_name', 'customer_email', 'customer_phone',
+    'customer_address_1', 'customer_city', 'customer_state', 'customer_zip_postal',
+    'product_of_interest', 'install_date', 'revenue', 'appt_statuses', 'installed_jobs',
+]
+
+
+def warehouse_row(lead_id, install_date, brand='Acme', state='TX'):
+    """One databricks row with the columns the Birdeye query reads."""
+    return (lead_id, brand, f'Customer {lead_id}', f'c{lead_id}@example.com', '555-0100',
+            '1 Main St', 'Austin', state, '73301', 'Windows', install_date.isoformat(),
+            100.0 + lead_id, 'Installed', 1)
+
+
+@pytest.fixture
+def warehouse():
+    """In-memory databricks table: 3 leads per day on each of 10 days from 2024-01-01."""
+    connection = sqlite3.connect(':memory:', check_same_thread=False)
+    connection.execute(f"CREATE TABLE databricks ({', '.join(WAREHOUSE_COLUMNS)})")
+    rows = [warehouse_row(day * 3 + n, date(2024, 1, 1) + timedelta(days=day), brand='Acme' if n else 'Other')
+            for day in range(10) for n in range(3)]
+    connection.executemany(f"INSERT INTO databricks VALUES ({', '.join('?' * len(WAREHOUSE_COLUMNS))})", rows)
+    connection.commit()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def make_connector(warehouse):
+    """Factory for ODBCConnectors that query the in-memory warehouse."""
+    from connectors.odbc_connector import ODBCConnector
+
+    def make(**options):
+        connector = ODBCConnector(driver='SQLite', server='localhost', database='test',
+                                  username='test', password='test', **options)
+        connector.connection = warehouse
+        return connector
+
+    return make
@@ -0,0 +1,70 @@
+"""Tests for connectors.dedup_store (content-hash index of delivered records)."""
+
+import pytest
+
+from connectors.dedup_store import DedupStore
+from connectors.rows import make_row_factory
+
+
+@pytest.fixture
+def store(tmp_path):
+    with DedupStore(str(tmp_path / 'dedup.sqlite'), lookup_batch_size=2) as store:
+        yield store
+
+
+def records(*pairs):
+    return [{'src_lead_id': key, 'revenue': value} for key, value in pairs]
+
+
+def sent_keys(store, rows):
+    return [record['src_lead_id'] for record in store.filter(rows, key_field='src_lead_id')]
+
+
+def test_unchanged_records_are_skipped_after_commit(store):
+    assert sent_keys(store, records((1, 10), (2, 20), (3, 30))) == [1, 2, 3]
+    store.commit()
+
+    assert sent_keys(store, records((1, 10), (2, 25), (3, 30), (4, 40))) == [2, 4]
+    assert store.stats() == {'new': 4, 'changed': 1, 'skipped': 2, 'evicted': 0}
+
+
+def test_rollback_sends_the_records_again(store):
+    sent_keys(store, records((1, 10), (2, 20)))
+    store.rollback()
+
+    assert sent_keys(store, records((1, 10), (2, 20))) == [1, 2]
+
+
+def test_index_survives_reopening(tmp_path):
+    path = str(tmp_path / 'dedup.sqlite')
+    with DedupStore(path) as store:
+        sent_keys(store, records((1, 10)))
+        store.commit()
+    with DedupStore(path) as store:
+        assert sent_keys(store, records((1, 10), (2, 20))) == [2]
+
+
+def test_records_without_a_key_are_always_sent(store):
+    assert sent_keys(store, records((None, 1), (None, 1))) == [None, None]
+    store.commit()
+    assert sent_keys(store, records((None, 1))) == [None]
+
+
+def test_least_recently_seen_keys_are_evicted(tmp_path):
+    with DedupStore(str(tmp_path / 'dedup.sqlite'), max_keys=2) as store:
+        sent_keys(store, records((1, 10)))
+        store.commit()
+        sent_keys(store, records((2, 20)))
+        store.commit()
+        sent_keys(store, records((3, 30)))
+        store.commit()
+
+        assert store.stats()['evicted'] == 1
+        assert sent_keys(store, records((1, 10), (2, 20), (3, 30))) == [1]
+
+
+@pytest.mark.parametrize('kind', ['namedtuple', 'slots'])
+def test_named_rows_hash_like_dicts(kind):
+    make_row = make_row_factory(kind, ['src_lead_id', 'COUNT(*)'])
+
+    assert DedupStore.content_hash(make_row((1, 5))) == DedupStore.content_hash({'src_lead_id': 1, 'COUNT(*)': 5})
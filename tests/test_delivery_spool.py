@@ -0,0 +1,133 @@
+"""Tests for connectors.delivery_spool (durable spool of undelivered webhook batches)."""
+
+import threading
+
+import pytest
+
+from connectors.delivery_spool import DeliverySpool
+
+ENDPOINT = 'https://hooks.example.com/birdeye'
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = {}
+
+
+class Session:
+    """Records POSTs and answers with the next status code (200 once they run out)."""
+
+    def __init__(self, *status_codes):
+        self.status_codes = list(status_codes)
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        with self._lock:
+            self.posts.append((url, data, headers))
+            return Response(self.status_codes.pop(0) if self.status_codes else 200)
+
+
+@pytest.fixture(autouse=True)
+def no_adaptive_delivery(monkeypatch):
+    # Keep the process-wide per-host delivery controllers out of these tests
+    monkeypatch.setenv('WEBHOOK_ADAPTIVE', 'false')
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return DeliverySpool(str(tmp_path / 'spool'))
+
+
+def append(spool, index, body=None, service='birdeye'):
+    return spool.append(service, ENDPOINT, body or f'{{"batch":{index}}}'.encode(), 'application/json',
+                        key=f'run-{index}', batch_index=index, record_count=index + 1)
+
+
+def test_append_and_read_back(spool):
+    offsets = [append(spool, i) for i in range(3)]
+
+    pending = spool.pending()
+    assert [entry['offset'] for entry in pending] == offsets
+    assert [entry['key'] for entry in pending] == ['run-0', 'run-1', 'run-2']
+    assert spool.read_body(pending[1]) == b'{"batch":1}'
+    stats = spool.stats()
+    assert (stats['pending_batches'], stats['pending_records']) == (3, 6)
+
+
+def test_bodies_are_kept_byte_for_byte(spool):
+    body = b'\x00binary\nwith newlines\n\xff'
+    append(spool, 0, body=body)
+
+    assert spool.read_body(spool.pending()[0]) == body
+
+
+def test_acked_entries_are_no_longer_pending(spool):
+    first = append(spool, 0)
+    append(spool, 1, service='other')
+
+    spool.ack(first)
+
+    assert [entry['batch_index'] for entry in spool.pending()] == [1]
+    assert spool.pending('birdeye') == []
+
+
+def test_reopening_keeps_entries_and_drops_a_torn_one(spool):
+    append(spool, 0)
+    append(spool, 1)
+    with open(spool.batches_path, 'ab') as f:
+        f.write(b'{"service":"birdeye","length":100}\npartial')
+
+    reopened = DeliverySpool(spool.directory)
+
+    assert [entry['batch_index'] for entry in reopened.pending()] == [0, 1]
+    append(reopened, 2)
+    assert [entry['batch_index'] for entry in reopened.pending()] == [0, 1, 2]
+
+
+def test_compact_only_once_everything_is_acked(spool):
+    first = append(spool, 0)
+    second = append(spool, 1)
+
+    spool.ack(first)
+    assert not spool.compact()
+    spool.ack(second, 'rejected')
+    assert spool.compact()
+    assert spool.stats()['file_bytes'] == 0
+
+
+def test_replay_resends_with_the_original_key(spool):
+    for i in range(3):
+        append(spool, i)
+    session = Session()
+
+    summary = spool.replay(session=session, max_retries=0)
+
+    assert (summary['replayed'], summary['records'], summary['pending']) == (3, 6, 0)
+    assert sorted(headers['Idempotency-Key'] for _, _, headers in session.posts) == ['run-0', 'run-1', 'run-2']
+    assert spool.stats()['file_bytes'] == 0
+    # Nothing is sent twice
+    assert spool.replay(session=session, max_retries=0)['replayed'] == 0
+    assert len(session.posts) == 3
+
+
+def test_replay_keeps_failed_and_drops_rejected_batches(spool):
+    append(spool, 0)
+    append(spool, 1)
+    session = Session(503, 400)
+
+    summary = spool.replay(session=session, max_retries=0, max_workers=1, stop_on_failure=False)
+
+    assert (summary['failed'], summary['rejected'], summary['pending']) == (1, 1, 1)
+    assert [entry['batch_index'] for entry in spool.pending()] == [0]
+
+
+def test_replay_stops_after_a_failure(spool):
+    for i in range(3):
+        append(spool, i)
+
+    summary = spool.replay(session=Session(503), max_retries=0, max_workers=1)
+
+    assert (summary['replayed'], summary['failed'], summary['pending']) == (0, 1, 3)
@@ -0,0 +1,102 @@
+"""Tests for connectors.keyset and the keyset-paginated Birdeye records."""
+
+from datetime import date
+
+import pytest
+
+from connectors.keyset import InvalidCursorError, decode_cursor, encode_cursor, keyset_condition
+from services.birdeye_export import PAGE_KEY, fetch_page, parse_filters
+
+COLUMNS = ['install_date', 'src_lead_id']
+
+
+def test_cursor_round_trip():
+    scope = {'brand_name': ['Acme']}
+    token = encode_cursor({'install_date': date(2024, 1, 5), 'src_lead_id': 42, 'brand': 'Acme'},
+                          COLUMNS, scope=scope)
+
+    assert decode_cursor(token, COLUMNS, scope=scope) == {'install_date': '2024-01-05', 'src_lead_id': 42}
+    assert '=' not in token
+
+
+def test_cursor_is_bound_to_its_filters():
+    token = encode_cursor({'install_date': '2024-01-05', 'src_lead_id': 42}, COLUMNS, scope={'brand_name': ['Acme']})
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, COLUMNS, scope={'brand_name': ['Other']})
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, COLUMNS)
+
+
+@pytest.mark.parametrize('token', ['not base64!', 'e30', 'eyJrIjpbMV19', '', 'bnVsbA'])
+def test_malformed_cursors(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, COLUMNS)
+
+
+def test_keyset_condition():
+    condition, params = keyset_condition(['a', 'b', 'c'], {'a': 1, 'b': 2, 'c': 3})
+
+    assert condition == "(a < ? OR (a = ? AND b < ?) OR (a = ? AND b = ? AND c < ?))"
+    assert params == [1, 1, 2, 1, 2, 3]
+    assert keyset_condition(['a'], {'a': 1}, descending=False) == ("(a > ?)", [1])
+
+
+def all_pages(connector, filters, limit):
+    pages = []
+    records, cursor = fetch_page(connector, filters, limit=limit)
+    pages.append(records)
+    while cursor:
+        records, cursor = fetch_page(connector, filters, cursor=cursor, limit=limit)
+        pages.append(records)
+    return pages
+
+
+@pytest.mark.parametrize('limit', [1, 4, 30, 100])
+def test_pages_cover_every_row_once_in_order(make_connector, limit):
+    connector = make_connector()
+    filters = parse_filters({'start_date': '2024-01-01'})
+
+    pages = all_pages(connector, filters, limit)
+    keys = [(record['install_date'], record['src_lead_id']) for page in pages for record in page]
+
+    assert len(keys) == 30
+    assert keys == sorted(keys, reverse=True)
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_pages_respect_filters(make_connector):
+    connector = make_connector()
+    filters = parse_filters({'start_date': '2024-01-01', 'brand_name': 'Other'})
+
+    records = [record for page in all_pages(connector, filters, 3) for record in page]
+
+    assert len(records) == 10
+    assert {record['brand'] for record in records} == {'Other'}
+
+
+def test_new_rows_do_not_shift_later_pages(make_connector, warehouse):
+    connector = make_connector()
+    filters = parse_filters({'start_date': '2024-01-01'})
+    first, cursor = fetch_page(connector, filters, limit=10)
+
+    # Newer than every row already returned: lands before the cursor, not in the next page
+    warehouse.execute("INSERT INTO databricks (src_lead_id, brand, install_date, installed_jobs) "
+                      "VALUES (999, 'Acme', '2024-02-01', 1)")
+    second, _ = fetch_page(connector, filters, cursor=cursor, limit=10)
+
+    assert (second[0]['install_date'], second[0]['src_lead_id']) < (first[-1]['install_date'],
+                                                                     first[-1]['src_lead_id'])
+    assert 999 not in {record['src_lead_id'] for record in second}
+
+
+def test_cursor_from_other_filters_is_rejected(make_connector):
+    connector = make_connector()
+    _, cursor = fetch_page(connector, parse_filters({'start_date': '2024-01-01'}), limit=5)
+
+    with pytest.raises(InvalidCursorError):
+        fetch_page(connector, parse_filters({'start_date': '2024-01-02'}), cursor=cursor, limit=5)
+
+
+def test_page_key_matches_the_query_order():
+    assert PAGE_KEY == COLUMNS
@@ -0,0 +1,115 @@
+"""Tests for connectors.partitioned_reader (concurrent key-range reads)."""
+
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from connectors.partitioned_reader import (PartitionedReader, build_partition_query, date_partitions,
+                                           range_partitions)
+
+
+class Connector:
+    """Connector stand-in that yields one batch per partition, tagged with its bounds."""
+
+    def __init__(self, log, fail_on=None, delay=0.0):
+        self.log = log
+        self.fail_on = fail_on
+        self.delay = delay
+
+    def __enter__(self):
+        self.log.append('connect')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def iter_query(self, query, params, batch_size=1000, batches=False):
+        time.sleep(self.delay)
+        if self.fail_on is not None and self.fail_on in params:
+            raise RuntimeError(f"partition {params} failed")
+        yield [{'query': query, 'params': params}]
+
+
+def factory(log, **options):
+    lock = threading.Lock()
+
+    def make():
+        with lock:
+            return Connector(log, **options)
+
+    return make
+
+
+def test_partition_helpers():
+    assert date_partitions(date(2024, 1, 1), date(2024, 1, 4), days=2) == [
+        (date(2024, 1, 1), date(2024, 1, 3)), (date(2024, 1, 3), date(2024, 1, 4))]
+    assert range_partitions(0, 10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert range_partitions(5, 5, 3) == []
+
+
+def test_build_partition_query():
+    assert build_partition_query("SELECT * FROM t WHERE x AND {partition}", 'k') == \
+        "SELECT * FROM t WHERE x AND k >= ? AND k < ?"
+    assert build_partition_query("SELECT * FROM t", 'k') == \
+        "SELECT * FROM (SELECT * FROM t) AS partitioned WHERE k >= ? AND k < ?"
+    assert build_partition_query("{partition}", 'k', upper=False) == "k >= ?"
+    assert build_partition_query("{partition}", 'k', lower=False) == "k < ?"
+
+
+def test_ordered_read_keeps_partition_order():
+    log = []
+    reader = PartitionedReader(factory(log), max_workers=3)
+
+    rows = list(reader.iter_rows("SELECT {partition}", 'k', [(i, i + 1) for i in range(6)], params=(9,),
+                                 ordered=True))
+
+    assert [row['params'] for row in rows] == [(9, i, i + 1) for i in range(6)]
+    assert len(log) == 6
+    assert [stats['rows'] for stats in reader.last_stats] == [1] * 6
+
+
+def test_open_ended_partitions_bind_only_their_bounds():
+    reader = PartitionedReader(factory([]), max_workers=2)
+
+    rows = list(reader.iter_rows("{partition}", 'k', [(None, 1), (1, 2), (2, None)], ordered=True))
+
+    assert [(row['query'], row['params']) for row in rows] == [
+        ("k < ?", (1,)), ("k >= ? AND k < ?", (1, 2)), ("k >= ?", (2,))]
+
+
+def test_unordered_read_returns_every_partition():
+    reader = PartitionedReader(factory([]), max_workers=4)
+
+    rows = list(reader.iter_rows("{partition}", 'k', [(i, i + 1) for i in range(10)]))
+
+    assert sorted(row['params'] for row in rows) == [(i, i + 1) for i in range(10)]
+
+
+def test_closing_early_does_not_start_queued_partitions():
+    log = []
+    reader = PartitionedReader(factory(log, delay=0.02), max_workers=2)
+
+    rows = reader.iter_rows("{partition}", 'k', [(i, i + 1) for i in range(20)], ordered=True)
+    next(rows)
+    rows.close()
+
+    # At most the partitions already running (and those they handed over to) connected
+    assert len(log) <= 4
+
+
+def test_error_stops_the_read_without_running_queued_partitions():
+    log = []
+    reader = PartitionedReader(factory(log, fail_on=0, delay=0.02), max_workers=2)
+
+    with pytest.raises(RuntimeError):
+        list(reader.iter_rows("{partition}", 'k', [(i, i + 1) for i in range(20)], ordered=True))
+
+    assert len(log) <= 4
+    assert reader.last_stats[0]['error']
+
+
+def test_max_workers_must_be_positive():
+    with pytest.raises(ValueError):
+        PartitionedReader(factory([]), max_workers=0)
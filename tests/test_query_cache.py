@@ -0,0 +1,192 @@
+"""Tests for connectors.query_cache and its use by ODBCConnector and the records endpoint."""
+
+import importlib
+import threading
+import time
+
+import pytest
+
+from connectors import query_cache
+from connectors.query_cache import QueryCache
+from services.birdeye_export import fetch_page, parse_filters
+
+QUERY = "SELECT * FROM databricks WHERE brand = ?"
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_cache.time, 'monotonic', clock)
+    return clock
+
+
+def test_hit_after_miss():
+    cache = QueryCache()
+    loads = []
+
+    for _ in range(3):
+        result = cache.get_or_load(QUERY, ('Acme',), lambda: loads.append(1) or [{'id': 1}])
+
+    assert result == [{'id': 1}]
+    assert len(loads) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1)
+
+
+def test_params_and_variant_are_part_of_the_key():
+    cache = QueryCache()
+
+    assert cache.get_or_load(QUERY, ('Acme',), lambda: ['acme']) == ['acme']
+    assert cache.get_or_load(QUERY, ('Other',), lambda: ['other']) == ['other']
+    assert cache.get_or_load(QUERY, ('Acme',), lambda: ['tuple'], variant='tuple') == ['tuple']
+    # Whitespace differences and a trailing semicolon share an entry
+    assert cache.get_or_load(f"  {QUERY.replace(' ', chr(10))};", ('Acme',), lambda: ['reloaded']) == ['acme']
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = QueryCache(default_ttl=60)
+    cache.get_or_load(QUERY, None, lambda: ['old'])
+    cache.get_or_load("SELECT 1", None, lambda: ['short'], ttl=5)
+
+    clock.now += 10
+    assert cache.get_or_load("SELECT 1", None, lambda: ['new']) == ['new']
+    assert cache.get_or_load(QUERY, None, lambda: ['new']) == ['old']
+
+    clock.now += 60
+    assert cache.get_or_load(QUERY, None, lambda: ['new']) == ['new']
+    assert cache.stats()['expirations'] == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = QueryCache()
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+    results = []
+
+    def loader():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return ['shared']
+
+    def read():
+        results.append(cache.get_or_load(QUERY, None, loader))
+
+    leader = threading.Thread(target=read)
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()['coalesced'] < len(followers) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert loads == [1]
+    assert results == [['shared']] * 5
+    assert cache.stats()['coalesced'] == 4
+
+
+def test_load_errors_are_raised_and_not_cached():
+    cache = QueryCache()
+
+    def fail():
+        raise RuntimeError("database down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(QUERY, None, fail)
+    assert cache.get_or_load(QUERY, None, lambda: ['ok']) == ['ok']
+
+
+def test_invalidate_by_table_and_query():
+    cache = QueryCache()
+    cache.get_or_load(QUERY, ('Acme',), lambda: ['a'])
+    cache.get_or_load(QUERY, ('Other',), lambda: ['b'])
+    cache.get_or_load("SELECT * FROM jobs", None, lambda: ['c'])
+
+    assert cache.invalidate(query=QUERY, params=('Acme',)) == 1
+    assert cache.invalidate(table='databricks') == 1
+    assert cache.stats()['entries'] == 1
+    assert cache.invalidate() == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    big = ['x' * 1000]
+    cache = QueryCache(max_bytes=query_cache.estimate_size(big) * 2 + 100)
+    cache.get_or_load("SELECT 1", None, lambda: list(big))
+    cache.get_or_load("SELECT 2", None, lambda: list(big))
+    cache.get_or_load("SELECT 1", None, lambda: ['reloaded'])
+    cache.get_or_load("SELECT 3", None, lambda: list(big))
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.get_or_load("SELECT 1", None, lambda: ['reloaded']) == big
+    assert cache.get_or_load("SELECT 2", None, lambda: ['reloaded']) == ['reloaded']
+
+
+def test_connector_serves_repeated_queries_from_cache(make_connector, warehouse):
+    connector = make_connector(cache=QueryCache())
+    query = "SELECT src_lead_id FROM databricks WHERE brand = ?"
+
+    first = connector.execute_query(query, ('Other',))
+    warehouse.execute("DELETE FROM databricks")
+
+    assert connector.execute_query(query, ('Other',)) == first
+    assert connector.execute_query(query, ('Other',), cache_ttl=0) == []
+    assert connector.execute_query(query, ('Other',), row_factory='tuple') == []
+
+
+def test_first_page_is_cached_and_cursor_pages_are_not(make_connector, warehouse):
+    cache = QueryCache()
+    connector = make_connector(cache=cache)
+    filters = parse_filters({'start_date': '2024-01-01'})
+
+    records, cursor = fetch_page(connector, filters, limit=5)
+    warehouse.execute("INSERT INTO databricks (src_lead_id, brand, install_date, installed_jobs) "
+                      "VALUES (999, 'Acme', '2024-01-03', 1)")
+
+    # A first page within FIRST_PAGE_CACHE_TTL is the cached one
+    assert fetch_page(connector, filters, limit=5) == (records, cursor)
+    # Pages after a cursor always read the database
+    fetch_page(connector, filters, cursor=cursor, limit=5)
+    fetch_page(connector, filters, cursor=cursor, limit=5)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_records_endpoint_uses_the_shared_cache(monkeypatch, tmp_path, warehouse):
+    for name in ('DB_DRIVER', 'DB_SERVER', 'DB_DATABASE', 'DB_USERNAME', 'DB_PASSWORD'):
+        monkeypatch.setenv(name, 'test')
+    monkeypatch.setenv('LOG_DIR', str(tmp_path))
+    api = importlib.import_module('api')
+    from connectors.odbc_connector import ODBCConnector
+
+    def connect(connector):
+        connector.connection = warehouse
+
+    monkeypatch.setattr(ODBCConnector, 'connect', connect)
+    monkeypatch.setattr(ODBCConnector, 'close', lambda connector: None)
+    api.get_query_cache().invalidate()
+    client = api.app.test_client()
+
+    before = client.get('/api/cache/stats').get_json()
+    for _ in range(2):
+        assert client.get('/api/birdeye/records?start_date=2024-01-01&limit=5').status_code == 200
+    after = client.get('/api/cache/stats').get_json()
+
+    assert after['hits'] - before['hits'] == 1
+    assert after['misses'] - before['misses'] == 1
@@ -0,0 +1,77 @@
+"""Tests for connectors.rows (row factories and row_to_dict)."""
+
+import pytest
+
+from connectors.rows import ROW_FACTORIES, make_row_factory, row_to_dict
+
+COLUMNS = ['src_lead_id', 'COUNT(*)', 'class', '_hidden', 'index', 'count', 'brand', 'brand']
+RAW = (7, 3, 'A', 'h', 'i', 'c', 'first', 'second')
+
+
+@pytest.mark.parametrize('kind', ROW_FACTORIES)
+def test_row_to_dict_matches_dict_rows(kind):
+    row = make_row_factory(kind, COLUMNS)(RAW)
+
+    expected = dict(zip(COLUMNS, RAW))
+    assert row_to_dict(row, COLUMNS) == expected
+    assert expected['brand'] == 'second'
+
+
+@pytest.mark.parametrize('kind', ['namedtuple', 'slots'])
+def test_get_uses_original_column_names(kind):
+    row = make_row_factory(kind, COLUMNS)(RAW)
+
+    assert row.get('COUNT(*)') == 3
+    assert row.get('class') == 'A'
+    assert row.get('_hidden') == 'h'
+    assert row.get('brand') == 'second'
+    assert row.get('missing', 'default') == 'default'
+    assert row._asdict() == dict(zip(COLUMNS, RAW))
+
+
+@pytest.mark.parametrize('kind', ['namedtuple', 'slots'])
+def test_get_ignores_row_attributes(kind):
+    row = make_row_factory(kind, ['src_lead_id'])((1,))
+
+    assert row.get('index') is None
+    assert row.get('count', 0) == 0
+    assert row.get('_asdict') is None
+    assert row.get('_fields') is None
+
+
+@pytest.mark.parametrize('kind', ['namedtuple', 'slots'])
+def test_invalid_names_are_positional_attributes(kind):
+    row = make_row_factory(kind, COLUMNS)(RAW)
+
+    assert row.src_lead_id == 7
+    assert row._1 == 3
+    assert row._2 == 'A'
+    assert row[1] == 3
+    assert list(row) == list(RAW)
+    assert len(row) == len(RAW)
+
+
+def test_slots_rows_compare_and_check_arity():
+    make_row = make_row_factory('slots', ['a', 'b'])
+
+    assert make_row((1, 2)) == make_row((1, 2))
+    assert make_row((1, 2)) != make_row((1, 3))
+    with pytest.raises(TypeError):
+        make_row((1,))
+
+
+def test_row_classes_are_cached_per_column_list():
+    first = make_row_factory('slots', ['a', 'b'])((1, 2))
+    second = make_row_factory('slots', ['a', 'b'])((3, 4))
+
+    assert type(first) is type(second)
+
+
+def test_plain_tuples_need_column_names():
+    with pytest.raises(TypeError):
+        row_to_dict((1, 2))
+
+
+def test_unknown_row_factory():
+    with pytest.raises(ValueError):
+        make_row_factory('frozenset', ['a'])
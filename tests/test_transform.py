@@ -0,0 +1,106 @@
+"""Tests for connectors.transform: the column path must match the row path."""
+
+import datetime
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from connectors.rows import ROW_FACTORIES, make_row_factory
+from connectors.transform import MappingTransform, coerce, concat, default, fmt, rename
+
+COLUMNS = ['src_lead_id', 'customer_city', 'customer_state', 'bookings_gross', 'installed', 'created',
+           'COUNT(*)']
+
+RAW = [
+    (1, 'Austin', 'TX', Decimal('10.25'), 1, datetime.datetime(2024, 1, 1, 12, 0), 3),
+    (2, None, 'CA', None, 0, datetime.datetime(2024, 1, 2, 8, 30), 0),
+    (3, 'Denver', None, Decimal('0'), 2, datetime.datetime(2024, 1, 3, 0, 0, 0, 500), 1),
+    (4, '{braces}', 'NY', 7, None, datetime.datetime(2024, 1, 4), 2),
+]
+
+MAPPING = {
+    'id': rename('src_lead_id'),
+    'city': 'customer_city',
+    'location': fmt('{customer_city}, {customer_state}'),
+    'label': concat('customer_state', 'src_lead_id', sep='-'),
+    'value': coerce('bookings_gross', float, default=0),
+    'jobs': coerce('installed', 'int', default=0),
+    'created': coerce('created', str),
+    'state': default('customer_state', 'unknown'),
+    'count': rename('COUNT(*)'),
+    'missing': rename('not_a_column'),
+}
+
+
+@pytest.fixture
+def transform():
+    return MappingTransform(MAPPING, batch_size=3)
+
+
+def expected():
+    transform = MappingTransform(MAPPING)
+    return [transform.transform_row(dict(zip(COLUMNS, raw))) for raw in RAW]
+
+
+def test_row_path_semantics():
+    first, second, third, fourth = expected()
+
+    assert first == {'id': 1, 'city': 'Austin', 'location': 'Austin, TX', 'label': 'TX-1', 'value': 10.25,
+                     'jobs': 1, 'created': '2024-01-01 12:00:00', 'state': 'TX', 'count': 3, 'missing': None}
+    assert second['location'] == 'None, CA'
+    assert second['value'] == 0.0
+    assert second['jobs'] == 0
+    assert third['state'] == 'unknown'
+    assert third['created'] == '2024-01-03 00:00:00.000500'
+    assert fourth['location'] == '{braces}, NY'
+
+
+@pytest.mark.parametrize('kind', ROW_FACTORIES)
+def test_batch_path_matches_row_path(transform, kind):
+    make_row = make_row_factory(kind, COLUMNS)
+    rows = [make_row(raw) for raw in RAW]
+    columns = COLUMNS if kind == 'tuple' else None
+
+    assert transform.transform(rows, columns) == expected()
+    assert list(transform.iter_transform(iter(rows), columns)) == expected()
+    assert [transform.transform_row(row, columns) for row in rows] == expected()
+
+
+def test_column_batches_match_row_path(transform):
+    batches = [dict(zip(COLUMNS, zip(*RAW[:2]))), dict(zip(COLUMNS, zip(*RAW[2:])))]
+
+    assert list(transform.iter_transform_columns(batches)) == expected()
+
+
+def test_frame_matches_row_path(transform):
+    frame = pd.DataFrame(list(RAW), columns=COLUMNS, dtype=object)
+
+    assert transform.transform_frame(frame).to_dict('records') == expected()
+
+
+def test_uniform_datetimes_format_like_str():
+    stamps = [datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i) for i in range(5)]
+    transform = MappingTransform({'created': coerce('created', str)})
+
+    assert transform.transform([{'created': stamp} for stamp in stamps]) == [{'created': str(stamp)}
+                                                                          for stamp in stamps]
+
+
+def test_output_keys_keep_mapping_order(transform):
+    assert list(transform.transform([dict(zip(COLUMNS, RAW[0]))])[0]) == list(MAPPING)
+
+
+def test_empty_input_and_mapping():
+    assert MappingTransform(MAPPING).transform([]) == []
+    assert MappingTransform({}).transform([{'a': 1}, {'a': 2}]) == [{}, {}]
+
+
+def test_plain_tuples_need_column_names(transform):
+    with pytest.raises(TypeError):
+        transform.transform(list(RAW))
+
+
+def test_unsupported_coercion():
+    with pytest.raises(ValueError):
+        coerce('revenue', dict)